@@ -1,6 +1,7 @@
 import os
 import copy
 import json
+from concurrent.futures import Future
 from typing_extensions import Dict
 import yaml
 from typing import List, Tuple
@@ -8,6 +9,7 @@ from typing import List, Tuple
 from krkn_ai.models.app import CommandRunResult, KrknRunnerType
 
 from krkn_ai.models.scenario.base import Scenario, BaseScenario, CompositeDependency, CompositeScenario
+from krkn_ai.models.scenario.blast_radius import get_blast_radius, is_conflicting
 from krkn_ai.models.scenario.factory import ScenarioFactory
 
 from krkn_ai.models.config import ConfigFile
@@ -15,9 +17,11 @@ from krkn_ai.reporter.generations_reporter import GenerationsReporter
 from krkn_ai.reporter.health_check_reporter import HealthCheckReporter
 from krkn_ai.utils.logger import get_logger
 from krkn_ai.chaos_engines.krkn_runner import KrknRunner
+from krkn_ai.chaos_engines.scheduler import ScenarioScheduler
 from krkn_ai.utils.rng import rng
 from krkn_ai.models.custom_errors import PopulationSizeError, UniqueScenariosError
 from krkn_ai.utils.output import format_result_filename
+from krkn_ai.utils.pipeline import OrderedPipeline
 
 logger = get_logger(__name__)
 
@@ -49,6 +53,17 @@ class GeneticAlgorithm:
         self.health_check_reporter = HealthCheckReporter(self.output_dir, self.config.output)
         self.generations_reporter = GenerationsReporter(self.output_dir, self.format)
 
+        # Post-process scenario results in background while next scenario runs
+        self.pipeline = None
+        if self.config.pipeline.enable:
+            self.pipeline = OrderedPipeline(self.config.pipeline.max_pending)
+        self.pending_results: Dict[BaseScenario, Future] = {}  # Scenarios waiting for post-processing
+
+        # Run non-overlapping scenarios in parallel
+        self.scheduler = None
+        if self.config.scheduler.concurrency > 1:
+            self.scheduler = ScenarioScheduler(self.krkn_client.execute, self.config.scheduler.concurrency)
+
         if self.config.population_size < 2:
             raise PopulationSizeError("Population size should be at least 2")
 
@@ -82,9 +97,12 @@ class GeneticAlgorithm:
             logger.info("--------------------------------------------------------")
 
             # Evaluate fitness of the current population
-            fitness_scores = [
-                self.calculate_fitness(member, i) for member in self.population
-            ]
+            if self.krkn_client.baseline_sampler is not None:
+                self.krkn_client.baseline_sampler.start()
+            fitness_scores = self.calculate_population_fitness(self.population, i)
+            if self.krkn_client.baseline_sampler is not None:
+                self.krkn_client.baseline_sampler.stop()
+
             # Find the best individual in the current generation
             # Note: If there is no best solution, it will still consider based on sorting order
             fitness_scores = sorted(
@@ -164,22 +182,101 @@ class GeneticAlgorithm:
     def calculate_fitness(self, scenario: BaseScenario, generation_id: int):
         # If scenario has already been run, do not run it again.
         # we will rely on mutation for the same parents to produce newer samples
+        if scenario in self.pending_results:
+            # Scenario was run earlier in this generation and is still being post-processed
+            self.pending_results[scenario].result()
         if scenario in self.seen_population:
             logger.info("Scenario %s already evaluated, skipping fitness calculation.", scenario)
             result = self.seen_population[scenario]
             result = copy.deepcopy(result)
             result.generation_id = generation_id
             return result
-        scenario_result = self.krkn_client.run(scenario, generation_id)
+
+        # Don't run another scenario when post-processing of an earlier one failed
+        if self.pipeline is not None:
+            self.pipeline.check()
+        scenario_result = self.krkn_client.execute(scenario, generation_id)
+        self.submit_result(scenario_result)
+        return scenario_result
+
+    def calculate_population_fitness(self, population: List[BaseScenario], generation_id: int) -> List[CommandRunResult]:
+        '''
+        Evaluate fitness of every member of the population.
+        '''
+        if self.config.batch.enable:
+            self.run_batches(population, generation_id)
+        if self.scheduler is not None:
+            scenarios = [
+                scenario for scenario in dict.fromkeys(population)
+                if scenario not in self.seen_population and scenario not in self.pending_results
+            ]
+            self.scheduler.run(scenarios, generation_id, on_result=self.submit_result)
+        fitness_scores = [
+            self.calculate_fitness(member, generation_id) for member in population
+        ]
+        self.wait_for_pending_results()
+        return fitness_scores
+
+    def run_batches(self, population: List[BaseScenario], generation_id: int):
+        '''
+        Run independent scenarios of the population together in krknctl graph runs.
+        Scenarios that could not be batched are left to be run individually.
+        '''
+        # Greedily pack scenarios that do not disrupt the same resources
+        batches: List[List[Tuple[Scenario, set]]] = []
+        for scenario in dict.fromkeys(population):
+            if not isinstance(scenario, Scenario) or scenario in self.seen_population:
+                continue
+            radius = get_blast_radius(scenario)
+            for batch in batches:
+                if len(batch) < self.config.batch.max_size and not any(
+                    is_conflicting(radius, other_radius) for _, other_radius in batch
+                ):
+                    batch.append((scenario, radius))
+                    break
+            else:
+                batches.append([(scenario, radius)])
+
+        for batch in batches:
+            if len(batch) < 2:
+                continue
+            results = self.krkn_client.run_batch([scenario for scenario, _ in batch], generation_id)
+            for scenario_result in results:
+                self.submit_result(scenario_result)
+
+    def submit_result(self, scenario_result: CommandRunResult):
+        '''
+        Evaluate and save an executed scenario, in background when pipeline is enabled.
+        Result is updated in place with the fitness scores.
+        '''
+        if self.pipeline is None:
+            self.process_result(scenario_result, evaluate=True)
+            return
+        self.pending_results[scenario_result.scenario] = self.pipeline.submit(
+            self.process_result, scenario_result, evaluate=True
+        )
+
+    def process_result(self, scenario_result: CommandRunResult, evaluate: bool = False):
+        '''
+        Calculate fitness (if not done yet), record and save scenario result.
+        '''
+        if evaluate:
+            self.krkn_client.evaluate(scenario_result)
 
         # Add scenario to seen population
-        self.seen_population[scenario] = scenario_result
+        self.seen_population[scenario_result.scenario] = scenario_result
 
         # Save scenario result
         self.save_scenario_result(scenario_result)
         self.health_check_reporter.plot_report(scenario_result)
         self.health_check_reporter.write_fitness_result(scenario_result)
-        return scenario_result
+
+    def wait_for_pending_results(self):
+        '''Block until all background post-processing is complete.'''
+        if self.pipeline is None:
+            return
+        self.pipeline.drain()
+        self.pending_results = {}
 
     def mutate(self, scenario: BaseScenario):
         if isinstance(scenario, CompositeScenario):
@@ -242,7 +339,7 @@ class GeneticAlgorithm:
         Selects two parents using Roulette Wheel Selection (proportionate selection).
         Higher fitness means higher chance of being selected.
         """
-        raw = [x.fitness_result.fitness_score for x in fitness_scores]
+        raw = [self.__selection_score(x) for x in fitness_scores]
         scenarios = [x.scenario for x in fitness_scores]
 
         min_f = min(raw)
@@ -267,6 +364,15 @@ class GeneticAlgorithm:
         parent2 = rng.choices(items=scenarios, weights=probabilities, k=1)[0]
         return parent1, parent2
 
+    def __selection_score(self, result: CommandRunResult) -> float:
+        '''
+        Fitness score used for selection, partial results from terminated runs are discounted.
+        '''
+        score = result.fitness_result.fitness_score
+        if result.fitness_result.partial and score > 0:
+            score *= self.config.watchdog.partial_fitness_discount
+        return score
+
     def crossover(self, scenario_a: BaseScenario, scenario_b: BaseScenario):
         if isinstance(scenario_a, CompositeScenario) and isinstance(scenario_b, CompositeScenario):
             # Handle both scenario are composite
@@ -331,6 +437,7 @@ class GeneticAlgorithm:
 
     def save(self):
         '''Save run results'''
+        self.wait_for_pending_results()
         # TODO: Create a single result file (results.json) that contains summary of all the results
         self.generations_reporter.save_best_generations(self.best_of_generation)
         self.generations_reporter.save_best_generation_graph(self.best_of_generation)
@@ -0,0 +1,138 @@
+'''
+This module samples fitness SLO queries in background so that scenario fitness can be
+calculated from a local time series instead of querying Prometheus for every scenario.
+
+Working Details:
+1. While a generation is being evaluated, every fitness query is sampled each `interval` seconds.
+2. Samples are kept in memory for `retention` seconds.
+3. Every sample also records the time of the newest scrape Prometheus had ingested when it was taken,
+   since "now" queries lag behind by up to a scrape interval.
+4. Point fitness reads the newest sample at or before the scenario start and the first sample taken at
+   or after the end whose ingested data reaches the end, and sums the differences per series like
+   KrknRunner.calculate_point_fitness. Range fitness without "$range$" takes the maximum across series
+   of that end sample.
+5. If there is no such sample close enough (within 1.5 x interval plus a scrape interval of the
+   timestamp), callers fall back to Prometheus, which checks freshness and retries.
+
+Queries that depend on the scenario ("$namespace$") or on the test window ("$range$") are not sampled.
+'''
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from krkn_ai.models.config import BaselineSamplerConfig, FitnessFunction
+from krkn_ai.utils.logger import get_logger
+from krkn_ai.utils.prometheus import PrometheusClient
+
+logger = get_logger(__name__)
+
+# Sample is (timestamp, value per series keyed by its labels, newest ingested scrape or None)
+Sample = Tuple[float, Dict[Tuple[Tuple[str, str], ...], float], Optional[float]]
+
+
+class BaselineSampler:
+    def __init__(self, config: BaselineSamplerConfig, fitness_function: FitnessFunction, prom_client: PrometheusClient):
+        self.config = config
+        self.prom_client = prom_client
+        self.scrape_interval = fitness_function.scrape_interval
+        self.queries = self.__sampled_queries(fitness_function)
+        max_samples = max(int(config.retention / max(config.interval, 1)), 1)
+        self._series: Dict[str, Deque[Sample]] = {query: deque(maxlen=max_samples) for query in self.queries}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None or len(self.queries) == 0:
+            return
+        logger.debug("Starting baseline sampler for %d queries", len(self.queries))
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self.__run, name="krkn-ai-baseline-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+
+    def value_before(self, query: str, timestamp: float) -> Optional[Sample]:
+        '''Newest sample taken at or before timestamp.'''
+        with self._lock:
+            samples = [x for x in self._series.get(query, []) if x[0] <= timestamp]
+        if samples and timestamp - samples[-1][0] <= self.__max_gap():
+            return samples[-1]
+        return None
+
+    def value_after(self, query: str, timestamp: float) -> Optional[Sample]:
+        '''Oldest sample taken at or after timestamp whose ingested data reaches timestamp.'''
+        with self._lock:
+            samples = [
+                x for x in self._series.get(query, [])
+                if x[0] >= timestamp and x[2] is not None and x[2] >= timestamp
+            ]
+        if samples and samples[0][0] - timestamp <= self.__max_gap() + self.scrape_interval:
+            return samples[0]
+        return None
+
+    def point_value(self, query: str, start: float, end: float) -> Optional[float]:
+        '''
+        Difference between samples at start and end summed across series, None if samples are missing.
+        Series that appeared during the test start from zero, series that disappeared are skipped.
+        '''
+        value_at_beginning = self.value_before(query, start)
+        value_at_end = self.value_after(query, end)
+        if value_at_beginning is None or value_at_end is None:
+            return None
+        return sum([
+            value - value_at_beginning[1].get(series, 0.0)
+            for series, value in value_at_end[1].items()
+        ])
+
+    def max_value(self, query: str, end: float) -> Optional[float]:
+        '''Maximum across series of the sample at end, None if samples are missing.'''
+        value_at_end = self.value_after(query, end)
+        if value_at_end is None:
+            return None
+        return max(value_at_end[1].values())
+
+    def __max_gap(self) -> float:
+        return 1.5 * self.config.interval
+
+    def __run(self):
+        next_sample = time.monotonic()
+        while not self._stop_event.is_set():
+            # Read before the queries, so scrapes up to this time are included in their results
+            ingested = self.prom_client.latest_sample_time()
+            for query in self.queries:
+                self.__sample(query, ingested)
+            next_sample += self.config.interval
+            self._stop_event.wait(max(next_sample - time.monotonic(), 0))
+
+    def __sample(self, query: str, ingested: Optional[float]):
+        try:
+            result = self.prom_client.instant_query(query)
+        except Exception as e:
+            logger.debug("Unable to sample %s: %s", query, e)
+            return
+        if not result:
+            return
+        values = {
+            tuple(sorted(series.get("metric", {}).items())): float(series["value"][1])
+            for series in result
+        }
+        sample = (float(result[0]["value"][0]), values, ingested)
+        with self._lock:
+            self._series[query].append(sample)
+
+    def __sampled_queries(self, fitness_function: FitnessFunction) -> List[str]:
+        if fitness_function.query is not None:
+            queries = [fitness_function.query]
+        else:
+            queries = [item.query for item in fitness_function.items]
+        return [
+            query for query in dict.fromkeys(queries)
+            if "$namespace$" not in query and "$range$" not in query
+        ]
@@ -0,0 +1,50 @@
+'''
+This module collects health check samples before a scenario runs, to compare response times under chaos against.
+
+Working Details:
+1. Before a scenario, health check URLs are probed for `duration` seconds with the regular watcher
+   (including any load profile, so both distributions are measured under the same traffic).
+2. The baseline is reused for following scenarios until it is older than `max_age` seconds.
+3. Scoring compares successful response times of the scenario with the baseline, see
+   HealthCheckWatcher.summarize_baseline_shift.
+'''
+import threading
+import time
+from typing import Dict, Optional
+
+from krkn_ai.chaos_engines.health_check_watcher import HealthCheckWatcher
+from krkn_ai.models.config import HealthCheckConfig
+from krkn_ai.models.health_check_samples import HealthCheckSamples
+from krkn_ai.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class HealthCheckBaseline:
+    def __init__(self, config: HealthCheckConfig):
+        self.config = config
+        self._samples: Dict[str, HealthCheckSamples] = {}
+        self._collected_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Dict[str, HealthCheckSamples]:
+        '''Baseline samples per URL, collected now unless a recent one is cached.'''
+        if not self.config.baseline.enable or len(self.config.applications) == 0:
+            return {}
+        # Callers arriving while the baseline is collected wait for it instead of collecting another one
+        with self._lock:
+            if self._collected_at is not None:
+                age = time.monotonic() - self._collected_at
+                if age <= self.config.baseline.max_age:
+                    logger.debug("Reusing health check baseline collected %.0f seconds ago", age)
+                    return self._samples
+
+            logger.info("Collecting health check baseline for %d seconds", self.config.baseline.duration)
+            # A failing endpoint shouldn't cut the baseline short
+            watcher = HealthCheckWatcher(self.config.model_copy(update={"stop_watcher_on_failure": False}))
+            watcher.run()
+            time.sleep(self.config.baseline.duration)
+            watcher.stop()
+            self._samples = watcher.get_results()
+            self._collected_at = time.monotonic()
+            return self._samples
@@ -2,131 +2,295 @@
 This module is used to run health checks for the application URLs and keep track of the results.
 
 Working Details:
-1. Asynchronous health check for each URL.
-2. Keep track of the results in a list.
+1. Health checks of all URLs run on a single asyncio event loop in a background thread,
+   each URL on its own schedule, with at most max_concurrency requests in flight.
+   Probes are started at a fixed rate on the monotonic clock (optionally jittered), a probe that
+   runs past the next start is counted as missed deadlines instead of lowering the rate.
+2. Keep track of the results in columnar HealthCheckSamples per URL.
 3. Once there is signal from main thread that the test is complete, or in case the api status check fails, then the watcher stops.
+   Sleeping and in-flight probes are cancelled immediately, interrupted probes are not recorded.
 4. Return the results to the main thread by seperate method.
+5. URLs with a load profile also get constant rate load from a LoadGenerator on the same event loop.
 '''
 
-from collections import defaultdict
+import asyncio
 import threading
 import time
-import requests
-from typing import List, Dict
+from typing import Dict, List, Optional, Tuple
 import numpy as np
 
+from krkn_ai.chaos_engines.load_generator import LoadGenerator
+from krkn_ai.utils.async_http import HttpSession
 from krkn_ai.utils.logger import get_logger
-from krkn_ai.models.config import HealthCheckApplicationConfig, HealthCheckConfig, HealthCheckResult
+from krkn_ai.utils.rng import rng
+from krkn_ai.models.config import HealthCheckApplicationConfig, HealthCheckConfig, LoadTestResult
+from krkn_ai.models.health_check_samples import MIN_OUTLIER_SAMPLES, HealthCheckSampleFile, HealthCheckSamples
 
 logger = get_logger(__name__)
 
 class HealthCheckWatcher:
-    def __init__(self, config: HealthCheckConfig):
+    def __init__(self, config: HealthCheckConfig, path: Optional[str] = None):
+        '''
+        path: Stream probes to this CSV file instead of keeping them in memory.
+        '''
         self.config = config
+        self.path = path
+        self._sample_file: Optional[HealthCheckSampleFile] = None
+        self._abort_event: Optional[threading.Event] = None
+        self.triggered: Optional[str] = None  # URL that failed with stop_watcher_on_failure
         self._stop_event = threading.Event()
-        self._threads: List[threading.Thread] = []
-        # Each thread stores results in its own list - ZERO contention!
-        self._thread_results = {}
+        self._loop: asyncio.AbstractEventLoop = None
+        self._thread: threading.Thread = None
+        # Wakes up sleeping health checks on stop, created inside the event loop
+        self._async_stop: asyncio.Event = None
+        self._tasks: List[asyncio.Task] = []
+        # Only written from the event loop thread
+        self._results: Dict[str, HealthCheckSamples] = {}
+        self._missed_deadlines: Dict[str, int] = {}
+        self._load_generators: Dict[str, LoadGenerator] = {}
 
-    def run(self):
-        # Start a thread for each health check
+    def run(self, abort_event: Optional[threading.Event] = None):
+        '''
+        abort_event: Set when a health check fails with stop_watcher_on_failure, to terminate the running scenario.
+        '''
+        if len(self.config.applications) == 0:
+            return
+        self._abort_event = abort_event
         logger.debug(f"Starting health check watcher for {len(self.config.applications)} applications")
+        if self.path is not None:
+            self._sample_file = HealthCheckSampleFile(self.path)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_until_complete,
+            args=(self.__watch(),),
+            name="krkn-ai-health-checks",
+            daemon=True,
+        )
+        self._thread.start()
+
+    async def __watch(self):
+        self._async_stop = asyncio.Event()
+        if self._stop_event.is_set():
+            return
+        semaphore = asyncio.Semaphore(max(self.config.max_concurrency, 1))
+        self._tasks = [
+            asyncio.ensure_future(self.run_health_check(health_check, semaphore))
+            for health_check in self.config.applications
+        ]
         for health_check in self.config.applications:
-            t = threading.Thread(target=self.run_health_check, args=(health_check,))
-            t.start()
-            self._threads.append(t)
-
-    def run_health_check(self, health_check: HealthCheckApplicationConfig):
-        # Each thread gets its own private results list
-        thread_id = threading.current_thread().ident
-        thread_results = []
-        self._thread_results[thread_id] = (health_check.url, thread_results)
-        
-        # Simple polling loop, stops when stop() is called
-        while not self._stop_event.is_set():
-            try:
-                resp = requests.get(health_check.url, timeout=health_check.timeout)
-                status = resp.status_code
-                success = (status == 200)
-                error = None
-            except Exception as e:
-                status = -1
-                success = False
-                resp = None
-                error = str(e)
-
-            result = HealthCheckResult(
-                name=health_check.name,
-                status_code=status,
-                success=success,
-                error=error,
-                response_time=resp.elapsed.total_seconds() if resp is not None else -1
+            if health_check.load is not None:
+                generator = LoadGenerator(health_check, self._async_stop)
+                self._load_generators[health_check.url] = generator
+                self._tasks.append(asyncio.ensure_future(generator.run()))
+        # Cancelled checks are expected on stop
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def run_health_check(self, health_check: HealthCheckApplicationConfig, semaphore: asyncio.Semaphore):
+        # Each endpoint keeps its own keep-alive connections
+        session = HttpSession()
+        samples = self._results.setdefault(
+            health_check.url,
+            HealthCheckSamples(
+                health_check.name, online=self.config.online_scoring, file=self._sample_file, url=health_check.url
             )
-            
-            # Store in thread-private list - NO LOCKS, NO CONTENTION!
-            thread_results.append(result)
+        )
+        self._missed_deadlines.setdefault(health_check.url, 0)
+        loop = asyncio.get_running_loop()
+        interval = max(health_check.interval, 0.001)
+        next_start = loop.time()
+        try:
+            # Fixed rate polling loop, stops when stop() is called
+            while not self._stop_event.is_set():
+                async with semaphore:
+                    success = await self.__check(session, health_check, samples)
+
+                if not success and self.config.stop_watcher_on_failure:
+                    self.triggered = health_check.url
+                    if self._abort_event is not None:
+                        logger.warning("Health check of %s failed, aborting scenario", health_check.url)
+                        self._abort_event.set()
+                    self.__stop_from_loop()
+                    break
+
+                next_start += interval
+                now = loop.time()
+                if now > next_start:
+                    # Probe took longer than the interval, skip the start times that passed
+                    missed = int((now - next_start) // interval) + 1
+                    self._missed_deadlines[health_check.url] += missed
+                    next_start += missed * interval
+                delay = next_start - now
+                if self.config.jitter > 0:
+                    delay += rng.uniform(0, self.config.jitter * interval)
+
+                try:
+                    await asyncio.wait_for(self._async_stop.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            await session.close()
 
-            if not success and self.config.stop_watcher_on_failure:
-                self._stop_event.set()
-                break
+    async def __check(
+        self, session: HttpSession, health_check: HealthCheckApplicationConfig, samples: HealthCheckSamples
+    ) -> bool:
+        connect_time, ttfb = -1, -1
+        try:
+            resp = await session.get(health_check.url, timeout=health_check.timeout)
+            status = resp.status_code
+            # Behaviour change: the configured status_code is honoured, earlier releases expected 200
+            # regardless of it, so endpoints configured with another status_code used to always fail
+            success = (status == health_check.status_code)
+            error = None
+            connect_time, ttfb, response_time = resp.connect_time, resp.ttfb, resp.total
+        except asyncio.TimeoutError:
+            status, success, response_time = -1, False, -1
+            error = f"Timed out after {health_check.timeout} seconds"
+        except Exception as e:
+            status, success, response_time = -1, False, -1
+            error = str(e)
 
-            time.sleep(health_check.interval)
+        samples.append(
+            timestamp=time.time_ns(),
+            response_time=response_time,
+            status_code=status,
+            success=success,
+            error=error,
+            connect_time=connect_time,
+            ttfb=ttfb,
+        )
+        return success
+
+    def __stop_from_loop(self):
+        self._stop_event.set()
+        if self._async_stop is not None:
+            self._async_stop.set()
+        # Don't wait for in-flight probes to finish or time out
+        current = asyncio.current_task()
+        for task in self._tasks:
+            if task is not current:
+                task.cancel()
 
     def stop(self):
         logger.debug(f"Stopping health check watcher")
         self._stop_event.set()
-        for t in self._threads:
-            t.join()
-
-    def get_results(self) -> Dict[str, List[HealthCheckResult]]:
-        """Aggregate results from all threads - called after threads complete"""
-        results = defaultdict(list)
-        
-        # Each thread has its own URL and results list
-        for url, thread_results in self._thread_results.values():
-            results[url].extend(thread_results)
-                
-        return dict(results)
-
-    def summarize_success_rate(self, results: Dict[str, List[HealthCheckResult]]) -> float:
+        if self._loop is None:
+            return
+        self._loop.call_soon_threadsafe(self.__stop_from_loop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+        if self._sample_file is not None:
+            self._sample_file.close()
+        for url, missed in self._missed_deadlines.items():
+            if missed > 0:
+                logger.warning("Health check of %s missed %d deadlines, probes took longer than interval", url, missed)
+
+    def get_load_results(self) -> Dict[str, LoadTestResult]:
+        """Summary of generated load per URL - called after watcher is stopped"""
+        return {url: generator.summary() for url, generator in self._load_generators.items()}
+
+    def get_missed_deadlines(self) -> Dict[str, int]:
+        """Scheduled probes per URL that were skipped because the previous probe was still running"""
+        return dict(self._missed_deadlines)
+
+    def get_results(self) -> Dict[str, HealthCheckSamples]:
+        """Results per URL - called after watcher is stopped"""
+        return dict(self._results)
+
+    def summarize_success_rate(self, results: Dict[str, HealthCheckSamples]) -> float:
         '''
         Overall fail score across different URL results
         '''
-        # Flatten all results from all URLs into a single list
-        all_results = []
-        for result_list in results.values():
-            all_results.extend(result_list)
-        
-        total = len(all_results)
+        total = sum([len(samples) for samples in results.values()])
         if total == 0:
             return 0
-        failed = sum(1 for r in all_results if not r.success)
-        score = (failed / total) * 10 
+        failed = total - sum([samples.success_count for samples in results.values()])
+        score = (failed / total) * 10
         logger.debug(f"Health check failure rate score: {score}")
         return score
     
-    def summarize_response_time(self, health_check_results: Dict[str, List[HealthCheckResult]]) -> float:
+    def summarize_response_time(self, health_check_results: Dict[str, HealthCheckSamples]) -> float:
+        '''
+        Share of response time outliers (above Q3 + 1.5 * IQR of each URL) across URL results.
+        URLs with too few successful probes to calculate outliers are skipped.
+        '''
         score = 0
         total = 0
-        for _, results in health_check_results.items():
-            response_times = []
-            for result in results:
-                if result.success:
-                    response_times.append(result.response_time)
-            
-            if len(response_times) < 4: # Not enough data to calculate outliers
-                return 0
-
-            q1 = np.percentile(response_times, 25)
-            q3 = np.percentile(response_times, 75)
-            iqr = q3 - q1
-            upper_bound = q3 + (1.5 * iqr)
-            
-            outliers = [t for t in response_times if t > upper_bound]
-            score += len(outliers)
+        for url, results in health_check_results.items():
+            count, outliers = self.__count_outliers(results)
+            if count < MIN_OUTLIER_SAMPLES: # Not enough data to calculate outliers
+                logger.debug("Not enough successful health checks of %s to calculate outliers", url)
+                continue
+            score += outliers
             total += len(results)
         if total == 0:
             return 0
         score = (score / total) * 10
         logger.debug(f"Response time outlier score: {score}")
         return score
+
+    def summarize_baseline_shift(
+        self,
+        health_check_results: Dict[str, HealthCheckSamples],
+        baseline: Dict[str, HealthCheckSamples],
+    ) -> float:
+        '''
+        How consistently response times are slower than the pre-chaos baseline, averaged across URLs.
+        Per URL this is the probability that a probe during chaos is slower than a baseline probe
+        (Mann-Whitney U / area under ROC curve), 0.5 means no change and is scored 0, 1.0 means every
+        probe was slower than every baseline probe and is scored 10.
+        '''
+        scores = []
+        for url, results in health_check_results.items():
+            if url not in baseline:
+                continue
+            results, baseline_results = results.load(), baseline[url].load()
+            response_times = results.column("response_time")[results.column("success")]
+            baseline_times = np.sort(baseline_results.column("response_time")[baseline_results.column("success")])
+            if len(response_times) < MIN_OUTLIER_SAMPLES or len(baseline_times) < MIN_OUTLIER_SAMPLES:
+                logger.debug("Not enough successful health checks of %s to compare with baseline", url)
+                continue
+            # Baseline probes faster than each probe, ties count half
+            below = np.searchsorted(baseline_times, response_times, side="left")
+            not_above = np.searchsorted(baseline_times, response_times, side="right")
+            slower = np.mean((below + not_above) / 2) / len(baseline_times)
+            scores.append(max(slower - 0.5, 0) * 2 * 10)
+        if len(scores) == 0:
+            return 0
+        score = float(np.mean(scores))
+        logger.debug(f"Response time baseline shift score: {score}")
+        return score
+
+    def summarize_load_throughput(self, load_results: Dict[str, LoadTestResult]) -> float:
+        '''
+        Shortfall of achieved vs target RPS, worst across URLs with generated load
+        '''
+        score = 0
+        for result in load_results.values():
+            if result.target_rps > 0:
+                score = max(score, (1 - min(result.achieved_rps / result.target_rps, 1)) * 10)
+        logger.debug(f"Load throughput score: {score}")
+        return score
+
+    def summarize_load_latency(self, load_results: Dict[str, LoadTestResult]) -> float:
+        '''
+        p99 latency under load relative to request timeout, worst across URLs with generated load
+        '''
+        score = 0
+        for result in load_results.values():
+            if result.timeout > 0:
+                score = max(score, min(result.p99 / result.timeout, 1) * 10)
+        logger.debug(f"Load latency score: {score}")
+        return score
+
+    def __count_outliers(self, results: HealthCheckSamples) -> Tuple[int, int]:
+        '''Returns number of successful probes and how many of them are outliers'''
+        if results.outliers is not None:
+            # Maintained while probes arrived
+            return results.outliers.count, results.outliers.outliers
+        results = results.load()
+        response_times = results.column("response_time")[results.column("success")]
+        if len(response_times) < MIN_OUTLIER_SAMPLES:
+            return len(response_times), 0
+        q1, q3 = np.percentile(response_times, [25, 75])
+        return len(response_times), int(np.count_nonzero(response_times > q3 + 1.5 * (q3 - q1)))
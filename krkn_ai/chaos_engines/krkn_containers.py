@@ -0,0 +1,78 @@
+'''
+This module stops krkn containers left running when a krknctl run is terminated early.
+
+Working Details:
+1. krknctl starts scenario containers itself, terminating the krknctl process doesn't stop them.
+2. Before a run, containers of the scenario images (matched by krkn-hub image tag) are listed with podman.
+3. When the run is terminated, containers of those images that were started since are stopped.
+4. When they can't be found (e.g. podman is not the container runtime), callers are told so they
+   can warn that chaos may still be running and wait for the cluster to recover.
+'''
+from typing import List, Optional, Set, Tuple
+
+from krkn_ai.models.scenario.base import BaseScenario, CompositeScenario, Scenario
+from krkn_ai.utils import run_shell
+from krkn_ai.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+PODMAN_PS_COMMAND = "podman ps -a --format '{{.ID}} {{.Image}} {{.State}}'"
+
+PODMAN_STOP_TEMPLATE = "podman stop -t {timeout} {ids}"
+
+
+def _image_tags(scenario: BaseScenario) -> Set[str]:
+    if isinstance(scenario, CompositeScenario):
+        return _image_tags(scenario.scenario_a) | _image_tags(scenario.scenario_b)
+    if isinstance(scenario, Scenario) and scenario.krknhub_image:
+        return {scenario.krknhub_image.split(":")[-1]}
+    return set()
+
+
+class KrknContainerTracker:
+    def __init__(self, scenarios: List[BaseScenario], stop_timeout: int = 10):
+        self.tags: Set[str] = set()
+        for scenario in scenarios:
+            self.tags |= _image_tags(scenario)
+        self.stop_timeout = stop_timeout
+        self._before = self.__list()
+
+    def stop(self) -> bool:
+        '''
+        Stop containers of the scenario images started after the tracker was created.
+        Returns whether the run's containers were found and none of them is left running.
+        Scenarios of the same image running in parallel can't be told apart and are stopped as well.
+        '''
+        containers = self.__list()
+        if self._before is None or containers is None:
+            return False
+        started = [(id, state) for id, state in containers if id not in {x for x, _ in self._before}]
+        if len(started) == 0:
+            logger.warning("Unable to find krkn containers of images %s", ", ".join(sorted(self.tags)))
+            return False
+
+        running = [id for id, state in started if state.lower() == "running"]
+        if len(running) == 0:
+            return True
+        logger.info("Stopping krkn containers %s", ", ".join(running))
+        log, returncode = run_shell(
+            PODMAN_STOP_TEMPLATE.format(timeout=self.stop_timeout, ids=" ".join(running)),
+            do_not_log=True,
+        )
+        if returncode != 0:
+            logger.warning("Unable to stop krkn containers: %s", log.strip())
+            return False
+        return True
+
+    def __list(self) -> Optional[List[Tuple[str, str]]]:
+        '''(id, state) of containers running one of the scenario images, None if podman is not available.'''
+        log, returncode = run_shell(PODMAN_PS_COMMAND, do_not_log=True)
+        if returncode != 0:
+            logger.debug("Unable to list containers: %s", log.strip())
+            return None
+        containers = []
+        for line in log.splitlines():
+            fields = line.split()
+            if len(fields) >= 3 and fields[1].split(":")[-1] in self.tags:
+                containers.append((fields[0], fields[2]))
+        return containers
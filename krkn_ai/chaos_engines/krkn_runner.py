@@ -2,19 +2,40 @@ import os
 import json
 import datetime
 import tempfile
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from typing import Dict, List, Optional
 
-from krkn_lib.prometheus.krkn_prometheus import KrknPrometheus
+from krkn_ai.chaos_engines.baseline_sampler import BaselineSampler
+from krkn_ai.chaos_engines.health_check_baseline import HealthCheckBaseline
 from krkn_ai.chaos_engines.health_check_watcher import HealthCheckWatcher
-from krkn_ai.models.app import CommandRunResult, FitnessResult, FitnessScoreResult, KrknRunnerType
-from krkn_ai.models.config import ConfigFile, FitnessFunctionType
+from krkn_ai.chaos_engines.krkn_containers import KrknContainerTracker
+from krkn_ai.chaos_engines.range_aggregators import aggregate, range_selector, range_step, series_matrix
+from krkn_ai.chaos_engines.recovery_gate import RecoveryGate
+from krkn_ai.chaos_engines.slo_monitor import SLOMonitor
+from krkn_ai.chaos_engines.telemetry import (
+    StartupTimer,
+    extract_chaos_data,
+    get_chaos_window,
+    get_krkn_scenario_type,
+    get_telemetry_scenarios,
+    is_dummy_scenario,
+    match_telemetry_scenarios,
+)
+from krkn_ai.chaos_engines.warm_runner import WarmContainer, WarmContainerPool
+from krkn_ai.chaos_engines.watchdog import ScenarioWatchdog, get_expected_duration
+from krkn_ai.models.app import CommandRunResult, FitnessResult, FitnessScoreResult, KrknRunnerType, RunAbortReason
+from krkn_ai.models.config import ConfigFile, FitnessFunctionType, RangeAggregator
+from krkn_ai.models.health_check_samples import HealthCheckSamples
 from krkn_ai.models.custom_errors import FitnessFunctionCalculationError
 from krkn_ai.models.scenario.base import Scenario, BaseScenario, CompositeDependency, CompositeScenario
+from krkn_ai.models.scenario.blast_radius import get_blast_radius
 from krkn_ai.models.scenario.factory import ScenarioFactory
-from krkn_ai.utils import run_shell
+from krkn_ai.utils import id_generator, run_shell
 from krkn_ai.utils.fs import env_is_truthy
 from krkn_ai.utils.logger import get_logger
-from krkn_ai.utils.prometheus import create_prometheus_client
+from krkn_ai.utils.prometheus import create_prometheus_client, series_key
 from krkn_ai.utils.rng import rng
 
 logger = get_logger(__name__)
@@ -29,6 +50,9 @@ KRKNCTL_GRAPH_RUN_TEMPLATE = "krknctl graph run {path} --kubeconfig {kubeconfig}
 
 KRKN_HUB_FAILURE_SCORE = 5
 
+batch_id_generator = id_generator()
+health_check_file_id_generator = id_generator()
+
 
 class KrknRunner:
     def __init__(
@@ -38,14 +62,33 @@ class KrknRunner:
         runner_type: KrknRunnerType = None,
     ):
         self.config = config
-        self.prom_client = create_prometheus_client(self.config.kubeconfig_file_path)
+        self.prom_client = create_prometheus_client(
+            self.config.kubeconfig_file_path,
+            self.config.prometheus_cache,
+            align=self.config.fitness_function.scrape_interval,
+        )
         self.output_dir = output_dir
+        self.recovery_gate = RecoveryGate(self.config, self.prom_client)
+        self.health_check_baseline = HealthCheckBaseline(self.config.health_checks)
+        self.baseline_sampler = None
+        if self.config.baseline_sampler.enable:
+            self.baseline_sampler = BaselineSampler(
+                self.config.baseline_sampler, self.config.fitness_function, self.prom_client
+            )
         if runner_type is None:
             self.runner_type = self.__check_runner_availability()
         else:
             logger.debug("Using user provided runner type: %s", runner_type)
             self.runner_type = runner_type
 
+        # Reuse long-lived krkn-hub containers across scenarios
+        self.warm_pool = None
+        if self.config.warm_runner.enable:
+            if self.runner_type == KrknRunnerType.HUB_RUNNER:
+                self.warm_pool = WarmContainerPool(self.config.warm_runner, self.config.kubeconfig_file_path)
+            else:
+                logger.warning("Warm runner is only supported with krknhub runner, ignoring.")
+
 
     def __check_runner_availability(self):
         # Check if krknctl is available
@@ -73,6 +116,15 @@ class KrknRunner:
             return KrknRunnerType.HUB_RUNNER
 
     def run(self, scenario: BaseScenario, generation_id: int) -> CommandRunResult:
+        """Execute scenario and calculate its fitness"""
+        result = self.execute(scenario, generation_id)
+        return self.evaluate(result)
+
+    def execute(self, scenario: BaseScenario, generation_id: int) -> CommandRunResult:
+        """
+        Execute scenario and collect run data without calculating fitness.
+        Fitness can be calculated later with evaluate(), e.g. while next scenario is running.
+        """
         logger.info("Running scenario: %s", scenario)
 
         start_time = datetime.datetime.now()
@@ -80,46 +132,355 @@ class KrknRunner:
         # Generate command krkn executor command
         log, returncode = None, None
         command = ""
+        warm_container = None
         if isinstance(scenario, CompositeScenario):
             command = self.graph_command(scenario)
         elif isinstance(scenario, Scenario):
-            command = self.runner_command(scenario)
+            if self.warm_pool is not None:
+                warm_container = self.warm_pool.acquire(scenario.krknhub_image)
+            command = self.runner_command(scenario, warm_container=warm_container)
         else:
             raise NotImplementedError("Scenario unable to run")
 
-        health_check_watcher = HealthCheckWatcher(self.config.health_checks)
+        health_check_watcher = HealthCheckWatcher(self.config.health_checks, self.__health_check_path(generation_id))
+        health_check_baseline = {}
+        recovery_duration = 0.0
+        abort_reason = None
+        time_saved = 0.0
+        startup_duration = None
+        run_completed = False
+        watchdog, slo_monitor = None, None
 
-        # Run command and fetch result
-        if env_is_truthy('MOCK_RUN'):
-            # Used for running mock tests
-            log, returncode = "", 0
-        else:
-            # TODO: How to capture logs from composite run scenario
-            
-            # Start watching application urls for health checks
-            health_check_watcher.run()
-
-            # Run command
-            log, returncode = run_shell(command, do_not_log=True)
-            
-            # Extract return code from run log which is part of telemetry data present in the log
-            returncode = self.__extract_returncode_from_run(log, returncode)
-            logger.info("Krkn scenario return code: %d", returncode)
-
-            # Stop watching application urls for health checks
+        try:
+            # Run command and fetch result
+            if env_is_truthy('MOCK_RUN'):
+                # Used for running mock tests
+                log, returncode = "", 0
+            else:
+                # TODO: How to capture logs from composite run scenario
+
+                # Probe application urls without chaos to compare response times against
+                health_check_baseline = self.health_check_baseline.get()
+
+                # Sample SLOs before chaos to compare recovery against
+                if self.config.recovery.enable:
+                    recovery_baseline = self.recovery_gate.capture_baseline()
+
+                # Run command, terminate it if it runs past its deadline, breaks an SLO or fails a health check
+                stop_event = self.__new_stop_event(with_slo_monitor=True)
+
+                # Start watching application urls for health checks
+                health_check_watcher.run(abort_event=self.__health_check_abort_event(stop_event))
+
+                watchdog = self.__start_watchdog([scenario], stop_event)
+                slo_monitor = self.__start_slo_monitor(scenario, stop_event)
+                container_tracker = self.__track_krkn_containers([scenario], command, stop_event)
+                startup_timer = StartupTimer()
+                run_start = time.monotonic()
+                log, returncode = run_shell(command, do_not_log=True, stop_event=stop_event, on_line=startup_timer)
+                startup_duration = startup_timer.duration
+                if slo_monitor is not None:
+                    slo_monitor.stop()
+                if watchdog is not None:
+                    watchdog.cancel()
+                    if watchdog.expired:
+                        abort_reason = RunAbortReason.WATCHDOG_TIMEOUT
+                if abort_reason is None and slo_monitor is not None and slo_monitor.triggered is not None:
+                    abort_reason = RunAbortReason.SLO_THRESHOLD
+                    time_saved = self.__time_saved([scenario], run_start)
+                    logger.info("Scenario ended early on SLO threshold, saved ~%.0f seconds", time_saved)
+                if abort_reason is None and health_check_watcher.triggered is not None and self.__is_set(stop_event):
+                    abort_reason = RunAbortReason.HEALTH_CHECK_FAILURE
+                    time_saved = self.__time_saved([scenario], run_start)
+                    logger.info("Scenario aborted on health check failure, saved ~%.0f seconds", time_saved)
+                if self.__is_set(stop_event):
+                    self.__stop_krkn_containers(container_tracker)
+
+                # Extract return code from run log which is part of telemetry data present in the log
+                returncode = self.__extract_returncode_from_run(log, returncode)
+                logger.info("Krkn scenario return code: %d", returncode)
+
+                # Wait for cluster to recover instead of a fixed krkn wait duration
+                if self.config.recovery.enable:
+                    recovery_duration = self.recovery_gate.wait([scenario], recovery_baseline)
+
+                # Stop watching application urls for health checks
+                health_check_watcher.stop()
+            run_completed = True
+        finally:
+            # Don't leave timers and watcher threads running into the next scenario when the run failed
+            if slo_monitor is not None:
+                slo_monitor.stop()
+            if watchdog is not None:
+                watchdog.cancel()
+            health_check_watcher.stop()
+            if warm_container is not None:
+                if run_completed and abort_reason is None:
+                    self.warm_pool.release(warm_container)
+                else:
+                    # Krkn might still be running inside the container, terminating "podman exec" doesn't stop it
+                    self.warm_pool.discard(warm_container)
+        end_time = datetime.datetime.now()
+        logger.debug("Krkn startup duration: %s", startup_duration)
+
+        chaos_start_time, chaos_end_time = get_chaos_window(log) or (None, None)
+        logger.debug("Chaos window: %s - %s", chaos_start_time, chaos_end_time)
+
+        return CommandRunResult(
+            generation_id=generation_id,
+            scenario=scenario,
+            cmd=command,
+            log=log,
+            returncode=returncode,
+            start_time=start_time,
+            end_time=end_time,
+            chaos_start_time=chaos_start_time,
+            chaos_end_time=chaos_end_time,
+            fitness_result=FitnessResult(),
+            health_check_results=health_check_watcher.get_results(),
+            load_results=health_check_watcher.get_load_results(),
+            health_check_baseline=health_check_baseline,
+            recovery_duration=recovery_duration,
+            abort_reason=abort_reason,
+            time_saved=time_saved,
+            startup_duration=startup_duration
+        )
+
+    def run_batch(self, scenarios: List[Scenario], generation_id: int) -> List[CommandRunResult]:
+        """
+        Execute independent scenarios together in a single krknctl graph run.
+        Scenarios run in parallel under a dummy root node, which amortizes the fixed cost of a run.
+
+        Run window and return code of each scenario are attributed from the telemetry entry
+        matching its scenario type and parameters, scenarios without an unambiguous match
+        use the batch window. Results are not evaluated, use evaluate() to calculate fitness.
+        """
+        logger.info("Running batch of %d scenarios: %s", len(scenarios), ", ".join([str(x) for x in scenarios]))
+
+        start_time = datetime.datetime.now()
+        command = self.batch_graph_command(scenarios)
+        health_check_watcher = HealthCheckWatcher(self.config.health_checks, self.__health_check_path(generation_id))
+        health_check_baseline = {}
+        recovery_duration = 0.0
+        abort_reason = None
+        time_saved = 0.0
+        startup_duration = None
+
+        watchdog = None
+
+        try:
+            if env_is_truthy('MOCK_RUN'):
+                # Used for running mock tests
+                log, returncode = "", 0
+            else:
+                health_check_baseline = self.health_check_baseline.get()
+                if self.config.recovery.enable:
+                    recovery_baseline = self.recovery_gate.capture_baseline()
+
+                stop_event = self.__new_stop_event(with_slo_monitor=False)
+                health_check_watcher.run(abort_event=self.__health_check_abort_event(stop_event))
+                watchdog = self.__start_watchdog(
+                    [ScenarioFactory.create_dummy_scenario()] + scenarios, stop_event
+                )
+                container_tracker = self.__track_krkn_containers(
+                    [ScenarioFactory.create_dummy_scenario()] + scenarios, command, stop_event
+                )
+                startup_timer = StartupTimer()
+                run_start = time.monotonic()
+                log, returncode = run_shell(command, do_not_log=True, stop_event=stop_event, on_line=startup_timer)
+                startup_duration = startup_timer.duration
+                if watchdog is not None:
+                    watchdog.cancel()
+                    if watchdog.expired:
+                        abort_reason = RunAbortReason.WATCHDOG_TIMEOUT
+                if abort_reason is None and health_check_watcher.triggered is not None and self.__is_set(stop_event):
+                    abort_reason = RunAbortReason.HEALTH_CHECK_FAILURE
+                    time_saved = self.__time_saved(scenarios, run_start)
+                    logger.info("Batch aborted on health check failure, saved ~%.0f seconds", time_saved)
+                if self.__is_set(stop_event):
+                    self.__stop_krkn_containers(container_tracker)
+                logger.info("Krkn batch return code: %d", returncode)
+
+                if self.config.recovery.enable:
+                    recovery_duration = self.recovery_gate.wait(scenarios, recovery_baseline)
+
+                health_check_watcher.stop()
+        finally:
+            if watchdog is not None:
+                watchdog.cancel()
             health_check_watcher.stop()
 
         end_time = datetime.datetime.now()
+        health_check_results = health_check_watcher.get_results()
+        # Load is generated for the whole batch, it can't be attributed to a single scenario
+        load_results = health_check_watcher.get_load_results()
+
+        # Graph nodes run in parallel and print telemetry in completion order, skip the dummy root node
+        telemetry = match_telemetry_scenarios(
+            [x for x in get_telemetry_scenarios(extract_chaos_data(log)) if not is_dummy_scenario(x)],
+            [(get_krkn_scenario_type(x.krknctl_name), self.__generate_scenario_json(x)["env"]) for x in scenarios],
+        )
+        unmatched = [str(scenario) for scenario, x in zip(scenarios, telemetry) if x is None]
+        if len(unmatched) > 0:
+            logger.warning(
+                "Unable to attribute telemetry to batch scenarios %s, using batch window",
+                ", ".join(unmatched)
+            )
+
+        batch_id = next(batch_id_generator)
+        results = []
+        for scenario, scenario_telemetry in zip(scenarios, telemetry):
+            scenario_start, scenario_end, scenario_returncode = start_time, end_time, returncode
+            if scenario_telemetry is not None:
+                scenario_start = datetime.datetime.fromtimestamp(
+                    scenario_telemetry.get("start_timestamp", start_time.timestamp())
+                )
+                scenario_end = datetime.datetime.fromtimestamp(
+                    scenario_telemetry.get("end_timestamp", end_time.timestamp())
+                )
+                scenario_returncode = scenario_telemetry.get("exit_status", returncode)
+
+            results.append(CommandRunResult(
+                generation_id=generation_id,
+                scenario=scenario,
+                cmd=command,
+                log=log,
+                returncode=scenario_returncode,
+                start_time=scenario_start,
+                end_time=scenario_end,
+                chaos_start_time=scenario_start if scenario_telemetry is not None else None,
+                chaos_end_time=scenario_end if scenario_telemetry is not None else None,
+                fitness_result=FitnessResult(),
+                health_check_results=self.__filter_health_check_results(
+                    health_check_results, scenario_start, scenario_end
+                ),
+                load_results=load_results,
+                health_check_baseline=health_check_baseline,
+                recovery_duration=recovery_duration,
+                batch_id=batch_id,
+                abort_reason=abort_reason,
+                time_saved=time_saved,
+                startup_duration=startup_duration,
+            ))
+        return results
+
+    def __start_watchdog(self, scenarios: List[BaseScenario], stop_event: Optional[threading.Event]):
+        """Start watchdog that sets stop_event once scenarios run past their deadline"""
+        if not self.config.watchdog.enable:
+            return None
+        watchdog = ScenarioWatchdog(
+            scenarios,
+            extra_time=self.__krkn_wait_duration() + self.config.watchdog.grace_period,
+            stop_event=stop_event,
+        )
+        watchdog.start()
+        return watchdog
+
+    def __health_check_abort_event(self, stop_event: Optional[threading.Event]):
+        """Event the health check watcher sets when stop_watcher_on_failure trips, None to keep the run going"""
+        health_checks = self.config.health_checks
+        if health_checks.stop_watcher_on_failure and health_checks.abort_on_failure:
+            return stop_event
+        return None
+
+    def __new_stop_event(self, with_slo_monitor: bool) -> Optional[threading.Event]:
+        """
+        Event to terminate the run with, None when nothing is enabled that could terminate it.
+        Without it the command stays in the process group of krkn-ai, so Ctrl-C reaches krknctl and podman.
+        """
+        health_checks = self.config.health_checks
+        if self.config.watchdog.enable or \
+                (with_slo_monitor and self.config.slo_monitor.enable and not env_is_truthy("MOCK_FITNESS")) or \
+                (health_checks.stop_watcher_on_failure and health_checks.abort_on_failure):
+            return threading.Event()
+        return None
+
+    def __is_set(self, stop_event: Optional[threading.Event]) -> bool:
+        return stop_event is not None and stop_event.is_set()
+
+    def __track_krkn_containers(
+        self, scenarios: List[BaseScenario], command: str, stop_event: Optional[threading.Event]
+    ) -> Optional[KrknContainerTracker]:
+        """Track containers started by krknctl when the run may be terminated, None if not required"""
+        # Graph runs always use krknctl, podman forwards the termination signal to the container of a krknhub run
+        if stop_event is None or not command.startswith("krknctl "):
+            return None
+        return KrknContainerTracker(scenarios)
+
+    def __stop_krkn_containers(self, container_tracker: Optional[KrknContainerTracker]):
+        """Stop containers of a terminated krknctl run, which keep injecting chaos after krknctl exits"""
+        if container_tracker is None or container_tracker.stop():
+            return
+        logger.warning(
+            "Krkn containers of the terminated run could not be stopped, chaos may still be running in the cluster"
+        )
+        # Give the cluster time to recover, the adaptive recovery wait follows otherwise
+        if not self.config.recovery.enable:
+            logger.info("Waiting %d seconds for the cluster to recover", self.config.wait_duration)
+            time.sleep(self.config.wait_duration)
+
+    def __time_saved(self, scenarios: List[BaseScenario], run_start: float) -> float:
+        """Expected run time left when scenarios, running in parallel, were ended early (in seconds)"""
+        expected = max([get_expected_duration(x) for x in scenarios]) + self.__krkn_wait_duration()
+        return max(expected - (time.monotonic() - run_start), 0)
+
+    def __start_slo_monitor(self, scenario: BaseScenario, stop_event: Optional[threading.Event]):
+        """Start SLO monitor that sets stop_event once scenario crosses an SLO threshold"""
+        if not self.config.slo_monitor.enable or env_is_truthy("MOCK_FITNESS"):
+            return None
+        slo_monitor = SLOMonitor(
+            self.config.slo_monitor,
+            self.prom_client,
+            [(self.scope_query(threshold.query, scenario), threshold) for threshold in self.config.slo_monitor.thresholds],
+            stop_event,
+        )
+        slo_monitor.start()
+        return slo_monitor
+
+    def __health_check_path(self, generation_id: int) -> Optional[str]:
+        """File to stream health check probes of a run to, None to keep them in memory"""
+        if not self.config.health_checks.stream_results:
+            return None
+        return os.path.join(
+            self.output_dir, "health_checks",
+            "generation_%d_run_%d.csv" % (generation_id, next(health_check_file_id_generator))
+        )
+
+    def __filter_health_check_results(
+        self,
+        health_check_results: Dict[str, HealthCheckSamples],
+        start: datetime.datetime,
+        end: datetime.datetime,
+    ) -> Dict[str, HealthCheckSamples]:
+        """Keep health check samples that were taken within the scenario window"""
+        return {
+            url: samples.window(start, end)
+            for url, samples in health_check_results.items()
+        }
+
+    def evaluate(self, result: CommandRunResult) -> CommandRunResult:
+        """Calculate fitness scores for an executed scenario and update result in place"""
+        returncode = result.returncode
+        start_time = result.start_time
+        end_time = result.end_time
+        if self.config.fitness_function.use_chaos_window and \
+                result.chaos_start_time is not None and result.chaos_end_time is not None:
+            # Only query the window in which chaos was injected
+            start_time = result.chaos_start_time
+            end_time = result.chaos_end_time
+        elif self.config.fitness_function.use_chaos_window:
+            logger.debug("Chaos window missing from telemetry, using the whole run window")
+        health_check_results = result.health_check_results
+        health_check_watcher = HealthCheckWatcher(self.config.health_checks)
 
         # calculate fitness scores
         fitness_result: FitnessResult = FitnessResult()
 
-        health_check_results = health_check_watcher.get_results()
-
         # Check if krkn scenario failed due to misconfiguration (non-zero and not status code 2)
         # Status code 2 means that SLOs not met per Krkn test (valid failure)
         # Other non-zero status codes indicate misconfiguration errors
-        if returncode != 0 and returncode != 2:
+        # Runs terminated by Krkn-AI do not have a meaningful return code
+        if result.abort_reason is None and returncode != 0 and returncode != 2:
             # Misconfiguration failure - skip fitness calculation and set failure marker
             logger.warning(
                 "Krkn scenario failed with return code %d (misconfiguration). "
@@ -132,20 +493,29 @@ class KrknRunner:
             logger.info("Fitness score set to -1 due to misconfiguration failure")
         else:
             # Normal execution path - calculate fitness scores
+            if result.abort_reason == RunAbortReason.WATCHDOG_TIMEOUT:
+                logger.info("Calculating partial fitness from data collected before the run was terminated")
+            elif result.abort_reason == RunAbortReason.SLO_THRESHOLD:
+                logger.info("Calculating fitness of scenario ended early on SLO threshold")
+            elif result.abort_reason == RunAbortReason.HEALTH_CHECK_FAILURE:
+                logger.info("Calculating fitness of scenario aborted on health check failure")
             # If user provided fitness_function.query, then we use the default function to calculate
             if self.config.fitness_function.query is not None:
                 fitness_value = self.calculate_fitness_value(
                     start=start_time,
                     end=end_time,
-                    query=self.config.fitness_function.query,
-                    fitness_type=self.config.fitness_function.type
+                    query=self.scope_query(self.config.fitness_function.query, result.scenario),
+                    fitness_type=self.config.fitness_function.type,
+                    aggregator=self.config.fitness_function.aggregator,
                 )
                 fitness_result.fitness_score = fitness_value
             elif len(self.config.fitness_function.items) > 0:
                 fitness_result = self.calculate_fitness_score_for_items(
                     start=start_time,
-                    end=end_time
+                    end=end_time,
+                    scenario=result.scenario
                 )
+            fitness_result.partial = result.abort_reason == RunAbortReason.WATCHDOG_TIMEOUT
 
             # Include krkn hub run failure info to the fitness score
             if self.config.fitness_function.include_krkn_failure:
@@ -158,29 +528,37 @@ class KrknRunner:
                 fitness_result.health_check_failure_score = health_check_watcher.summarize_success_rate(health_check_results)
             if self.config.fitness_function.include_health_check_response_time:
                 fitness_result.health_check_response_time_score = health_check_watcher.summarize_response_time(health_check_results)
+                if len(result.health_check_baseline) > 0:
+                    fitness_result.health_check_baseline_score = health_check_watcher.summarize_baseline_shift(
+                        health_check_results, result.health_check_baseline
+                    )
+            if self.config.fitness_function.include_health_check_load and len(result.load_results) > 0:
+                load_results = result.load_results
+                fitness_result.health_check_throughput_score = health_check_watcher.summarize_load_throughput(load_results)
+                fitness_result.health_check_latency_score = health_check_watcher.summarize_load_latency(load_results)
+                fitness_result.health_check_p50 = max([x.p50 for x in load_results.values()])
+                fitness_result.health_check_p99 = max([x.p99 for x in load_results.values()])
+                fitness_result.health_check_p999 = max([x.p999 for x in load_results.values()])
+                fitness_result.health_check_achieved_rps = sum([x.achieved_rps for x in load_results.values()])
 
             # Calculate overall fitness score
             fitness_result.fitness_score = sum([
                 fitness_result.fitness_score,
                 fitness_result.krkn_failure_score,
                 fitness_result.health_check_failure_score,
-                fitness_result.health_check_response_time_score
+                fitness_result.health_check_response_time_score,
+                fitness_result.health_check_baseline_score,
+                fitness_result.health_check_throughput_score,
+                fitness_result.health_check_latency_score,
             ])
             logger.info("Fitness score: %s", fitness_result.fitness_score)
+            if self.prom_client.cache is not None:
+                logger.debug("Prometheus cache: %s", self.prom_client.cache.stats())
 
-        return CommandRunResult(
-            generation_id=generation_id,
-            scenario=scenario,
-            cmd=command,
-            log=log,
-            returncode=returncode,
-            start_time=start_time,
-            end_time=end_time,
-            fitness_result=fitness_result,
-            health_check_results=health_check_results
-        )
+        result.fitness_result = fitness_result
+        return result
 
-    def runner_command(self, scenario: Scenario):
+    def runner_command(self, scenario: Scenario, warm_container: WarmContainer = None):
         """Generate command for krkn runner (krknctl, krknhub)"""
         if self.runner_type == KrknRunnerType.HUB_RUNNER:
             # Generate env items
@@ -188,8 +566,12 @@ class KrknRunner:
             for parameter in scenario.parameters:
                 env_list += f' -e {parameter.get_name(return_krknhub_name=True)}="{parameter.get_value()}" '
 
+            # Dispatch scenario into a running container
+            if warm_container is not None:
+                return self.warm_pool.exec_command(warm_container, env_list, self.__krkn_wait_duration())
+
             command = PODMAN_TEMPLATE.format(
-                wait_duration=self.config.wait_duration,
+                wait_duration=self.__krkn_wait_duration(),
                 env_list=env_list,
                 kubeconfig=self.config.kubeconfig_file_path,
                 image=scenario.krknhub_image,
@@ -204,7 +586,7 @@ class KrknRunner:
                 env_list += f'--{param_name} "{parameter.get_value()}" '
 
             command = KRKNCTL_TEMPLATE.format(
-                wait_duration=self.config.wait_duration,
+                wait_duration=self.__krkn_wait_duration(),
                 env_list=env_list,
                 kubeconfig=self.config.kubeconfig_file_path,
                 name=scenario.krknctl_name,
@@ -212,13 +594,32 @@ class KrknRunner:
             return command
         raise Exception("Unsupported runner type")
 
+    def __krkn_wait_duration(self) -> int:
+        """Wait duration passed to krkn, kept minimal when adaptive recovery is enabled"""
+        if self.config.recovery.enable:
+            return self.config.recovery.krkn_wait_duration
+        return self.config.wait_duration
+
     def graph_command(self, scenario: CompositeScenario):
+        # Create JSON for krknctl graph runner
+        scenario_json = self.__expand_composite_json(scenario)
+        return self.__graph_run_command(scenario_json)
+
+    def batch_graph_command(self, scenarios: List[Scenario]):
+        """Generate krknctl graph where all scenarios depend on a dummy root and run in parallel"""
+        root = "$"
+        scenario_json = {
+            root: self.__generate_scenario_json(ScenarioFactory.create_dummy_scenario())
+        }
+        for i, scenario in enumerate(scenarios):
+            scenario_json[f"{root}b{i}"] = self.__generate_scenario_json(scenario, depends_on=root)
+        return self.__graph_run_command(scenario_json)
+
+    def __graph_run_command(self, scenario_json: Dict):
         # Create directory under output folder to save CompositeScenario config
         graph_json_directory = os.path.join(self.output_dir, "graphs")
         os.makedirs(graph_json_directory, exist_ok=True)
 
-        # Create JSON for krknctl graph runner
-        scenario_json = self.__expand_composite_json(scenario)
         json_file = tempfile.mktemp(suffix=".json", dir=graph_json_directory)
         with open(json_file, "w", encoding="utf-8") as f:
             json.dump(scenario_json, f, ensure_ascii=False, indent=4)
@@ -321,40 +722,132 @@ class KrknRunner:
             result["depends_on"] = depends_on
         return result
 
-    def calculate_fitness_value(self, start, end, query, fitness_type):
-        """Calculate fitness score for scenario run"""
+    def calculate_fitness_value(
+        self,
+        start,
+        end,
+        query,
+        fitness_type,
+        aggregator: RangeAggregator = RangeAggregator.last,
+        deadline: float = None,
+    ):
+        """Calculate fitness score for scenario run.
+        Retries stop early when they would go past deadline (time.monotonic() value)."""
         if env_is_truthy("MOCK_FITNESS"):
             return rng.random()
 
+        local_value = self.__calculate_local_fitness(start, end, query, fitness_type, aggregator)
+        if local_value is not None:
+            return local_value
+
         # Retry to calculate fitness function if it fails
         # Case when data isn't available in prometheus for latest time range
-        retries = 3 # Number of retries to calculate fitness function
-        retry_delay = 10 # in seconds
-        for retry in range(retries):
-            try:
-                if fitness_type == FitnessFunctionType.point:
-                    return self.calculate_point_fitness(start, end, query)
-                elif fitness_type == FitnessFunctionType.range:
-                    return self.calculate_range_fitness(start, end, query)
-            except Exception as error:
-                logger.error(f"Fitness function calculation failed: {error}")
-                logger.info(f"Retrying fitness function calculation... (retry {retry + 1} of {retries})")
-                time.sleep(retry_delay)
-        raise FitnessFunctionCalculationError(f"Fitness function calculation failed after {retries} retries")
-
-    def calculate_fitness_score_for_items(self, start, end):
+        retry_config = self.config.fitness_function.retry
+        retry_deadline = time.monotonic() + retry_config.deadline
+        if deadline is not None:
+            retry_deadline = min(retry_deadline, deadline)
+
+        attempt = 0
+        while True:
+            attempt += 1
+            if self.__is_data_fresh(end):
+                try:
+                    if fitness_type == FitnessFunctionType.point:
+                        return self.calculate_point_fitness(start, end, query)
+                    elif fitness_type == FitnessFunctionType.range:
+                        return self.calculate_range_fitness(start, end, query, aggregator)
+                except Exception as error:
+                    logger.error(f"Fitness function calculation failed: {error}")
+
+            # Exponential backoff with jitter
+            retry_delay = min(retry_config.initial_delay * 2 ** (attempt - 1), retry_config.max_delay)
+            retry_delay = rng.uniform(retry_delay / 2, retry_delay)
+            if time.monotonic() + retry_delay > retry_deadline:
+                break
+            logger.info(f"Retrying fitness function calculation in {retry_delay:.1f}s... (attempt {attempt + 1})")
+            time.sleep(retry_delay)
+        raise FitnessFunctionCalculationError(f"Fitness function calculation failed after {attempt} attempts")
+
+    def __calculate_local_fitness(self, start, end, query, fitness_type, aggregator: RangeAggregator):
+        """Calculate fitness from baseline sampler series, None if samples have a gap or don't cover end yet."""
+        if self.baseline_sampler is None:
+            return None
+        if fitness_type == FitnessFunctionType.point:
+            value = self.baseline_sampler.point_value(query, start.timestamp(), end.timestamp())
+            if value is not None:
+                return value
+        elif fitness_type == FitnessFunctionType.range and aggregator == RangeAggregator.last and "$range$" not in query:
+            value = self.baseline_sampler.max_value(query, end.timestamp())
+            if value is not None:
+                return value
+        logger.debug("No local samples for %s, querying Prometheus", query)
+        return None
+
+    def __is_data_fresh(self, end) -> bool:
+        """Check whether Prometheus has ingested samples up to the end of the test."""
+        if not self.config.fitness_function.retry.check_freshness:
+            return True
+        latest = self.prom_client.latest_sample_time()
+        if latest is None:
+            # Freshness can't be determined, let the query decide
+            return True
+        lag = end.timestamp() - latest
+        if lag > 0:
+            logger.debug("Prometheus data is %.1f seconds behind end of test", lag)
+            return False
+        return True
+
+    def scope_query(self, query: str, scenario: BaseScenario) -> str:
+        """
+        Replace "$namespace$" in a SLO query with a regex of namespaces targeted by the scenario.
+        Used as {namespace=~"$namespace$"} to attribute SLOs to a scenario when running in batches.
+        """
+        if "$namespace$" not in query or scenario is None:
+            return query
+        namespaces = sorted([
+            resource.split("/", 1)[1] for resource in get_blast_radius(scenario)
+            if resource.startswith("namespace/")
+        ])
+        return query.replace("$namespace$", "|".join(namespaces) if namespaces else ".*")
+
+    def calculate_fitness_score_for_items(self, start, end, scenario: BaseScenario = None):
         '''
         This is used to compute fitness scores when multiple SLOs are defined.
+        Items are evaluated in parallel (up to fitness_function.max_concurrency) sharing
+        the Prometheus client session, and all of them must finish within fitness_function.timeout.
         '''
-        results = []
-        overall_score = 0
-        for fitness_item in self.config.fitness_function.items:
-            raw_score = self.calculate_fitness_value(
+        fitness_function = self.config.fitness_function
+        items = fitness_function.items
+        deadline = time.monotonic() + fitness_function.timeout
+        executor = ThreadPoolExecutor(
+            max_workers=max(min(fitness_function.max_concurrency, len(items)), 1),
+            thread_name_prefix="krkn-ai-fitness",
+        )
+        futures = [
+            executor.submit(
+                self.calculate_fitness_value,
                 start=start,
                 end=end,
-                query=fitness_item.query,
-                fitness_type=fitness_item.type
+                query=self.scope_query(fitness_item.query, scenario),
+                fitness_type=fitness_item.type,
+                aggregator=fitness_item.aggregator,
+                deadline=deadline,
+            )
+            for fitness_item in items
+        ]
+        try:
+            raw_scores = [future.result(timeout=max(deadline - time.monotonic(), 0)) for future in futures]
+        except FuturesTimeoutError:
+            raise FitnessFunctionCalculationError(
+                f"Fitness items were not evaluated within {fitness_function.timeout} seconds"
             )
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        # Results are kept in the order of the configured items
+        results = []
+        overall_score = 0
+        for fitness_item, raw_score in zip(items, raw_scores):
             fitness_value = fitness_item.weight * raw_score
             overall_score += fitness_value
 
@@ -373,115 +866,98 @@ class KrknRunner:
     def calculate_point_fitness(self, start, end, query):
         """Takes difference between fitness function at start/end intervals of test.
         Helpful to measure values for counter based metric like restarts.
+
+        Both ends are fetched with instant queries, so with the Prometheus cache the end of a test is
+        reused as the start of the next one when they fall in the same scrape interval.
+        When the query returns multiple series, their differences are summed.
         """
         logger.debug("Calculating Point Fitness")
-        result_at_beginning = self.prom_client.process_prom_query_in_range(
-            query,
-            start_time=start,
-            end_time=start,
-            granularity=100,
-        )[0]["values"][-1][1]
-
-        result_at_end = self.prom_client.process_prom_query_in_range(
-            query,
-            start_time=end,
-            end_time=end,
-            granularity=100,
-        )[0]["values"][-1][1]
-
-        return float(result_at_end) - float(result_at_beginning)
-
-    def calculate_range_fitness(self, start, end, query):
+        series_at_beginning = {
+            series_key(series): float(series["value"][1])
+            for series in self.prom_client.instant_query(query, time=start)
+        }
+        series_list = self.prom_client.instant_query(query, time=end, round_up=True)
+
+        fitness_value = None
+        for series in series_list:
+            # Series that disappeared during the test (e.g. deleted pod) are not in series_list,
+            # series that appeared during the test started from zero
+            value_at_beginning = series_at_beginning.get(series_key(series), 0.0)
+            fitness_value = (fitness_value or 0.0) + float(series["value"][1]) - value_at_beginning
+
+        if fitness_value is None:
+            raise FitnessFunctionCalculationError(f"No data found for query {query} at {end}")
+        logger.debug("Point fitness across %d series: %s", len(series_list), fitness_value)
+        return fitness_value
+
+    def calculate_range_fitness(self, start, end, query, aggregator: RangeAggregator = RangeAggregator.last):
         """
         Measure fitness function for the range of test.
         Helpful to measure value over period of time like max cpu usage, max memory usage over time, etc.
 
         config.fitness_function.query can specify a dynamic "$range$" parameter that will be replaced
         when calling below function.
+
+        With the "last" aggregator the query is evaluated once at the end of the test with "$range$"
+        set to the test window, and the maximum is taken when it returns multiple series.
+        Other aggregators fetch samples across the test window, with "$range$" set to the query step,
+        and reduce samples of all series (see range_aggregators.aggregate).
+        Step and "$range$" are floored to fitness_function.scrape_interval so selectors always contain samples.
+        With the Prometheus cache, evaluation times are aligned to multiples of the step so results
+        can be reused by later windows.
         """
-        logger.debug("Calculating Range Fitness")
+        logger.debug("Calculating Range Fitness (%s)", aggregator.value)
+        scrape_interval = self.config.fitness_function.scrape_interval
+        window = max(round((end - start).total_seconds()), 1)
+        step = range_step(window, scrape_interval)
 
-        # Calculate number of minutes between test run
         if "$range$" in query:
-            time_dt_mins = int((end - start).total_seconds() / 60)
-            if time_dt_mins == 0:
-                time_dt_mins = 1
-            query = query.replace("$range$", f"{time_dt_mins}m")
+            selector = window if aggregator == RangeAggregator.last else step
+            query = query.replace("$range$", f"{range_selector(selector, scrape_interval)}s")
         else:
             logger.warning(
                 "You are missing $range$ in config.fitness_function.query to specify dynamic range. Fitness function will use specified range"
             )
 
-        result = self.prom_client.process_prom_query_in_range(
-            query,
-            start_time=start,
-            end_time=end,
-            granularity=100,
-        )[0]["values"][-1][1]
-
-        return float(result)
+        if aggregator == RangeAggregator.last:
+            series_list = self.prom_client.instant_query(query, time=end, round_up=True)
+            if len(series_list) == 0:
+                raise FitnessFunctionCalculationError(f"No data found for query {query} at {end}")
+            logger.debug("Range fitness across %d series", len(series_list))
+            return max([float(series["value"][1]) for series in series_list])
+
+        start = self.prom_client.align_time(start, step, round_up=True)
+        points = max(round((end - start).total_seconds()), 0) // step + 1
+        end = start + datetime.timedelta(seconds=step * (points - 1))
+        series_list = self.prom_client.range_query(query, start=start, end=end, step=step)
+        timestamps, matrix = series_matrix(series_list, round(start.timestamp()), step, points)
+        try:
+            fitness_value = aggregate(aggregator, timestamps, matrix)
+        except ValueError as error:
+            raise FitnessFunctionCalculationError(f"Unable to aggregate query {query}: {error}")
+        logger.debug("Range fitness across %d series and %d points: %s", len(series_list), points, fitness_value)
+        return fitness_value
 
-    def __extract_returncode_from_run(self, log: str, default_returncode: int) -> dict:
+    def __extract_returncode_from_run(self, log: str, default_returncode: int) -> int:
         """
         Try to extracts Krkn return code from the run log. If extraction fails, return default_returncode.
         """
         try:
-            # TODO: Look into if we can save telemetry data to file from Krkn itself.
-            # Hacky way to extract return code from log
-            # Find the line with "Chaos data:" and extract JSON from next lines
-            lines = log.split('\n')
-            chaos_data_idx = -1
-            
-            for i, line in enumerate(lines):
-                if 'Chaos data:' in line:
-                    chaos_data_idx = i + 1
-                    break
-            
-            if chaos_data_idx == -1:
+            chaos_data = extract_chaos_data(log)
+            if len(chaos_data) == 0:
                 logger.warning("Could not find 'Chaos data:' in log")
                 return default_returncode
-            
-            # Extract JSON by counting braces
-            json_lines = []
-            brace_count = 0
-            started = False
-            
-            for i in range(chaos_data_idx, len(lines)):
-                line = lines[i]
-                
-                # Count opening and closing braces
-                for char in line:
-                    if char == '{':
-                        brace_count += 1
-                        started = True
-                    elif char == '}':
-                        brace_count -= 1
-                
-                if started:
-                    json_lines.append(line)
-                    
-                # When braces are balanced, we've found the complete JSON
-                if started and brace_count == 0:
-                    break
-            
-            if not json_lines:
-                logger.warning("Could not extract JSON content from log")
-                return default_returncode
-            
-            # Join all JSON lines into a single string
-            json_str = '\n'.join(json_lines)
-            chaos_data = json.loads(json_str)
 
             # Extract exit_status from first scenario
-            scenarios = chaos_data.get('telemetry', {}).get('scenarios', [])
+            scenarios = get_telemetry_scenarios(chaos_data[:1])
             if scenarios and len(scenarios) > 0:
                 exit_status = scenarios[0].get('exit_status', default_returncode)
                 logger.debug("Extracted exit_status: %s", exit_status)
                 return exit_status
-            
+
             logger.warning("No exit_status found in telemetry data")
             return default_returncode
-            
+
         except Exception as e:
             logger.error("Failed to extract return code from run log: %s", e)
             return default_returncode
@@ -0,0 +1,89 @@
+'''
+This module generates load against a health check URL from the health check watcher's event loop.
+
+Working Details:
+1. Request i is scheduled at start + i / rps, independently of how fast earlier requests complete.
+2. Up to `concurrency` workers take the next scheduled request, wait for its time and send it.
+   When all workers are busy, later requests start late instead of being skipped.
+3. Latency is measured from the scheduled send time (avoids coordinated omission), so queueing
+   caused by a degraded service shows up in the tail. Failed requests are recorded too.
+4. Latencies go into a log-bucketed histogram, the summary reports p50, p99, p99.9 and achieved RPS.
+'''
+import asyncio
+import itertools
+from typing import Optional
+
+from krkn_ai.models.config import HealthCheckApplicationConfig, LoadTestResult
+from krkn_ai.utils.async_http import HttpSession
+from krkn_ai.utils.histogram import LatencyHistogram
+from krkn_ai.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class LoadGenerator:
+    def __init__(self, health_check: HealthCheckApplicationConfig, stop: asyncio.Event):
+        self.health_check = health_check
+        self.profile = health_check.load
+        self.histogram = LatencyHistogram()
+        self.requests = 0
+        self.failures = 0
+        self._stop = stop
+        self._start: Optional[float] = None
+        self._end: Optional[float] = None
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        self._start = loop.time()
+        session = HttpSession(max_idle=max(self.profile.concurrency, 1))
+        schedule = itertools.count()
+        logger.debug(
+            "Generating %s rps with concurrency %d against %s",
+            self.profile.rps, self.profile.concurrency, self.health_check.url
+        )
+        try:
+            await asyncio.gather(*[
+                self.__worker(session, schedule) for _ in range(max(self.profile.concurrency, 1))
+            ])
+        finally:
+            self._end = loop.time()
+            await session.close()
+
+    async def __worker(self, session: HttpSession, schedule: itertools.count):
+        loop = asyncio.get_running_loop()
+        while not self._stop.is_set():
+            scheduled = self._start + next(schedule) / self.profile.rps
+            if self.profile.duration is not None and scheduled >= self._start + self.profile.duration:
+                return
+            delay = scheduled - loop.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._stop.wait(), delay)
+                    return
+                except asyncio.TimeoutError:
+                    pass
+
+            try:
+                resp = await session.get(self.health_check.url, timeout=self.health_check.timeout)
+                success = resp.status_code == self.health_check.status_code
+            except Exception:
+                success = False
+            self.histogram.record(loop.time() - scheduled)
+            self.requests += 1
+            self.failures += 0 if success else 1
+
+    def summary(self) -> LoadTestResult:
+        elapsed = 0.0
+        if self._start is not None and self._end is not None:
+            elapsed = self._end - self._start
+        return LoadTestResult(
+            name=self.health_check.name,
+            target_rps=self.profile.rps,
+            achieved_rps=self.requests / elapsed if elapsed > 0 else 0.0,
+            requests=self.requests,
+            failures=self.failures,
+            timeout=self.health_check.timeout,
+            p50=self.histogram.percentile(50),
+            p99=self.histogram.percentile(99),
+            p999=self.histogram.percentile(99.9),
+        )
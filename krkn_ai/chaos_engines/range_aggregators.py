@@ -0,0 +1,83 @@
+'''
+Aggregators used by range fitness to reduce raw samples of all returned series to a single score.
+'''
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from krkn_ai.models.config import RangeAggregator
+
+# Upper bound on samples per series fetched for a range fitness query
+MAX_POINTS = 300
+
+# Scrape intervals covered by a "$range$" selector, so every selector contains several samples
+RANGE_SCRAPES = 4
+
+
+def range_step(window: float, scrape_interval: int = 1) -> int:
+    '''
+    Query step (in seconds) so that the window is covered by at most MAX_POINTS samples.
+    Never shorter than the scrape interval, a finer step only repeats the same samples.
+    '''
+    return max(int(np.ceil(window / MAX_POINTS)), scrape_interval, 1)
+
+
+def range_selector(step: int, scrape_interval: int = 1) -> int:
+    '''
+    Duration (in seconds) "$range$" is replaced with when sampling a range query every step seconds.
+    At least RANGE_SCRAPES scrape intervals, shorter selectors (e.g. rate(x[2s])) return no samples.
+    '''
+    return max(step, RANGE_SCRAPES * scrape_interval)
+
+
+def series_matrix(series_list: List[Dict], start: float, step: int, points: int) -> Tuple[np.ndarray, np.ndarray]:
+    '''
+    Align samples of range query series on a common time grid.
+    Returns timestamps (points,) and values (series, points) with NaN for missing samples.
+    '''
+    timestamps = start + step * np.arange(points, dtype=float)
+    matrix = np.full((len(series_list), points), np.nan)
+    for i, series in enumerate(series_list):
+        samples = np.asarray(series.get("values", []), dtype=float).reshape(-1, 2)
+        index = np.rint((samples[:, 0] - start) / step).astype(int)
+        valid = (index >= 0) & (index < points)
+        matrix[i, index[valid]] = samples[valid, 1]
+    return timestamps, matrix
+
+
+def aggregate(aggregator: RangeAggregator, timestamps: np.ndarray, matrix: np.ndarray) -> float:
+    '''
+    Reduce samples of all series to a single value.
+    - max, mean, p95, p99: over every sample of every series
+    - integral: area under each series (value x seconds), summed across series
+    - rate: change per second between first and last sample of each series, max across series
+    '''
+    if matrix.size == 0 or np.all(np.isnan(matrix)):
+        raise ValueError("No samples to aggregate")
+
+    if aggregator == RangeAggregator.max:
+        return float(np.nanmax(matrix))
+    if aggregator == RangeAggregator.mean:
+        return float(np.nanmean(matrix))
+    if aggregator == RangeAggregator.p95:
+        return float(np.nanpercentile(matrix, 95))
+    if aggregator == RangeAggregator.p99:
+        return float(np.nanpercentile(matrix, 99))
+
+    rows = [row[~np.isnan(row)] for row in matrix]
+    times = [timestamps[~np.isnan(row)] for row in matrix]
+    if aggregator == RangeAggregator.integral:
+        # Trapezoidal rule, np.trapz is deprecated in newer NumPy releases
+        return float(sum([
+            np.sum((values[1:] + values[:-1]) / 2 * np.diff(ts))
+            for values, ts in zip(rows, times) if len(values) > 1
+        ]))
+    if aggregator == RangeAggregator.rate:
+        rates = [
+            (values[-1] - values[0]) / (ts[-1] - ts[0])
+            for values, ts in zip(rows, times) if len(values) > 1
+        ]
+        if len(rates) == 0:
+            raise ValueError("Not enough samples to calculate rate")
+        return float(max(rates))
+    raise ValueError(f"Unsupported range aggregator {aggregator}")
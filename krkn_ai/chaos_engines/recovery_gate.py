@@ -0,0 +1,207 @@
+'''
+This module is used to wait for the cluster to recover after a chaos scenario.
+
+Working Details:
+1. Before the scenario starts, SLO queries are sampled to record a pre-chaos baseline.
+2. After the scenario ends, recovery signals are polled every poll_interval seconds.
+3. Once all signals stay healthy for stable_window seconds, or max_wait is reached, the gate opens.
+
+Signals:
+- Pods in the scenario target namespaces are Ready.
+- Health check endpoints return the expected status code, probed concurrently with the health check HTTP client.
+- Fitness SLO queries are back to their pre-chaos baseline (range) or stopped changing (point), i.e. kept
+  the same value while Prometheus ingested scrapes for at least fitness_function.scrape_interval.
+'''
+import asyncio
+import json
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from krkn_ai.models.config import ConfigFile, FitnessFunctionType, HealthCheckApplicationConfig
+from krkn_ai.models.scenario.base import BaseScenario
+from krkn_ai.models.scenario.blast_radius import get_blast_radius
+from krkn_ai.utils import run_shell
+from krkn_ai.utils.async_http import HttpSession
+from krkn_ai.utils.fs import env_is_truthy
+from krkn_ai.utils.logger import get_logger
+from krkn_ai.utils.prometheus import PrometheusClient
+
+logger = get_logger(__name__)
+
+
+class RecoveryGate:
+    def __init__(self, config: ConfigFile, prom_client: PrometheusClient):
+        self.config = config
+        self.recovery = config.recovery
+        self.prom_client = prom_client
+
+    def capture_baseline(self) -> Dict[str, float]:
+        '''
+        Sample SLO queries before chaos starts.
+        '''
+        baseline = {}
+        if not self.recovery.check_slo or env_is_truthy("MOCK_FITNESS"):
+            return baseline
+        for query, _ in self.__slo_queries():
+            value = self.__query_value(query)
+            if value is not None:
+                baseline[query] = value
+        logger.debug("Recovery baseline: %s", baseline)
+        return baseline
+
+    def wait(self, scenarios: List[BaseScenario], baseline: Dict[str, float]) -> float:
+        '''
+        Block until recovery signals are stable for stable_window seconds or max_wait is reached.
+        Returns the time spent waiting in seconds.
+        '''
+        namespaces = set()
+        for scenario in scenarios:
+            namespaces |= set([
+                resource.split("/", 1)[1] for resource in get_blast_radius(scenario)
+                if resource.startswith("namespace/")
+            ])
+        # Last observed value of point queries and latest ingested scrape when it was first observed,
+        # used to check whether counters stopped moving
+        last_values: Dict[str, Tuple[float, Optional[float]]] = {}
+        start = time.monotonic()
+        deadline = start + self.recovery.max_wait
+        stable_since = None
+
+        logger.info("Waiting for cluster to recover (max %ds)", self.recovery.max_wait)
+        while True:
+            now = time.monotonic()
+            if self.__is_recovered(namespaces, baseline, last_values):
+                if stable_since is None:
+                    stable_since = now
+                if now - stable_since >= self.recovery.stable_window:
+                    logger.info("Cluster recovered after %.1f seconds", now - start)
+                    return now - start
+            else:
+                stable_since = None
+
+            if now >= deadline:
+                logger.warning("Cluster did not recover within %d seconds", self.recovery.max_wait)
+                return now - start
+            time.sleep(min(self.recovery.poll_interval, max(deadline - now, 0)))
+
+    def __is_recovered(
+        self,
+        namespaces: Set[str],
+        baseline: Dict[str, float],
+        last_values: Dict[str, Tuple[float, Optional[float]]],
+    ) -> bool:
+        # Evaluate every signal so point query history stays up to date
+        signals = []
+        if self.recovery.check_pods:
+            signals.append(self.__pods_ready(namespaces))
+        if self.recovery.check_health_checks:
+            signals.append(self.__health_checks_green())
+        if self.recovery.check_slo and not env_is_truthy("MOCK_FITNESS"):
+            signals.append(self.__slo_recovered(baseline, last_values))
+        return all(signals)
+
+    def __pods_ready(self, namespaces: Set[str]) -> bool:
+        for namespace in namespaces:
+            output, returncode = run_shell(
+                f"kubectl --kubeconfig={self.config.kubeconfig_file_path} get pods -n {namespace} -o json",
+                do_not_log=True,
+            )
+            if returncode != 0:
+                logger.debug("Unable to fetch pods in namespace %s", namespace)
+                return False
+            try:
+                pods = json.loads(output).get("items", [])
+            except json.JSONDecodeError:
+                return False
+            for pod in pods:
+                status = pod.get("status", {})
+                if status.get("phase") == "Succeeded":
+                    continue
+                conditions = status.get("conditions", [])
+                ready = any(
+                    c.get("type") == "Ready" and c.get("status") == "True"
+                    for c in conditions
+                )
+                if not ready:
+                    logger.debug("Pod %s/%s is not ready", namespace, pod["metadata"]["name"])
+                    return False
+        return True
+
+    def __health_checks_green(self) -> bool:
+        applications = self.config.health_checks.applications
+        if len(applications) == 0:
+            return True
+        return asyncio.run(self.__probe_health_checks(applications))
+
+    async def __probe_health_checks(self, applications: List[HealthCheckApplicationConfig]) -> bool:
+        session = HttpSession()
+        try:
+            results = await asyncio.gather(*[self.__probe(session, x) for x in applications])
+        finally:
+            await session.close()
+        return all(results)
+
+    async def __probe(self, session: HttpSession, health_check: HealthCheckApplicationConfig) -> bool:
+        try:
+            resp = await session.get(health_check.url, timeout=health_check.timeout)
+        except asyncio.TimeoutError:
+            logger.debug("Health check %s timed out after %s seconds", health_check.name, health_check.timeout)
+            return False
+        except Exception as e:
+            logger.debug("Health check %s failed: %s", health_check.name, e)
+            return False
+        if resp.status_code != health_check.status_code:
+            logger.debug("Health check %s returned %d", health_check.name, resp.status_code)
+            return False
+        return True
+
+    def __slo_recovered(self, baseline: Dict[str, float], last_values: Dict[str, Tuple[float, Optional[float]]]) -> bool:
+        recovered = True
+        queries = self.__slo_queries()
+        ingested = None
+        if any([fitness_type == FitnessFunctionType.point for _, fitness_type in queries]):
+            # Read before the queries, so scrapes up to this time are included in their results
+            ingested = self.prom_client.latest_sample_time()
+        for query, fitness_type in queries:
+            value = self.__query_value(query)
+            if value is None:
+                recovered = False
+                continue
+            if fitness_type == FitnessFunctionType.point:
+                # Counter based metrics (e.g. restarts) never go back to baseline, so consider them
+                # recovered once they stay the same across scrapes at least a scrape interval apart.
+                previous = last_values.get(query)
+                if previous is None or previous[0] != value or previous[1] is None:
+                    last_values[query] = (value, ingested)
+                    recovered = False
+                elif not self.__scraped_since(previous[1], ingested):
+                    recovered = False
+            elif query in baseline:
+                expected = baseline[query]
+                if abs(value - expected) > self.recovery.slo_tolerance * max(abs(expected), 1e-9):
+                    logger.debug("SLO %s at %s, baseline %s", query, value, expected)
+                    recovered = False
+        return recovered
+
+    def __scraped_since(self, since: Optional[float], ingested: Optional[float]) -> bool:
+        if since is None or ingested is None:
+            return False
+        return ingested - since >= self.config.fitness_function.scrape_interval
+
+    def __slo_queries(self) -> List:
+        fitness_function = self.config.fitness_function
+        if fitness_function.query is not None:
+            return [(fitness_function.query, fitness_function.type)]
+        return [(item.query, item.type) for item in fitness_function.items]
+
+    def __query_value(self, query: str) -> Optional[float]:
+        # $range$ is only meaningful for the whole test window, evaluate over the poll interval
+        query = query.replace("$range$", f"{max(self.recovery.poll_interval, 1)}s")
+        query = query.replace("$namespace$", ".*")
+        try:
+            result = self.prom_client.instant_query(query)
+            # Sum across series so SLOs spanning several pods or namespaces are compared as a whole
+            return sum([float(series["value"][1]) for series in result]) if result else None
+        except Exception as e:
+            logger.debug("Unable to query SLO %s: %s", query, e)
+            return None
@@ -0,0 +1,103 @@
+'''
+This module is used to run chaos scenarios in parallel without interfering with each other.
+
+Working Details:
+1. Blast radius of each scenario (namespaces, nodes, services) is derived from its parameters.
+2. Before a scenario starts, it takes lease locks on all resources in its blast radius at once.
+3. Scenarios whose blast radius overlaps with a running scenario wait until the leases are released,
+   while other non-overlapping scenarios are started as long as concurrency allows.
+4. Time spent waiting for leases is recorded in the result as lock_wait_time.
+5. Health checks probe shared application endpoints, so a scenario's health check results would
+   include the impact of every scenario running next to it. Concurrency is refused when health checks
+   are configured (see ConfigFile).
+'''
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Set, Tuple
+
+from krkn_ai.models.app import CommandRunResult
+from krkn_ai.models.scenario.base import BaseScenario
+from krkn_ai.models.scenario.blast_radius import get_blast_radius, is_conflicting
+from krkn_ai.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class LeaseManager:
+    '''
+    Keeps track of leased cluster resources.
+    All resources of a blast radius are leased together, so there are no partial holds or deadlocks.
+    '''
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._leases: List[Set[str]] = []
+
+    def try_acquire(self, radius: Set[str]) -> bool:
+        with self._lock:
+            if any(is_conflicting(radius, leased) for leased in self._leases):
+                return False
+            self._leases.append(radius)
+            return True
+
+    def release(self, radius: Set[str]):
+        with self._lock:
+            self._leases.remove(radius)
+
+
+class ScenarioScheduler:
+    def __init__(self, execute: Callable[[BaseScenario, int], CommandRunResult], concurrency: int):
+        self.execute = execute
+        self.concurrency = max(concurrency, 1)
+        self.leases = LeaseManager()
+
+    def run(
+        self,
+        scenarios: List[BaseScenario],
+        generation_id: int,
+        on_result: Callable[[CommandRunResult], None] = None,
+    ) -> List[CommandRunResult]:
+        '''
+        Execute scenarios with up to `concurrency` non-overlapping scenarios at a time.
+        on_result is called from the calling thread as soon as each scenario finishes.
+        Returns results in the order of the given scenarios.
+        '''
+        pending: List[Tuple[int, BaseScenario, Set[str]]] = [
+            (i, scenario, get_blast_radius(scenario)) for i, scenario in enumerate(scenarios)
+        ]
+        running: Dict[Future, Tuple[int, Set[str], float]] = {}
+        blocked_since: Dict[int, float] = {}
+        results: List[CommandRunResult] = [None] * len(scenarios)
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="krkn-ai-scheduler") as executor:
+            while pending or running:
+                # Start as many non-overlapping scenarios as concurrency allows
+                i = 0
+                while len(running) < self.concurrency and i < len(pending):
+                    index, scenario, radius = pending[i]
+                    if not self.leases.try_acquire(radius):
+                        blocked_since.setdefault(index, time.monotonic())
+                        i += 1
+                        continue
+                    lock_wait_time = 0.0
+                    blocked_at = blocked_since.pop(index, None)
+                    if blocked_at is not None:
+                        lock_wait_time = time.monotonic() - blocked_at
+                        logger.debug("Scenario %s waited %.1f seconds for leases %s", scenario, lock_wait_time, radius)
+                    pending.pop(i)
+                    future = executor.submit(self.execute, scenario, generation_id)
+                    running[future] = (index, radius, lock_wait_time)
+
+                done, _ = wait(list(running.keys()), return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, radius, lock_wait_time = running.pop(future)
+                    self.leases.release(radius)
+                    result = future.result()
+                    result.lock_wait_time = lock_wait_time
+                    results[index] = result
+                    if on_result is not None:
+                        on_result(result)
+
+        total_wait = sum([result.lock_wait_time for result in results])
+        logger.info("Scheduled %d scenarios, total lock wait time: %.1f seconds", len(results), total_wait)
+        return results
@@ -0,0 +1,84 @@
+'''
+This module watches SLO queries while a chaos scenario is running and ends the run early
+once the scenario has clearly broken an SLO.
+
+Working Details:
+1. When the scenario starts, point SLOs are sampled to record their value before chaos.
+2. Every poll_interval seconds, each SLO is evaluated:
+   - point: increase since the scenario started (e.g. container restarts)
+   - range: current value, with "$range$" set to poll_interval (e.g. error rate)
+3. Once any SLO crosses its threshold, the stop event is set, which terminates the krkn process.
+4. The runner then calculates fitness of the run as usual, so the destructive scenario is still scored.
+'''
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from krkn_ai.models.config import FitnessFunctionType, SLOMonitorConfig, SLOThreshold
+from krkn_ai.utils.logger import get_logger
+from krkn_ai.utils.prometheus import PrometheusClient
+
+logger = get_logger(__name__)
+
+
+class SLOMonitor:
+    def __init__(
+        self,
+        config: SLOMonitorConfig,
+        prom_client: PrometheusClient,
+        thresholds: List[Tuple[str, SLOThreshold]],
+        stop_event: threading.Event,
+    ):
+        '''
+        thresholds: List of (query scoped to the scenario, threshold config).
+        '''
+        self.config = config
+        self.prom_client = prom_client
+        self.thresholds = thresholds
+        self.stop_event = stop_event
+        self.triggered: Optional[str] = None  # Query that crossed its threshold
+        self._done = threading.Event()
+        self._thread = None
+
+    def start(self):
+        baseline = {}
+        for query, threshold in self.thresholds:
+            if threshold.type == FitnessFunctionType.point:
+                baseline[query] = self.__query_value(query)
+        self._thread = threading.Thread(
+            target=self.__run, args=(baseline,), name="krkn-ai-slo-monitor", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._done.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __run(self, baseline: Dict[str, Optional[float]]):
+        while not self._done.wait(self.config.poll_interval):
+            for query, threshold in self.thresholds:
+                value = self.__query_value(query)
+                if value is None:
+                    continue
+                if threshold.type == FitnessFunctionType.point:
+                    if baseline.get(query) is None:
+                        baseline[query] = value
+                        continue
+                    value -= baseline[query]
+                if value >= threshold.threshold:
+                    logger.warning(
+                        "SLO %s at %s crossed threshold %s, ending scenario early",
+                        query, value, threshold.threshold
+                    )
+                    self.triggered = query
+                    self.stop_event.set()
+                    return
+
+    def __query_value(self, query: str) -> Optional[float]:
+        query = query.replace("$range$", f"{max(self.config.poll_interval, 1)}s")
+        try:
+            result = self.prom_client.instant_query(query)
+            return sum([float(series["value"][1]) for series in result]) if result else None
+        except Exception as e:
+            logger.debug("Unable to query SLO %s: %s", query, e)
+            return None
@@ -0,0 +1,197 @@
+'''
+Helpers to read krkn telemetry ("Chaos data:" JSON blocks) printed in the run log.
+'''
+import datetime
+import json
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+from krkn_ai.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# krkn logs with "%(asctime)s [%(levelname)s] %(message)s" format
+KRKN_LOG_LINE = re.compile(r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3} \[\w+\]")
+
+# scenario_type reported in krkn telemetry by krknctl name of the scenario
+KRKN_SCENARIO_TYPES = {
+    "pod-scenarios": "pod_disruption_scenarios",
+    "container-scenarios": "container_scenarios",
+    "node-cpu-hog": "hog_scenarios",
+    "node-memory-hog": "hog_scenarios",
+    "node-io-hog": "hog_scenarios",
+    "network-chaos": "network_chaos_scenarios",
+    "pod-network-filter": "network_chaos_ng_scenarios",
+    "time-scenarios": "time_scenarios",
+    "pvc-scenarios": "pvc_scenarios",
+    "application-outages": "application_outages_scenarios",
+    "syn-flood": "syn_flood_scenarios",
+    "dummy-scenario": "dummy_scenarios",
+}
+
+
+class StartupTimer:
+    '''
+    Measures time from command launch until krkn prints its first log line,
+    i.e. image resolution, container creation and interpreter startup.
+    Pass an instance as on_line callback of run_shell.
+    '''
+    def __init__(self):
+        self.start = time.monotonic()
+        self.duration: Optional[float] = None
+
+    def __call__(self, line: str):
+        if self.duration is None and KRKN_LOG_LINE.match(line):
+            self.duration = time.monotonic() - self.start
+
+
+def extract_chaos_data(log: str) -> List[Dict]:
+    '''
+    Extract every "Chaos data:" JSON block from the run log, in order of appearance.
+    A krknctl graph run prints one block per graph node.
+    '''
+    # TODO: Look into if we can save telemetry data to file from Krkn itself.
+    # Hacky way to extract telemetry from log
+    # Find the lines with "Chaos data:" and extract JSON from next lines
+    lines = log.split('\n')
+    results = []
+    i = 0
+    while i < len(lines):
+        if 'Chaos data:' not in lines[i]:
+            i += 1
+            continue
+
+        # Extract JSON by counting braces
+        json_lines = []
+        brace_count = 0
+        started = False
+        i += 1
+        while i < len(lines):
+            line = lines[i]
+            i += 1
+
+            # Count opening and closing braces
+            for char in line:
+                if char == '{':
+                    brace_count += 1
+                    started = True
+                elif char == '}':
+                    brace_count -= 1
+
+            if started:
+                json_lines.append(line)
+
+            # When braces are balanced, we've found the complete JSON
+            if started and brace_count == 0:
+                break
+
+        if not json_lines:
+            logger.warning("Could not extract JSON content from log")
+            continue
+
+        try:
+            results.append(json.loads('\n'.join(json_lines)))
+        except json.JSONDecodeError as e:
+            logger.warning("Unable to parse chaos data from log: %s", e)
+    return results
+
+
+def get_telemetry_scenarios(chaos_data: List[Dict]) -> List[Dict]:
+    '''
+    Flatten telemetry scenario entries from chaos data blocks.
+    '''
+    scenarios = []
+    for data in chaos_data:
+        scenarios.extend(data.get('telemetry', {}).get('scenarios', []) or [])
+    return scenarios
+
+
+def is_dummy_scenario(telemetry_scenario: Dict) -> bool:
+    '''
+    Whether telemetry entry belongs to the dummy root node of a krknctl graph.
+    '''
+    return "dummy" in str(telemetry_scenario.get("scenario_type", "")) or \
+        "dummy" in str(telemetry_scenario.get("scenario", ""))
+
+
+def get_krkn_scenario_type(krknctl_name: str) -> str:
+    '''
+    scenario_type krkn reports in telemetry for a scenario, e.g. "hog_scenarios" for "node-cpu-hog".
+    Scenarios sharing a type are told apart by their parameters.
+    '''
+    return KRKN_SCENARIO_TYPES.get(krknctl_name, _normalize_type(krknctl_name))
+
+
+def _normalize_type(value: str) -> str:
+    return str(value).lower().replace("-", "_")
+
+
+def _flatten_values(value) -> List[str]:
+    if isinstance(value, dict):
+        return [x for v in value.values() for x in _flatten_values(v)]
+    if isinstance(value, list):
+        return [x for v in value for x in _flatten_values(v)]
+    return [str(value)]
+
+
+def _telemetry_matches(telemetry_scenario: Dict, scenario_type: str, parameters: Dict[str, str]) -> bool:
+    telemetry_type = _normalize_type(telemetry_scenario.get("scenario_type", ""))
+    scenario_type = _normalize_type(scenario_type)
+    if not telemetry_type or telemetry_type != scenario_type:
+        return False
+
+    telemetry_parameters = telemetry_scenario.get("parameters") or {}
+    if not isinstance(telemetry_parameters, dict):
+        return False
+    common = [key for key in parameters if key in telemetry_parameters]
+    if common:
+        return all([str(telemetry_parameters[key]) == str(parameters[key]) for key in common])
+    # Parameters are reported as scenario config instead of env, compare values only
+    values = set(_flatten_values(telemetry_parameters))
+    return all([str(value) in values for value in parameters.values()])
+
+
+def match_telemetry_scenarios(
+    telemetry_scenarios: List[Dict],
+    expected: List[Tuple[str, Dict[str, str]]],
+) -> List[Optional[Dict]]:
+    '''
+    Attribute telemetry entries to expected scenarios, given as (scenario type, parameters) pairs.
+    Graph nodes don't report telemetry in graph order, so entries are matched by scenario type and
+    parameters. An entry is only attributed when it matches exactly one expected scenario and that
+    scenario matches no other entry, None is returned for expected scenarios that stay unmatched.
+    '''
+    matches = [
+        [i for i, (scenario_type, parameters) in enumerate(expected)
+         if _telemetry_matches(x, scenario_type, parameters)]
+        for x in telemetry_scenarios
+    ]
+    counts = [0] * len(expected)
+    for candidates in matches:
+        for i in candidates:
+            counts[i] += 1
+
+    results: List[Optional[Dict]] = [None] * len(expected)
+    for telemetry_scenario, candidates in zip(telemetry_scenarios, matches):
+        if len(candidates) == 1 and counts[candidates[0]] == 1:
+            results[candidates[0]] = telemetry_scenario
+    return results
+
+
+def get_chaos_window(log: str) -> Optional[Tuple[datetime.datetime, datetime.datetime]]:
+    '''
+    Time range in which chaos was injected, excluding image pulls, container startup and krkn wait duration.
+    Read from telemetry scenario timestamps (ignoring dummy graph nodes). None when telemetry is
+    missing, e.g. for terminated runs, log lines don't tell when chaos was injected so callers
+    should use the whole run instead.
+    '''
+    scenarios = [
+        x for x in get_telemetry_scenarios(extract_chaos_data(log))
+        if not is_dummy_scenario(x) and x.get("start_timestamp") and x.get("end_timestamp")
+    ]
+    if not scenarios:
+        return None
+    start = min([float(x["start_timestamp"]) for x in scenarios])
+    end = max([float(x["end_timestamp"]) for x in scenarios])
+    return datetime.datetime.fromtimestamp(start), datetime.datetime.fromtimestamp(end)
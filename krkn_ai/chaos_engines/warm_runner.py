@@ -0,0 +1,128 @@
+'''
+This module keeps long-lived krkn-hub containers to dispatch scenarios into with "podman exec".
+
+Working Details:
+1. On first use of an image, a container is started with a no-op entrypoint that keeps it alive.
+2. Scenarios are run inside an idle container of their image with "podman exec", passing scenario env variables.
+3. A container runs one scenario at a time, a new one is started if all containers of an image are busy.
+4. Containers are removed when the process exits, or right away when a scenario running in them was terminated.
+'''
+import atexit
+import json
+import shlex
+import threading
+import uuid
+from collections import defaultdict
+from typing import Dict, List
+
+from krkn_ai.models.config import WarmRunnerConfig
+from krkn_ai.utils import run_shell
+from krkn_ai.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+PODMAN_WARM_START_TEMPLATE = 'podman run -d --rm --name {name} --env-host=true --net=host -v {kubeconfig}:/home/krkn/.kube/config:Z --entrypoint sleep {image} infinity'
+
+PODMAN_EXEC_TEMPLATE = 'podman exec -e PUBLISH_KRAKEN_STATUS="False" -e TELEMETRY_PROMETHEUS_BACKUP="False" -e WAIT_DURATION={wait_duration} {env_list} {name} {entrypoint}'
+
+
+class WarmContainer:
+    def __init__(self, name: str, image: str, entrypoint: str):
+        self.name = name
+        self.image = image
+        self.entrypoint = entrypoint
+        self.busy = False
+
+
+class WarmContainerPool:
+    def __init__(self, config: WarmRunnerConfig, kubeconfig: str):
+        self.config = config
+        self.kubeconfig = kubeconfig
+        self._lock = threading.Lock()
+        self._containers: Dict[str, List[WarmContainer]] = defaultdict(list)
+        self._image_locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+        atexit.register(self.shutdown)
+
+    def acquire(self, image: str) -> WarmContainer:
+        '''
+        Get an idle container for the image, starting a new one if required.
+        '''
+        with self._lock:
+            image_lock = self._image_locks[image]
+
+        # Lookup and start happen under the image lock, so concurrent callers don't both miss an idle
+        # container and start extra ones, while images that are not starting don't wait
+        with image_lock:
+            with self._lock:
+                for container in self._containers[image]:
+                    if not container.busy:
+                        container.busy = True
+                        return container
+
+            container = self.__start(image)
+            container.busy = True
+            with self._lock:
+                self._containers[image].append(container)
+            return container
+
+    def release(self, container: WarmContainer):
+        with self._lock:
+            container.busy = False
+
+    def discard(self, container: WarmContainer):
+        '''
+        Remove container instead of reusing it, e.g. when a scenario was terminated
+        and krkn might still be running inside it.
+        '''
+        with self._lock:
+            containers = self._containers[container.image]
+            if container in containers:
+                containers.remove(container)
+        logger.debug("Removing warm krkn container %s", container.name)
+        run_shell(f"podman rm -f {container.name}", do_not_log=True)
+
+    def exec_command(self, container: WarmContainer, env_list: str, wait_duration: int) -> str:
+        return PODMAN_EXEC_TEMPLATE.format(
+            wait_duration=wait_duration,
+            env_list=env_list,
+            name=container.name,
+            entrypoint=container.entrypoint,
+        )
+
+    def shutdown(self):
+        with self._lock:
+            containers = [c for containers in self._containers.values() for c in containers]
+            self._containers.clear()
+        for container in containers:
+            logger.debug("Removing warm krkn container %s", container.name)
+            run_shell(f"podman rm -f {container.name}", do_not_log=True)
+
+    def __start(self, image: str) -> WarmContainer:
+        name = f"krkn-ai-warm-{uuid.uuid4().hex[:8]}"
+        logger.info("Starting warm krkn container %s for image %s", name, image)
+        log, returncode = run_shell(
+            PODMAN_WARM_START_TEMPLATE.format(name=name, kubeconfig=self.kubeconfig, image=image),
+            do_not_log=True,
+        )
+        if returncode != 0:
+            raise Exception(f"Unable to start warm krkn container for image {image}: {log}")
+        return WarmContainer(name, image, self.__image_entrypoint(image))
+
+    def __image_entrypoint(self, image: str) -> str:
+        '''
+        Read the command that the image runs by default, so it can be run with "podman exec".
+        '''
+        output, returncode = run_shell(
+            f"podman image inspect --format '{{{{json .Config}}}}' {image}",
+            do_not_log=True,
+        )
+        if returncode == 0:
+            try:
+                image_config = json.loads(output)
+                command = (image_config.get("Entrypoint") or []) + (image_config.get("Cmd") or [])
+                if len(command) > 0:
+                    return shlex.join(command)
+            except (ValueError, AttributeError):
+                pass
+        logger.warning("Unable to inspect entrypoint of image %s, using %s", image, self.config.entrypoint)
+        return self.config.entrypoint
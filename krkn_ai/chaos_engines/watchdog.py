@@ -0,0 +1,84 @@
+'''
+This module is used to stop krkn scenarios that run past their expected duration.
+
+Working Details:
+1. Expected duration is derived from the scenario's declared duration parameters.
+2. A timer is started with the expected duration plus krkn wait duration and a grace period.
+3. If the timer fires before the run ends, the stop event is set, which terminates the krkn process.
+   krknctl doesn't stop its scenario containers when terminated, the runner stops them with podman
+   (see KrknContainerTracker).
+4. The runner then calculates a partial fitness from the data collected until that point.
+'''
+import threading
+from typing import List
+
+from krkn_ai.models.scenario.base import BaseScenario, CompositeDependency, CompositeScenario, Scenario
+from krkn_ai.models.scenario.parameters import (
+    DNSOutageDurationParameter,
+    DummyEndParameter,
+    DurationParameter,
+    ExpRecoveryTimeParameter,
+    KillTimeoutParameter,
+    StandardDurationParameter,
+    TotalChaosDurationParameter,
+)
+from krkn_ai.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Parameters that declare how long a scenario is going to run (in seconds)
+DURATION_PARAMETERS = (
+    DNSOutageDurationParameter,
+    DummyEndParameter,
+    DurationParameter,
+    ExpRecoveryTimeParameter,
+    KillTimeoutParameter,
+    StandardDurationParameter,
+    TotalChaosDurationParameter,
+)
+
+
+def get_expected_duration(scenario: BaseScenario) -> float:
+    '''
+    Expected run time of a scenario from its declared duration parameters (in seconds).
+    '''
+    if isinstance(scenario, CompositeScenario):
+        duration_a = get_expected_duration(scenario.scenario_a)
+        duration_b = get_expected_duration(scenario.scenario_b)
+        if scenario.dependency == CompositeDependency.NONE:
+            # Both scenarios run in parallel after the dummy root scenario
+            return DummyEndParameter().value + max(duration_a, duration_b)
+        return duration_a + duration_b
+    if isinstance(scenario, Scenario):
+        duration = 0
+        for param in scenario.parameters:
+            if isinstance(param, DURATION_PARAMETERS):
+                try:
+                    duration += float(param.value)
+                except (TypeError, ValueError):
+                    logger.debug("Unable to parse duration parameter %s", param)
+        return duration
+    return 0
+
+
+class ScenarioWatchdog:
+    def __init__(self, scenarios: List[BaseScenario], extra_time: float, stop_event: threading.Event):
+        self.timeout = max([get_expected_duration(x) for x in scenarios] + [0]) + extra_time
+        self.stop_event = stop_event
+        self.expired = False
+        self._timer = None
+
+    def start(self):
+        logger.debug("Starting scenario watchdog with %.0f seconds deadline", self.timeout)
+        self._timer = threading.Timer(self.timeout, self.__expire)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def cancel(self):
+        if self._timer is not None:
+            self._timer.cancel()
+
+    def __expire(self):
+        logger.warning("Scenario exceeded its deadline of %.0f seconds, terminating run", self.timeout)
+        self.expired = True
+        self.stop_event.set()
@@ -1,12 +1,13 @@
 import logging
 import datetime
 from enum import Enum
-from typing import Dict, List
+from typing import Dict, List, Optional
 from dataclasses import dataclass
 from pydantic import BaseModel, Field
 
 from krkn_ai.models.scenario.base import BaseScenario
-from krkn_ai.models.config import HealthCheckResult
+from krkn_ai.models.config import LoadTestResult
+from krkn_ai.models.health_check_samples import HealthCheckSamples
 from krkn_ai.utils import id_generator
 
 
@@ -26,11 +27,25 @@ class FitnessResult(BaseModel):
     scores: List[FitnessScoreResult] = []
     health_check_failure_score: float = 0.0 # Health check failure score
     health_check_response_time_score: float = 0.0 # Health check response time score
+    health_check_baseline_score: float = 0.0  # How consistently response times were slower than the pre-chaos baseline
+    health_check_throughput_score: float = 0.0  # Shortfall of achieved vs target RPS of generated load
+    health_check_latency_score: float = 0.0  # p99 latency of generated load relative to request timeout
+    health_check_p50: float = 0.0  # Worst p50 latency of generated load (in seconds)
+    health_check_p99: float = 0.0  # Worst p99 latency of generated load (in seconds)
+    health_check_p999: float = 0.0  # Worst p99.9 latency of generated load (in seconds)
+    health_check_achieved_rps: float = 0.0  # Requests per second completed across generated load
     krkn_failure_score: float = 0.0 # Krkn failure score
     fitness_score: float = 0.0    # Overall fitness score
+    partial: bool = False   # Calculated from data collected before the run was terminated
 
 
 
+class RunAbortReason(str, Enum):
+    WATCHDOG_TIMEOUT = "watchdog_timeout"   # Scenario exceeded its expected duration
+    SLO_THRESHOLD = "slo_threshold"   # Scenario crossed an SLO threshold while running
+    HEALTH_CHECK_FAILURE = "health_check_failure"   # Aborted on health check failure (stop_watcher_on_failure)
+
+
 class CommandRunResult(BaseModel):
     generation_id: int      # Which generation was scenario referred
     scenario_id: int = Field(default_factory=lambda: next(auto_id))        # Scenario ID
@@ -40,8 +55,18 @@ class CommandRunResult(BaseModel):
     returncode: int         # Return code of Krkn-Hub scenario execution
     start_time: datetime.datetime   # Start date timestamp of the test 
     end_time: datetime.datetime     # End date timestamp of the test
+    chaos_start_time: Optional[datetime.datetime] = None  # When chaos injection started (from krkn telemetry)
+    chaos_end_time: Optional[datetime.datetime] = None    # When chaos injection ended (from krkn telemetry)
     fitness_result: FitnessResult   # Fitness result measured for scenario.
-    health_check_results: Dict[str, List[HealthCheckResult]] = {}
+    health_check_results: Dict[str, HealthCheckSamples] = {}  # Probes per URL, saved as a list of HealthCheckResult
+    load_results: Dict[str, LoadTestResult] = {}  # Generated load per URL
+    health_check_baseline: Dict[str, HealthCheckSamples] = Field(default={}, exclude=True)  # Probes per URL before the scenario
+    recovery_duration: float = 0.0  # Time spent waiting for cluster recovery (in seconds)
+    batch_id: Optional[int] = None  # Scenarios run together in a single graph share a batch id
+    lock_wait_time: float = 0.0  # Time spent waiting for scheduler leases (in seconds)
+    abort_reason: Optional[RunAbortReason] = None  # Why the run was terminated early, if it was
+    time_saved: float = 0.0  # Expected run time skipped by ending the run early (in seconds)
+    startup_duration: Optional[float] = None  # Time until krkn printed its first log line (in seconds)
 
 
 class KrknRunnerType(str, Enum):
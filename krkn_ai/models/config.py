@@ -78,6 +78,16 @@ class FitnessFunctionType(str, Enum):
     range = 'range'
 
 
+class RangeAggregator(str, Enum):
+    last = 'last'  # Query evaluated once at the end of the test, with $range$ set to the test window
+    max = 'max'
+    mean = 'mean'
+    p95 = 'p95'
+    p99 = 'p99'
+    integral = 'integral'
+    rate = 'rate'
+
+
 auto_id = id_generator()
 
 
@@ -85,6 +95,7 @@ class FitnessFunctionItem(BaseModel):
     id: int = Field(default_factory=lambda: next(auto_id))  # Auto-increment ID
     query: str  # PromQL
     type: FitnessFunctionType = FitnessFunctionType.point
+    aggregator: RangeAggregator = RangeAggregator.last  # How range samples are reduced to a score
     weight: float = 1.0
 
     @field_validator('weight', mode='after')
@@ -95,13 +106,31 @@ class FitnessFunctionItem(BaseModel):
         return value
 
 
+class FitnessRetryConfig(BaseModel):
+    '''
+    Retries of fitness queries while Prometheus has not ingested data for the end of the test yet.
+    Delay doubles after every attempt (with jitter) until deadline is reached.
+    '''
+    initial_delay: float = 1  # in seconds
+    max_delay: float = 15  # in seconds
+    deadline: int = 60  # Total time to wait for fitness data (in seconds)
+    check_freshness: bool = True  # Wait until newest scraped sample is past the end of the test
+
+
 class FitnessFunction(BaseModel):
     query: Union[str, None] = None  # PromQL
     type: FitnessFunctionType = FitnessFunctionType.point
+    aggregator: RangeAggregator = RangeAggregator.last  # How range samples are reduced to a score
+    scrape_interval: int = 30  # Prometheus scrape interval (in seconds), floor for range query steps and "$range$"
     include_krkn_failure: bool = True
     include_health_check_failure: bool = True
     include_health_check_response_time: bool = True
+    include_health_check_load: bool = True  # Only applies to health checks with a load profile
     items: List[FitnessFunctionItem] = []
+    use_chaos_window: bool = False  # Query only the chaos injection window reported in krkn telemetry instead of the whole run
+    max_concurrency: int = 4  # Number of items evaluated in parallel
+    timeout: int = 120  # Deadline to evaluate all items (in seconds)
+    retry: FitnessRetryConfig = FitnessRetryConfig()
 
     @model_validator(mode='after')
     def check_fitness_definition_exists(self):
@@ -111,6 +140,17 @@ class FitnessFunction(BaseModel):
         return self
 
 
+class HealthCheckLoadProfile(BaseModel):
+    '''
+    Load generated against a health check URL while the scenario runs.
+    Requests are sent at a constant rate, latency is measured from the scheduled send time
+    so requests queued behind slow responses are included.
+    '''
+    rps: float  # Target requests per second
+    concurrency: int = 10  # Max requests in flight
+    duration: Optional[int] = None  # Stop generating load after this long, runs until the watcher stops by default (in seconds)
+
+
 class HealthCheckApplicationConfig(BaseModel):
     '''
     Health check configuration for the application.
@@ -121,12 +161,133 @@ class HealthCheckApplicationConfig(BaseModel):
     status_code: int = 200  # Expected status code
     timeout: int = 4   # in seconds
     interval: int = 2   # in seconds
+    load: Optional[HealthCheckLoadProfile] = None  # Generate load in addition to health check probes
+
+class HealthCheckBaselineConfig(BaseModel):
+    '''
+    Probe health check URLs before each scenario, so response times under chaos
+    can be compared against the same endpoints without chaos.
+    '''
+    enable: bool = False
+    duration: int = 30  # How long to probe before the scenario (in seconds)
+    max_age: int = 600  # Reuse a baseline collected within this long (in seconds)
+
 
 class HealthCheckConfig(BaseModel):
     stop_watcher_on_failure: bool = False
+    abort_on_failure: bool = False  # With stop_watcher_on_failure, also terminate the running krkn scenario
+    max_concurrency: int = 50  # Max health check requests in flight at once
+    online_scoring: bool = False  # Estimate response time outliers while probes arrive instead of after the run
+    jitter: float = 0.0  # Random delay added to each probe, as a fraction of interval (0.0-1.0)
+    stream_results: bool = False  # Write probes to a CSV file per scenario as they arrive, only summaries stay in memory
+    baseline: HealthCheckBaselineConfig = HealthCheckBaselineConfig()
     applications: List[HealthCheckApplicationConfig] = []
 
 
+class RecoveryConfig(BaseModel):
+    '''
+    Adaptive recovery wait after each scenario run.
+    When enabled, krkn waits only for krkn_wait_duration and Krkn-AI then polls
+    recovery signals until they are stable for stable_window seconds (capped by max_wait).
+    '''
+    enable: bool = False
+    krkn_wait_duration: int = 0  # Wait duration passed to krkn when adaptive recovery is enabled (in seconds)
+    poll_interval: int = 5  # in seconds
+    stable_window: int = 30  # Signals must stay healthy for this long (in seconds)
+    max_wait: int = const.WAIT_DURATION  # Hard cap on recovery wait (in seconds)
+    check_pods: bool = True  # Pods in scenario target namespaces are Ready
+    check_health_checks: bool = True  # Health check endpoints return expected status
+    check_slo: bool = True  # Fitness SLO queries back to pre-chaos baseline
+    slo_tolerance: float = 0.1  # Allowed relative difference to pre-chaos baseline
+
+
+class PipelineConfig(BaseModel):
+    '''
+    Overlap fitness calculation and reporting of a finished scenario
+    with the execution of the next scenario.
+    '''
+    enable: bool = False
+    max_pending: int = 2  # Finished scenarios waiting for post-processing before next run blocks
+
+
+class BatchConfig(BaseModel):
+    '''
+    Pack independent, non-conflicting scenarios of a generation into a single krknctl graph run.
+    '''
+    enable: bool = False
+    max_size: int = 4  # Max scenarios per graph run
+
+
+class SchedulerConfig(BaseModel):
+    '''
+    Run scenarios of a generation in parallel. Scenarios take lease locks on
+    the namespaces, nodes and services they disrupt, so only non-overlapping scenarios run together.
+    Not supported together with health checks, which can't tell apart the impact of parallel scenarios.
+    '''
+    concurrency: int = 1  # Max scenarios running in parallel
+
+
+class WatchdogConfig(BaseModel):
+    '''
+    Terminate scenarios that run past their declared duration and salvage a partial fitness
+    from the health checks and Prometheus data collected so far.
+    '''
+    enable: bool = False
+    grace_period: int = 300  # Extra time on top of declared duration and wait duration (in seconds)
+    partial_fitness_discount: float = 0.5  # Multiplier for positive partial fitness scores during selection
+
+    @field_validator('partial_fitness_discount', mode='after')
+    @classmethod
+    def is_percent(cls, value: float) -> float:
+        if value < 0 or value > 1:
+            raise ValueError(f'{value} is outside the range [0.0, 1.0]')
+        return value
+
+
+class WarmRunnerConfig(BaseModel):
+    '''
+    Keep long-lived krkn-hub containers and run scenarios in them with "podman exec"
+    instead of starting a new container for every scenario (krknhub runner only).
+    '''
+    enable: bool = False
+    entrypoint: str = "/home/krkn/main.sh"  # Used when the image entrypoint can't be inspected
+
+
+class PrometheusCacheConfig(BaseModel):
+    '''
+    LRU cache of Prometheus query evaluations, at times aligned to fitness_function.scrape_interval.
+    '''
+    enable: bool = False
+    max_entries: int = 1024  # Least recently used results are evicted beyond this number of entries
+    path: Optional[str] = None  # Persist results to this sqlite file to reuse them across runs
+
+
+class BaselineSamplerConfig(BaseModel):
+    '''
+    Sample fitness queries in background while a generation runs, and calculate
+    fitness from the local samples. Prometheus is queried only when samples have a gap.
+    '''
+    enable: bool = False
+    interval: int = 15  # Time between samples (in seconds)
+    retention: int = 3600  # Samples older than this are dropped (in seconds)
+
+
+class SLOThreshold(BaseModel):
+    query: str  # PromQL, "$namespace$" is replaced with namespaces targeted by the scenario
+    type: FitnessFunctionType = FitnessFunctionType.point  # point: increase since scenario start, range: current value
+    threshold: float  # Scenario is ended once the value reaches this threshold
+
+
+class SLOMonitorConfig(BaseModel):
+    '''
+    Watch SLO queries while a scenario runs and end it early once a threshold is crossed.
+    The run is still scored, so clearly failing scenarios take less time to evaluate.
+    '''
+    enable: bool = False
+    poll_interval: int = 10  # in seconds
+    thresholds: List[SLOThreshold] = []
+
+
 class OutputConfig(BaseModel):
     """
     Configuration for output file naming formats.
@@ -143,12 +304,26 @@ class OutputConfig(BaseModel):
 class HealthCheckResult(BaseModel):
     name: str
     timestamp: str = Field(default_factory=lambda: datetime.datetime.now().isoformat())
-    response_time: float  # in seconds
+    response_time: float  # Total time including body read (in seconds)
+    connect_time: float = -1  # TCP and TLS handshake, 0 when a keep-alive connection was reused (in seconds)
+    ttfb: float = -1  # Time to first response byte (in seconds)
     status_code: int    # actual status code
     success: bool       # True if status code is as expected
     error: Optional[str] = None # Error message if the status code is not as expected
 
 
+class LoadTestResult(BaseModel):
+    name: str
+    target_rps: float
+    achieved_rps: float  # Completed requests per second
+    requests: int  # Completed requests
+    failures: int  # Requests with an unexpected status code or error
+    timeout: float  # Request timeout (in seconds)
+    p50: float  # in seconds
+    p99: float  # in seconds
+    p999: float  # in seconds
+
+
 class ConfigFile(BaseModel):
     kubeconfig_file_path: str  # Path to kubeconfig
     parameters: Dict[str, str] = {}
@@ -168,9 +343,38 @@ class ConfigFile(BaseModel):
 
     fitness_function: FitnessFunction
     health_checks: HealthCheckConfig = HealthCheckConfig()
+    recovery: RecoveryConfig = RecoveryConfig()
+    pipeline: PipelineConfig = PipelineConfig()
+    batch: BatchConfig = BatchConfig()
+    scheduler: SchedulerConfig = SchedulerConfig()
+    watchdog: WatchdogConfig = WatchdogConfig()
+    warm_runner: WarmRunnerConfig = WarmRunnerConfig()
+    prometheus_cache: PrometheusCacheConfig = PrometheusCacheConfig()
+    baseline_sampler: BaselineSamplerConfig = BaselineSamplerConfig()
+    slo_monitor: SLOMonitorConfig = SLOMonitorConfig()
 
     scenario: ScenarioConfig = ScenarioConfig()
 
     output: OutputConfig = OutputConfig()
 
     cluster_components: ClusterComponents
+
+    @model_validator(mode='after')
+    def check_scheduler_health_checks(self):
+        '''Health check results of parallel scenarios would include each other's impact.'''
+        if self.scheduler.concurrency > 1 and len(self.health_checks.applications) > 0:
+            raise ValueError(
+                "scheduler.concurrency > 1 is not supported with health_checks, "
+                "health check results can't be attributed to one of the scenarios running in parallel."
+            )
+        return self
+
+    @model_validator(mode='after')
+    def check_batch_health_checks(self):
+        '''Scenarios of a batch run concurrently as sibling graph nodes, like with scheduler.concurrency.'''
+        if self.batch.enable and len(self.health_checks.applications) > 0:
+            raise ValueError(
+                "batch.enable is not supported with health_checks, "
+                "health check results can't be attributed to one of the scenarios of a batch."
+            )
+        return self
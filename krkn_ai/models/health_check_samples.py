@@ -0,0 +1,314 @@
+'''
+Columnar storage of health check probes for a single endpoint.
+
+Working Details:
+1. Every probe appends one row to typed `array` columns (epoch ns timestamp, timings, status code,
+   success flag and index into an interned error table), instead of allocating a pydantic model.
+2. Scoring and reporting read the columns as NumPy arrays. With online scoring, IQR outlier stats of
+   successful response times are also maintained while probes arrive (see ResponseTimeOutliers).
+3. HealthCheckResult models are only built when CommandRunResult is serialized, so saved results
+   keep the same format. Loading them back converts the list into columns again.
+4. Optionally probes are streamed to a CSV file per scenario (HealthCheckSampleFile) instead, so they
+   survive a crash and don't stay in memory. Samples then only keep a summary and the file path,
+   columns are read from the file on demand with load().
+'''
+import bisect
+import copy
+import csv
+import datetime
+import math
+import os
+import time
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from pydantic_core import core_schema
+
+from krkn_ai.models.config import HealthCheckResult
+from krkn_ai.utils.quantiles import P2Quantile
+
+COLUMNS = ("timestamp", "response_time", "connect_time", "ttfb", "status_code", "success", "error")
+
+# Minimum number of successful probes to calculate response time outliers
+MIN_OUTLIER_SAMPLES = 4
+
+
+def _epoch_ns(value: datetime.datetime) -> int:
+    # Rounded to microseconds, which is the resolution of datetime
+    return round(value.timestamp() * 1e6) * 1000
+
+
+class ResponseTimeOutliers:
+    '''
+    Streaming count of response times above Q3 + 1.5 * IQR.
+    Quartiles are estimated with P², every sample is checked against the bound at the time it arrived.
+    '''
+    def __init__(self):
+        self.q1 = P2Quantile(0.25)
+        self.q3 = P2Quantile(0.75)
+        self.count = 0
+        self.outliers = 0
+        self._pending: List[float] = []  # Samples seen before quartiles could be estimated
+
+    def add(self, response_time: float):
+        self.q1.add(response_time)
+        self.q3.add(response_time)
+        self.count += 1
+        if self.count < MIN_OUTLIER_SAMPLES:
+            self._pending.append(response_time)
+            return
+        upper_bound = self.upper_bound()
+        for value in self._pending:
+            self.outliers += int(value > upper_bound)
+        self._pending = []
+        self.outliers += int(response_time > upper_bound)
+
+    def upper_bound(self) -> float:
+        q1, q3 = self.q1.value(), self.q3.value()
+        return q3 + 1.5 * (q3 - q1)
+
+
+class HealthCheckSampleFile:
+    '''
+    Append-only CSV with the probes of every URL of a scenario.
+    Rows are buffered and written in batches, at least every flush_interval seconds.
+    '''
+    HEADER = ("url", "name") + COLUMNS
+
+    def __init__(self, path: str, batch_size: int = 256, flush_interval: float = 5):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._rows: List[tuple] = []
+        self._last_flush = time.monotonic()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self.HEADER)
+
+    def write(self, row: tuple):
+        self._rows.append(row)
+        if len(self._rows) >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        self._writer.writerows(self._rows)
+        self._file.flush()
+        self._rows = []
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+
+class HealthCheckSamples:
+    def __init__(self, name: str = "", online: bool = False, file: Optional[HealthCheckSampleFile] = None, url: str = ""):
+        '''
+        file: Stream probes to this file instead of keeping them in memory, only the summary is kept.
+        '''
+        self.name = name
+        self.url = url
+        self.timestamp = array("q")  # Wall clock time of the probe (epoch ns)
+        self.response_time = array("d")  # in seconds, -1 when request failed
+        self.connect_time = array("d")  # in seconds, -1 when request failed
+        self.ttfb = array("d")  # in seconds, -1 when request failed
+        self.status_code = array("i")  # -1 when request failed
+        self.success = array("b")
+        self.error = array("i")  # Index into errors, -1 when there was no error
+        self.errors: List[str] = []
+        self._error_index: Dict[str, int] = {}
+        # Only covers the whole run, windows and loaded results fall back to scoring the columns
+        self.outliers: Optional[ResponseTimeOutliers] = ResponseTimeOutliers() if online else None
+
+        # Probes of file backed samples are read from path when needed
+        self.path: Optional[str] = file.path if file is not None else None
+        self._file = file
+        self._bounds: Tuple[Optional[int], Optional[int]] = (None, None)  # Window of file backed samples (epoch ns)
+
+        # Summary, also available without reading the file
+        self.count = 0
+        self.success_count = 0
+        self.response_time_min = math.inf
+        self.response_time_max = -math.inf
+        self.response_time_sum = 0.0
+
+    def append(
+        self,
+        timestamp: int,
+        response_time: float,
+        status_code: int,
+        success: bool,
+        error: Optional[str] = None,
+        connect_time: float = -1,
+        ttfb: float = -1,
+    ):
+        self.count += 1
+        self.success_count += int(success)
+        self.response_time_min = min(self.response_time_min, response_time)
+        self.response_time_max = max(self.response_time_max, response_time)
+        self.response_time_sum += response_time
+        if success and self.outliers is not None:
+            self.outliers.add(response_time)
+
+        if self._file is not None:
+            self._file.write((
+                self.url, self.name, timestamp, response_time, connect_time, ttfb,
+                status_code, int(success), error if error is not None else "",
+            ))
+            return
+        self.timestamp.append(timestamp)
+        self.response_time.append(response_time)
+        self.connect_time.append(connect_time)
+        self.ttfb.append(ttfb)
+        self.status_code.append(status_code)
+        self.success.append(success)
+        self.error.append(self.__intern_error(error))
+
+    def __intern_error(self, error: Optional[str]) -> int:
+        if error is None:
+            return -1
+        index = self._error_index.get(error)
+        if index is None:
+            index = len(self.errors)
+            self.errors.append(error)
+            self._error_index[error] = index
+        return index
+
+    def __len__(self) -> int:
+        return self.count
+
+    def load(self) -> "HealthCheckSamples":
+        '''In memory samples, read from file for file backed samples.'''
+        if self.path is None:
+            return self
+        if self.count == 0:
+            return HealthCheckSamples(self.name, url=self.url)
+        return self.__read(self._bounds)
+
+    def __read(self, bounds: Tuple[Optional[int], Optional[int]]) -> "HealthCheckSamples":
+        '''Rows of this URL within bounds (epoch ns), other rows are skipped while reading.'''
+        samples = HealthCheckSamples(self.name, url=self.url)
+        if not os.path.exists(self.path):
+            return samples
+        start, end = bounds
+        with open(self.path, "r", newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                if row["url"] != self.url:
+                    continue
+                timestamp = int(row["timestamp"])
+                if (start is not None and timestamp < start) or (end is not None and timestamp > end):
+                    continue
+                samples.append(
+                    timestamp=timestamp,
+                    response_time=float(row["response_time"]),
+                    status_code=int(row["status_code"]),
+                    success=row["success"] == "1",
+                    error=row["error"] or None,
+                    connect_time=float(row["connect_time"]),
+                    ttfb=float(row["ttfb"]),
+                )
+        return samples
+
+    def column(self, name: str) -> np.ndarray:
+        '''Copy of a column as NumPy array (e.g. "response_time", "success"), use load() first to read a file once.'''
+        values = np.array(getattr(self.load(), name))
+        return values.astype(bool) if name == "success" else values
+
+    def window(self, start: datetime.datetime, end: datetime.datetime) -> "HealthCheckSamples":
+        '''Samples taken between start and end (inclusive), probes are appended in time order.'''
+        if self.path is not None:
+            # Only rows within the window are read, and only the summary of the window is kept in memory
+            window = HealthCheckSamples(self.name, url=self.url)
+            window.path = self.path
+            low, high = self._bounds
+            window._bounds = (
+                _epoch_ns(start) if low is None else max(low, _epoch_ns(start)),
+                _epoch_ns(end) if high is None else min(high, _epoch_ns(end)),
+            )
+            if self.count > 0:
+                self.__read(window._bounds).__copy_summary(window)
+            return window
+        low = bisect.bisect_left(self.timestamp, _epoch_ns(start))
+        high = bisect.bisect_right(self.timestamp, _epoch_ns(end))
+        return self.__slice(low, high)
+
+    def __deepcopy__(self, memo) -> "HealthCheckSamples":
+        # Columns are plain memory, copying them is much cheaper than the default deepcopy
+        samples = self.__slice(0, len(self.timestamp))
+        samples.path = self.path
+        samples._bounds = self._bounds
+        self.__copy_summary(samples)
+        samples.outliers = copy.deepcopy(self.outliers, memo)
+        return samples
+
+    def __slice(self, low: int, high: int) -> "HealthCheckSamples":
+        samples = HealthCheckSamples(self.name, url=self.url)
+        for column in COLUMNS:
+            setattr(samples, column, getattr(self, column)[low:high])
+        samples.errors = list(self.errors)
+        samples._error_index = dict(self._error_index)
+        samples.count = len(samples.timestamp)
+        samples.success_count = sum(samples.success)
+        if samples.count > 0:
+            samples.response_time_min = min(samples.response_time)
+            samples.response_time_max = max(samples.response_time)
+            samples.response_time_sum = sum(samples.response_time)
+        return samples
+
+    def __copy_summary(self, target: "HealthCheckSamples"):
+        target.count = self.count
+        target.success_count = self.success_count
+        target.response_time_min = self.response_time_min
+        target.response_time_max = self.response_time_max
+        target.response_time_sum = self.response_time_sum
+
+    def to_results(self) -> List[HealthCheckResult]:
+        samples = self.load()
+        return [
+            HealthCheckResult(
+                name=samples.name,
+                timestamp=datetime.datetime.fromtimestamp(samples.timestamp[i] / 1e9).isoformat(),
+                response_time=samples.response_time[i],
+                connect_time=samples.connect_time[i],
+                ttfb=samples.ttfb[i],
+                status_code=samples.status_code[i],
+                success=bool(samples.success[i]),
+                error=samples.errors[samples.error[i]] if samples.error[i] >= 0 else None,
+            )
+            for i in range(len(samples))
+        ]
+
+    @classmethod
+    def from_results(cls, results: List[HealthCheckResult]) -> "HealthCheckSamples":
+        samples = cls(results[0].name if len(results) > 0 else "")
+        for result in results:
+            samples.append(
+                timestamp=_epoch_ns(datetime.datetime.fromisoformat(result.timestamp)),
+                response_time=result.response_time,
+                status_code=result.status_code,
+                success=result.success,
+                error=result.error,
+                connect_time=result.connect_time,
+                ttfb=result.ttfb,
+            )
+        return samples
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source_type: Any, handler) -> core_schema.CoreSchema:
+        # Validated from and serialized to List[HealthCheckResult]
+        results_schema = handler.generate_schema(List[HealthCheckResult])
+        from_results_schema = core_schema.no_info_after_validator_function(cls.from_results, results_schema)
+        return core_schema.json_or_python_schema(
+            json_schema=from_results_schema,
+            python_schema=core_schema.union_schema([
+                core_schema.is_instance_schema(cls),
+                from_results_schema,
+            ]),
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                lambda samples: samples.to_results(),
+                return_schema=results_schema,
+            ),
+        )
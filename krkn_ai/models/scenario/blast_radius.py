@@ -0,0 +1,85 @@
+'''
+Blast radius of a scenario, i.e. cluster resources that are disrupted when the scenario runs.
+
+Resources are represented as "<kind>/<name>" strings:
+- namespace/<namespace>
+- node/<node name>
+- service/<namespace>/<service name>
+
+A "<kind>/*" wildcard is used when the target cannot be resolved upfront
+(e.g. krkn picks a random node), and it conflicts with every resource of that kind.
+'''
+from typing import Set
+
+from krkn_ai.models.cluster_components import ClusterComponents
+from krkn_ai.models.scenario.base import BaseScenario, CompositeScenario, Scenario
+
+WILDCARD = "*"
+
+
+def get_blast_radius(scenario: BaseScenario) -> Set[str]:
+    '''
+    Derive the resources disrupted by a scenario from its parameters.
+    '''
+    if isinstance(scenario, CompositeScenario):
+        return get_blast_radius(scenario.scenario_a) | get_blast_radius(scenario.scenario_b)
+    if not isinstance(scenario, Scenario):
+        return set()
+
+    params = {param.krknhub_name: param.value for param in scenario.parameters}
+    cluster_components = scenario._cluster_components
+    namespace = params.get("NAMESPACE", "")
+    resources = set()
+
+    if "NODE_SELECTOR" in params:
+        # Node hog scenarios, namespace only hosts the hog pods
+        resources |= _resolve_nodes(params["NODE_SELECTOR"], cluster_components)
+    elif namespace:
+        resources.add(f"namespace/{namespace}")
+
+    if params.get("NODE_NAME"):
+        resources.add(f"node/{params['NODE_NAME']}")
+
+    if params.get("LABEL_SELECTOR") and not namespace:
+        # Label selector without namespace targets nodes (e.g. time scenarios with object type node)
+        resources |= _resolve_nodes(params["LABEL_SELECTOR"], cluster_components)
+
+    if params.get("TARGET_SERVICE"):
+        resources.add(f"service/{namespace}/{params['TARGET_SERVICE']}")
+
+    return resources
+
+
+def is_conflicting(radius_a: Set[str], radius_b: Set[str]) -> bool:
+    '''
+    Check whether two blast radiuses overlap.
+    '''
+    if radius_a & radius_b:
+        return True
+    kinds_a = set(resource.split("/")[0] for resource in radius_a)
+    kinds_b = set(resource.split("/")[0] for resource in radius_b)
+    for resource in radius_a:
+        kind, name = resource.split("/", 1)
+        if name == WILDCARD and kind in kinds_b:
+            return True
+    for resource in radius_b:
+        kind, name = resource.split("/", 1)
+        if name == WILDCARD and kind in kinds_a:
+            return True
+    return False
+
+
+def _resolve_nodes(selector: str, cluster_components: ClusterComponents) -> Set[str]:
+    '''
+    Find nodes matching a "key=value" label selector.
+    '''
+    if not selector or "=" not in selector:
+        return set([f"node/{WILDCARD}"])
+    key, value = selector.split("=", 1)
+    nodes = set([
+        f"node/{node.name}" for node in cluster_components.nodes
+        if node.labels.get(key) == value
+    ])
+    if len(nodes) == 0:
+        return set([f"node/{WILDCARD}"])
+    return nodes
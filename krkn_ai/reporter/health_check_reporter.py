@@ -2,6 +2,7 @@ import os
 from datetime import datetime
 import pandas as pd
 
+import matplotlib
 import seaborn as sns
 import matplotlib.pyplot as plt
 from matplotlib.colors import LinearSegmentedColormap, ListedColormap
@@ -15,6 +16,10 @@ from krkn_ai.models.scenario.base import Scenario
 from krkn_ai.utils.logger import get_logger
 from krkn_ai.utils.output import format_result_filename
 
+# Graphs are only saved to files and can be plotted from a background pipeline thread,
+# matplotlib switches pyplot to the non-interactive backend as no figure exists yet
+matplotlib.use("Agg")
+
 logger = get_logger(__name__)
 
 class HealthCheckReporter:
@@ -34,11 +39,12 @@ class HealthCheckReporter:
             for component_results in health_check_results:
                 if len(component_results) == 0:
                     break
-                component_name = component_results[0].name
-                min_response_time = min([result.response_time for result in component_results])
-                max_response_time = max([result.response_time for result in component_results])
-                average_response_time = sum([result.response_time for result in component_results]) / len(component_results)
-                success_count = sum([result.success for result in component_results])
+                component_name = component_results.name
+                # Summary is kept in memory, samples streamed to a file aren't read
+                min_response_time = component_results.response_time_min
+                max_response_time = component_results.response_time_max
+                average_response_time = component_results.response_time_sum / len(component_results)
+                success_count = component_results.success_count
                 failure_count = len(component_results) - success_count
 
                 results.append({
@@ -82,16 +88,18 @@ class HealthCheckReporter:
         save_path = os.path.join(output_dir, graph_filename)
 
         # Flatten the data
-        records = []
-        for _, health_check_results in result.health_check_results.items():
-            for health_check_result in health_check_results:
-                records.append({
-                    "application": health_check_result.name,
-                    "timestamp": pd.to_datetime(health_check_result.timestamp),
-                    "response_time": health_check_result.response_time,
-                    "success": 1 if health_check_result.success else 0,
-                })
-        df = pd.DataFrame(records)
+        df = pd.concat([
+            pd.DataFrame({
+                "application": samples.name,
+                "timestamp": samples.column("timestamp"),
+                "response_time": samples.column("response_time"),
+                "success": samples.column("success").astype(int),
+            })
+            for samples in [x.load() for x in result.health_check_results.values()]
+        ])
+        # Samples are stored as epoch ns, show them in local time
+        df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ns", utc=True) \
+            .dt.tz_convert(datetime.now().astimezone().tzinfo).dt.tz_localize(None)
         df = df.sort_values("timestamp")
         
         # Create formatted timestamp strings for display
@@ -163,6 +171,11 @@ class HealthCheckReporter:
             **fitness_function_slos,
             "health_check_failure_score": fitness_result.fitness_result.health_check_failure_score,
             "health_check_response_time_score": fitness_result.fitness_result.health_check_response_time_score,
+            "health_check_baseline_score": fitness_result.fitness_result.health_check_baseline_score,
+            "health_check_throughput_score": fitness_result.fitness_result.health_check_throughput_score,
+            "health_check_latency_score": fitness_result.fitness_result.health_check_latency_score,
+            "health_check_p99": fitness_result.fitness_result.health_check_p99,
+            "health_check_achieved_rps": fitness_result.fitness_result.health_check_achieved_rps,
             "krkn_failure_score": fitness_result.fitness_result.krkn_failure_score,
             "fitness_score": fitness_result.fitness_result.fitness_score,
         }])
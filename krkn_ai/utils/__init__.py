@@ -1,33 +1,75 @@
+import itertools
+import os
 import shlex
+import signal
 import subprocess
-from typing import Iterator
+import threading
+from typing import Callable, Iterator
 
 from krkn_ai.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 
+class _IdGenerator:
+    '''Auto-increment ids starting at 1, safe to share between threads.'''
+    def __init__(self):
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> int:
+        with self._lock:
+            return next(self._counter)
+
+
 def id_generator() -> Iterator[int]:
-    i = 1
-    while True:
-        yield i
-        i += 1
+    return _IdGenerator()
 
 
-def run_shell(command, do_not_log=False):
+def run_shell(command, do_not_log=False, stop_event: threading.Event = None, on_line: Callable[[str], None] = None):
     '''
     Run shell command and get logs and statuscode in output.
+    If stop_event is provided, the command's process group is terminated once the event is set.
+    If on_line is provided, it is called with each output line as soon as it is read.
     '''
     logger.debug("Running command: %s", command)
     logs = ""
     command = shlex.split(command)
     process = subprocess.Popen(
-        command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+        command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+        start_new_session=stop_event is not None,
     )
+    if stop_event is not None:
+        threading.Thread(
+            target=_terminate_on_event, args=(process, stop_event), daemon=True
+        ).start()
     for line in process.stdout:
         if not do_not_log:
             logger.debug("%s", line.rstrip())
+        if on_line is not None:
+            on_line(line)
         logs += line
     process.wait()
     logger.debug("Run Status: %d", process.returncode)
     return logs, process.returncode
+
+
+def _terminate_on_event(process: subprocess.Popen, stop_event: threading.Event, grace_period: int = 10):
+    '''
+    Terminate process group once stop_event is set, kill it if it doesn't exit within grace_period.
+    '''
+    while process.poll() is None:
+        if not stop_event.wait(0.5):
+            continue
+        logger.debug("Terminating process group %d", process.pid)
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+            process.wait(timeout=grace_period)
+        except subprocess.TimeoutExpired:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        return
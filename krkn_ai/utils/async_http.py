@@ -0,0 +1,222 @@
+'''
+Minimal asyncio HTTP/1.1 client used by health checks, built on asyncio streams
+so that hundreds of endpoints can be polled from a single event loop without extra dependencies.
+
+Each HttpSession keeps idle keep-alive connections per origin, so repeated probes don't pay
+TCP and TLS handshakes, and times every request with time.perf_counter_ns.
+
+Like requests, proxies are read from the http_proxy, https_proxy and no_proxy environment variables.
+HTTP URLs are requested from the proxy in absolute-form, HTTPS URLs through a CONNECT tunnel.
+'''
+import asyncio
+import base64
+import ssl
+import time
+import urllib.request
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import unquote, urljoin, urlsplit
+
+MAX_REDIRECTS = 5
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+Connection = Tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+# Host, port and Proxy-Authorization header value (None without credentials) of a proxy
+Proxy = Tuple[str, int, Optional[str]]
+
+# Scheme, host, port of the target and the proxy used to reach it
+Origin = Tuple[str, str, int, Optional[Proxy]]
+
+
+class HttpResponse:
+    def __init__(self, status_code: int, headers: Dict[str, str], connect_time: float, ttfb: float, total: float):
+        self.status_code = status_code
+        self.headers = headers
+        self.connect_time = connect_time  # TCP and TLS handshake, 0 when connection was reused (in seconds)
+        self.ttfb = ttfb  # Time until first byte of the response (in seconds)
+        self.total = total  # Time until body was read completely (in seconds)
+
+
+class HttpSession:
+    def __init__(self, max_idle: int = 2):
+        self.max_idle = max_idle
+        self._idle: Dict[Origin, List[Connection]] = defaultdict(list)
+        self._ssl_context = None
+        self._proxies = urllib.request.getproxies()
+
+    async def get(self, url: str, timeout: float) -> HttpResponse:
+        '''
+        GET url following redirects, the whole request must complete within timeout seconds.
+        Raises asyncio.TimeoutError, OSError or ValueError on failure.
+        '''
+        return await asyncio.wait_for(self.__get_following_redirects(url), timeout)
+
+    async def close(self):
+        for connections in self._idle.values():
+            for _, writer in connections:
+                await self.__close(writer)
+        self._idle.clear()
+
+    async def __get_following_redirects(self, url: str) -> HttpResponse:
+        for _ in range(MAX_REDIRECTS + 1):
+            response = await self.__get(url)
+            location = response.headers.get("location")
+            if response.status_code not in (301, 302, 303, 307, 308) or location is None:
+                return response
+            url = urljoin(url, location)
+        raise ValueError(f"Exceeded {MAX_REDIRECTS} redirects")
+
+    async def __get(self, url: str) -> HttpResponse:
+        parts = urlsplit(url)
+        if parts.scheme not in DEFAULT_PORTS or not parts.hostname:
+            raise ValueError(f"Unsupported URL: {url}")
+        port = parts.port or DEFAULT_PORTS[parts.scheme]
+        origin = (parts.scheme, parts.hostname, port, self.__proxy(parts.scheme, parts.hostname))
+        # Host header without userinfo, port only when it isn't the default of the scheme
+        host = f"[{parts.hostname}]" if ":" in parts.hostname else parts.hostname
+        if port != DEFAULT_PORTS[parts.scheme]:
+            host += f":{port}"
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+        headers = ""
+        if origin[3] is not None and parts.scheme == "http":
+            # Plain HTTP is sent to the proxy with the absolute URL as request target
+            target = f"http://{host}{target}"
+            if origin[3][2] is not None:
+                headers = f"Proxy-Authorization: {origin[3][2]}\r\n"
+        request = (
+            f"GET {target} HTTP/1.1\r\n"
+            f"Host: {host}\r\n"
+            f"{headers}"
+            "User-Agent: krkn-ai\r\n"
+            "Accept: */*\r\n"
+            "Connection: keep-alive\r\n\r\n"
+        ).encode()
+
+        # Pooled connection might have been closed by the server in the meantime, retry once on a new one
+        while self._idle[origin]:
+            connection = self._idle[origin].pop()
+            try:
+                return await self.__request(origin, connection, request, time.perf_counter_ns(), 0)
+            except (OSError, ValueError, asyncio.IncompleteReadError):
+                await self.__close(connection[1])
+            except BaseException:
+                # Timed out or cancelled, don't wait for the connection to close
+                connection[1].close()
+                raise
+
+        start = time.perf_counter_ns()
+        connection = await self.__connect(origin)
+        connect_time = time.perf_counter_ns() - start
+        try:
+            return await self.__request(origin, connection, request, start, connect_time)
+        except BaseException:
+            connection[1].close()
+            raise
+
+    def __proxy(self, scheme: str, hostname: str) -> Optional[Proxy]:
+        '''Proxy configured for the scheme, None if there is none or hostname is excluded by no_proxy.'''
+        proxy_url = self._proxies.get(scheme)
+        if proxy_url is None or urllib.request.proxy_bypass_environment(hostname, self._proxies):
+            return None
+        if "://" not in proxy_url:
+            proxy_url = "http://" + proxy_url
+        proxy = urlsplit(proxy_url)
+        if proxy.scheme != "http" or not proxy.hostname:
+            raise ValueError(f"Unsupported proxy: {proxy_url}")
+        authorization = None
+        if proxy.username is not None:
+            credentials = f"{unquote(proxy.username)}:{unquote(proxy.password or '')}"
+            authorization = "Basic " + base64.b64encode(credentials.encode()).decode()
+        return proxy.hostname, proxy.port or 80, authorization
+
+    async def __connect(self, origin: Origin) -> Connection:
+        scheme, hostname, port, proxy = origin
+        ssl_context = self.__ssl_context() if scheme == "https" else None
+        if proxy is None:
+            return await asyncio.open_connection(hostname, port, ssl=ssl_context)
+
+        reader, writer = await asyncio.open_connection(proxy[0], proxy[1])
+        if scheme == "http":
+            return reader, writer
+        try:
+            # Tunnel to the target through the proxy, then upgrade the tunnel to TLS
+            authority = f"[{hostname}]:{port}" if ":" in hostname else f"{hostname}:{port}"
+            authorization = f"Proxy-Authorization: {proxy[2]}\r\n" if proxy[2] is not None else ""
+            writer.write(f"CONNECT {authority} HTTP/1.1\r\nHost: {authority}\r\n{authorization}\r\n".encode())
+            await writer.drain()
+            status_code, _ = await self.__read_head(await reader.readline(), reader)
+            if status_code != 200:
+                raise OSError(f"Proxy refused tunnel to {authority} with status {status_code}")
+            if not hasattr(writer, "start_tls"):
+                raise ValueError("HTTPS through a proxy requires Python 3.11 or newer")
+            await writer.start_tls(ssl_context, server_hostname=hostname)
+        except BaseException:
+            writer.close()
+            raise
+        return reader, writer
+
+    async def __request(self, origin, connection: Connection, request: bytes, start: int, connect_time: int) -> HttpResponse:
+        reader, writer = connection
+        writer.write(request)
+        await writer.drain()
+        status_line = await reader.readline()
+        ttfb = time.perf_counter_ns() - start
+        status_code, headers = await self.__read_head(status_line, reader)
+        reusable = await self.__read_body(status_code, headers, reader)
+        total = time.perf_counter_ns() - start
+
+        if reusable and len(self._idle[origin]) < self.max_idle:
+            self._idle[origin].append(connection)
+        else:
+            await self.__close(writer)
+        return HttpResponse(status_code, headers, connect_time / 1e9, ttfb / 1e9, total / 1e9)
+
+    async def __read_head(self, status_line: bytes, reader: asyncio.StreamReader) -> Tuple[int, Dict[str, str]]:
+        parts = status_line.decode("latin-1").split(" ", 2)
+        if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+            raise ValueError("Invalid HTTP response")
+        headers = {"http-version": parts[0]}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if line == "":
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        return int(parts[1]), headers
+
+    async def __read_body(self, status_code: int, headers: Dict[str, str], reader: asyncio.StreamReader) -> bool:
+        '''Read and discard response body, returns whether connection can be reused.'''
+        keep_alive = headers.get("connection", "").lower() != "close" and headers["http-version"] == "HTTP/1.1"
+        if status_code < 200 or status_code in (204, 304):
+            return keep_alive
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                size = int((await reader.readline()).split(b";")[0].strip(), 16)
+                if size == 0:
+                    # Skip trailers
+                    while (await reader.readline()).strip():
+                        pass
+                    return keep_alive
+                await reader.readexactly(size + 2)
+        if "content-length" in headers:
+            await reader.readexactly(int(headers["content-length"]))
+            return keep_alive
+        # Body is delimited by connection close
+        await reader.read()
+        return False
+
+    def __ssl_context(self) -> ssl.SSLContext:
+        if self._ssl_context is None:
+            self._ssl_context = ssl.create_default_context()
+        return self._ssl_context
+
+    async def __close(self, writer: asyncio.StreamWriter):
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except (OSError, ssl.SSLError):
+            pass
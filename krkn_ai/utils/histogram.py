@@ -0,0 +1,54 @@
+'''
+Latency histogram with logarithmic buckets, in the spirit of HdrHistogram.
+
+Working Details:
+1. Bucket i covers values up to lowest * (1 + precision) ^ (i + 1), so every recorded value
+   is reported with a relative error of at most precision, from microseconds to hours.
+2. Recording is a single counter increment, memory is fixed regardless of sample count.
+3. Percentiles are read from the cumulative bucket counts.
+'''
+import math
+from array import array
+
+import numpy as np
+
+
+class LatencyHistogram:
+    def __init__(self, lowest: float = 1e-6, highest: float = 3600, precision: float = 0.01):
+        '''
+        lowest, highest: Range of values tracked with the given precision (in seconds),
+        values outside the range are counted in the first or last bucket.
+        '''
+        self.lowest = lowest
+        self._log_growth = math.log1p(precision)
+        self._buckets = self.__index(highest) + 1
+        self.counts = array("q", [0]) * self._buckets
+        self.count = 0
+        self.min = math.inf
+        self.max = 0.0
+
+    def __index(self, value: float) -> int:
+        if value <= self.lowest:
+            return 0
+        return int(math.log(value / self.lowest) / self._log_growth)
+
+    def record(self, value: float):
+        self.counts[min(self.__index(value), self._buckets - 1)] += 1
+        self.count += 1
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "LatencyHistogram"):
+        self.counts = array("q", np.asarray(self.counts) + np.asarray(other.counts))
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def percentile(self, p: float) -> float:
+        '''Value below which p percent of recorded values fall, 0 when histogram is empty.'''
+        if self.count == 0:
+            return 0.0
+        rank = max(math.ceil(p / 100 * self.count), 1)
+        index = int(np.searchsorted(np.cumsum(self.counts), rank))
+        upper = self.lowest * math.exp(self._log_growth * (index + 1))
+        return float(min(max(upper, self.min), self.max))
@@ -0,0 +1,58 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List
+
+from krkn_ai.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class OrderedPipeline:
+    '''
+    Runs submitted tasks on a single background thread in submission order.
+
+    At most max_pending tasks can be queued or running at once. Once the limit is
+    reached submit() blocks until a task finishes, which applies backpressure to the producer.
+    A task error is re-raised by the next submit(), check() or drain(), whichever comes first.
+    '''
+    def __init__(self, max_pending: int = 2):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="krkn-ai-pipeline")
+        self._slots = threading.BoundedSemaphore(max(max_pending, 1))
+        self._futures: List[Future] = []
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        self.check()
+        self._slots.acquire()
+        try:
+            # A task might have failed while waiting for a slot
+            self.check()
+        except BaseException:
+            self._slots.release()
+            raise
+        future = self._executor.submit(fn, *args, **kwargs)
+        future.add_done_callback(lambda _: self._slots.release())
+        self._futures.append(future)
+        return future
+
+    def drain(self):
+        '''
+        Wait for all submitted tasks to complete. Re-raises the first task error.
+        '''
+        futures, self._futures = self._futures, []
+        logger.debug("Waiting for %d pipeline tasks to complete", len([f for f in futures if not f.done()]))
+        for future in futures:
+            future.result()
+
+    def check(self):
+        '''Re-raise the first error of tasks that completed so far, instead of waiting for drain().'''
+        done, pending = [], []
+        for future in self._futures:
+            (done if future.done() else pending).append(future)
+        self._futures = pending
+        for future in done:
+            if future.exception() is not None:
+                logger.error("Pipeline task failed: %s", future.exception())
+                raise future.exception()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
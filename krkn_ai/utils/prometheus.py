@@ -1,13 +1,192 @@
 import os
 import json
+import math
+import datetime
+import threading
+import time as time_module
+from typing import Dict, List, Optional
 from krkn_lib.prometheus.krkn_prometheus import KrknPrometheus
 from krkn_ai.utils import run_shell
 from krkn_ai.utils.fs import env_is_truthy
 from krkn_ai.utils.logger import get_logger
+from krkn_ai.utils.query_cache import QueryCache
+from krkn_ai.models.config import PrometheusCacheConfig
 from krkn_ai.models.custom_errors import PrometheusConnectionError
 
 logger = get_logger(__name__)
 
+
+class PrometheusClient:
+    """
+    Access layer over KrknPrometheus used for fitness and SLO queries.
+
+    Unlike KrknPrometheus.process_query, instant queries can be evaluated at a given time,
+    and all returned series are kept so callers can aggregate them.
+
+    When a cache is given, queries are evaluated at times aligned to multiples of align seconds
+    ("now" included) and results are cached per evaluation time, so windows sharing a boundary
+    and range queries overlapping earlier ones reuse evaluations. Only evaluation times up to
+    the latest ingested scrape are cached, later results may still change.
+    When PROMETHEUS_RECORD_PATH is set, every query and its response is appended to that file
+    as JSON lines, to be replayed with scripts/fake-prometheus.
+    """
+    def __init__(self, krkn_prometheus: KrknPrometheus, cache: QueryCache = None, align: int = 1):
+        self.krkn_prometheus = krkn_prometheus
+        self.prom_cli = krkn_prometheus.prom_cli
+        self.cache = cache
+        self.align = max(int(align), 1)  # in seconds
+        self.record_path = os.getenv("PROMETHEUS_RECORD_PATH", "") or None
+        self._record_lock = threading.Lock()
+        self._ingested: Optional[float] = None
+        self._ingested_lock = threading.Lock()
+
+    def align_time(self, time: datetime.datetime, step: int, round_up: bool = False) -> datetime.datetime:
+        """
+        Align time to a multiple of step seconds, so queries of neighbouring windows share cached
+        evaluations. Without a cache, time is only rounded to seconds.
+        """
+        timestamp = time.timestamp()
+        if self.cache is None:
+            seconds = round(timestamp)
+        else:
+            step = max(int(step), 1)
+            seconds = (math.ceil(timestamp / step) if round_up else math.floor(timestamp / step)) * step
+        return datetime.datetime.fromtimestamp(seconds, tz=time.tzinfo)
+
+    def instant_query(self, query: str, time: datetime.datetime = None, round_up: bool = False) -> List[Dict]:
+        """
+        Evaluate query at a single point in time (/api/v1/query?time=).
+        Returns list of series with "metric" and "value" keys.
+        With a cache, time (now by default) is aligned down, or up when round_up is set.
+        """
+        if time is None and self.cache is None:
+            return self.__live_query(query)
+
+        if time is None:
+            time = datetime.datetime.now()
+        timestamp = round(self.align_time(time, self.align, round_up).timestamp())
+        key = QueryCache.make_key("instant", query, timestamp)
+        result = self.__cache_get(key)
+        if result is None:
+            result = self.prom_cli.custom_query(query=query, params={"time": timestamp})
+            if self.cache is not None and self.__is_ingested(timestamp):
+                self.cache.put(key, result)
+            self.__record({"kind": "instant", "query": query, "time": timestamp, "result": result})
+        return result
+
+    def range_query(self, query: str, start: datetime.datetime, end: datetime.datetime, step: int) -> List[Dict]:
+        """
+        Evaluate query from start to end every step seconds (/api/v1/query_range).
+        Returns list of series with "metric" and "values" keys.
+        With a cache, the result is assembled from cached evaluations when all of them are available.
+        """
+        step = max(int(step), 1)
+        # Prometheus client rounds start and end to seconds
+        timestamps = list(range(round(start.timestamp()), round(end.timestamp()) + 1, step))
+        cached = []
+        for timestamp in timestamps:
+            samples = self.__cache_get(QueryCache.make_key("instant", query, timestamp))
+            if samples is None:
+                break
+            cached.append(samples)
+        if self.cache is not None and len(cached) == len(timestamps):
+            return _merge_samples(cached)
+
+        result = self.prom_cli.custom_query_range(
+            query=query,
+            start_time=start,
+            end_time=end,
+            step=f"{step}s",
+        )
+        if self.cache is not None:
+            samples = _split_samples(result, timestamps)
+            for timestamp in timestamps:
+                if not self.__is_ingested(timestamp):
+                    break
+                self.cache.put(QueryCache.make_key("instant", query, timestamp), samples[timestamp])
+        self.__record({
+            "kind": "range",
+            "query": query,
+            "start": round(start.timestamp()),
+            "end": round(end.timestamp()),
+            "step": step,
+            "result": result,
+        })
+        return result
+
+    def latest_sample_time(self) -> Optional[float]:
+        """
+        Timestamp of the most recent scrape ingested by Prometheus, None if it can't be determined.
+        """
+        try:
+            result = self.__live_query("max(timestamp(up))")
+            return float(result[0]["value"][1]) if result else None
+        except Exception as e:
+            logger.debug("Unable to fetch latest sample time: %s", e)
+            return None
+
+    def __live_query(self, query: str) -> List[Dict]:
+        result = self.prom_cli.custom_query(query=query)
+        self.__record({"kind": "instant", "query": query, "time": time_module.time(), "result": result})
+        return result
+
+    def __record(self, entry: Dict):
+        if self.record_path is None:
+            return
+        with self._record_lock:
+            with open(self.record_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+
+    def __cache_get(self, key: str) -> Optional[List[Dict]]:
+        if self.cache is None:
+            return None
+        return self.cache.get(key)
+
+    def __is_ingested(self, timestamp: float) -> bool:
+        '''
+        Whether scrapes up to timestamp were ingested, so evaluations at timestamp won't change anymore
+        and can be cached (empty ones included). Prometheus is asked again only past the last known scrape.
+        '''
+        with self._ingested_lock:
+            if self._ingested is not None and timestamp <= self._ingested:
+                return True
+        latest = self.latest_sample_time()
+        if latest is None:
+            return False
+        with self._ingested_lock:
+            self._ingested = max(latest, self._ingested or latest)
+            return timestamp <= self._ingested
+
+
+def _split_samples(result: List[Dict], timestamps: List[int]) -> Dict[int, List[Dict]]:
+    '''Split a range query result into instant query results at each of timestamps.'''
+    samples: Dict[int, List[Dict]] = {timestamp: [] for timestamp in timestamps}
+    for series in result:
+        for sample_time, value in series.get("values", []):
+            timestamp = round(float(sample_time))
+            if timestamp in samples:
+                samples[timestamp].append({"metric": series.get("metric", {}), "value": [sample_time, value]})
+    return samples
+
+
+def _merge_samples(results: List[List[Dict]]) -> List[Dict]:
+    '''Merge instant query results at consecutive times into a range query result.'''
+    series: Dict[str, Dict] = {}
+    for result in results:
+        for sample in result:
+            key = series_key(sample)
+            series.setdefault(key, {"metric": sample.get("metric", {}), "values": []})
+            series[key]["values"].append(sample["value"])
+    return list(series.values())
+
+
+def series_key(series: Dict) -> str:
+    """
+    Identity of a series across query results, based on its labels.
+    """
+    return json.dumps(series.get("metric", {}), sort_keys=True)
+
+
 def is_openshift(kubeconfig: str) -> bool:
     """
     Check if the cluster is OpenShift.
@@ -19,7 +198,11 @@ def is_openshift(kubeconfig: str) -> bool:
     return returncode == 0
 
 
-def create_prometheus_client(kubeconfig: str) -> KrknPrometheus:
+def create_prometheus_client(
+    kubeconfig: str,
+    cache_config: PrometheusCacheConfig = None,
+    align: int = 1,
+) -> PrometheusClient:
     """
     Create a Prometheus client for the given kubeconfig.
 
@@ -28,9 +211,11 @@ def create_prometheus_client(kubeconfig: str) -> KrknPrometheus:
 
     Args:
         kubeconfig: The path to the Kubernetes configuration file.
+        cache_config: Optional cache configuration for query results.
+        align: Cached queries are evaluated at multiples of this number of seconds.
 
     Returns:
-        KrknPrometheus: A Prometheus client.
+        PrometheusClient: A Prometheus client.
     """
     # Fetch Prometheus query endpoint
     url = os.getenv("PROMETHEUS_URL", "")
@@ -58,10 +243,13 @@ def create_prometheus_client(kubeconfig: str) -> KrknPrometheus:
 
     # Try connecting to Prometheus
     try:
-        client = KrknPrometheus(url, token.strip())
+        cache = None
+        if cache_config is not None and cache_config.enable:
+            cache = QueryCache(cache_config.max_entries, cache_config.path)
+        client = PrometheusClient(KrknPrometheus(url, token.strip()), cache=cache, align=align)
         if env_is_truthy("MOCK_FITNESS"):
             return client
-        client.process_query("1")
+        client.instant_query("1")
         logger.debug("Successfully connected to Prometheus")
         return client
     except Exception as e:
@@ -0,0 +1,74 @@
+'''
+Streaming quantile estimation with the P² algorithm (Jain and Chlamtac, 1985).
+
+Working Details:
+1. The first five observations are kept sorted and used as marker heights.
+2. Every later observation moves the marker positions, and markers drifting away from their
+   desired position are adjusted with a piecewise-parabolic (or linear) height update.
+3. The middle marker estimates the quantile, using constant memory regardless of sample count.
+'''
+import bisect
+import math
+from typing import List
+
+
+class P2Quantile:
+    def __init__(self, p: float):
+        self.p = p
+        self.count = 0
+        self._heights: List[float] = []
+        self._positions = [1, 2, 3, 4, 5]
+        self._desired = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self._increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, x: float):
+        self.count += 1
+        q, n = self._heights, self._positions
+        if self.count <= 5:
+            bisect.insort(q, x)
+            return
+
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = bisect.bisect_right(q, x) - 1
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+
+        for i in (1, 2, 3):
+            d = self._desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                height = self.__parabolic(i, d)
+                if not q[i - 1] < height < q[i + 1]:
+                    height = self.__linear(i, d)
+                q[i] = height
+                n[i] += d
+
+    def value(self) -> float:
+        '''Current estimate, exact (linear interpolation like numpy.percentile) for up to five observations.'''
+        if self.count == 0:
+            return math.nan
+        if self.count <= 5:
+            index = self.p * (self.count - 1)
+            low = int(index)
+            high = min(low + 1, self.count - 1)
+            return self._heights[low] + (self._heights[high] - self._heights[low]) * (index - low)
+        return self._heights[2]
+
+    def __parabolic(self, i: int, d: int) -> float:
+        q, n = self._heights, self._positions
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def __linear(self, i: int, d: int) -> float:
+        q, n = self._heights, self._positions
+        return q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
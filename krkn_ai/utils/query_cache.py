@@ -0,0 +1,89 @@
+'''
+This module caches Prometheus query results between KrknRunner and Prometheus.
+
+Working Details:
+1. Results are keyed by query kind, normalized query string, timestamps (whole seconds) and step.
+2. PrometheusClient stores one instant evaluation per entry, at times aligned to the scrape interval,
+   range results are split into their evaluations and assembled back from them.
+3. Least recently used entries are evicted once max_entries is reached.
+4. Optionally entries are persisted to a sqlite file, so resumed runs can reuse results of earlier runs.
+'''
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from krkn_ai.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def normalize_query(query: str) -> str:
+    '''Collapse whitespace so formatting differences map to the same entry.'''
+    return " ".join(query.split())
+
+
+class QueryCache:
+    def __init__(self, max_entries: int = 1024, path: Optional[str] = None):
+        self.max_entries = max(max_entries, 1)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, List[Dict]]" = OrderedDict()
+        self._db = None
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT, last_used REAL)"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def make_key(kind: str, query: str, *timestamps: int, step: int = 0) -> str:
+        return json.dumps([kind, normalize_query(query), list(timestamps), step])
+
+    def get(self, key: str) -> Optional[List[Dict]]:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            if self._db is not None:
+                row = self._db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    value = json.loads(row[0])
+                    self.__put_memory(key, value)
+                    self._db.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key))
+                    self._db.commit()
+                    self.hits += 1
+                    return value
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: List[Dict]):
+        with self._lock:
+            self.__put_memory(key, value)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results (key, value, last_used) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), time.time()),
+                )
+                # Keep the file bounded like the in-memory cache
+                self._db.execute(
+                    "DELETE FROM results WHERE key NOT IN "
+                    "(SELECT key FROM results ORDER BY last_used DESC LIMIT ?)",
+                    (self.max_entries,),
+                )
+                self._db.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+    def __put_memory(self, key: str, value: List[Dict]):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
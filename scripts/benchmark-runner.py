@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+'''
+Benchmark KrknRunner.run end-to-end against the fake krknctl/podman in scripts/fake-krkn.
+
+Measures:
+1. Per-run overhead: wall-clock time of KrknRunner.run minus the simulated chaos duration.
+2. Memory growth: traced allocations retained after N runs (results are kept like GeneticAlgorithm.seen_population).
+3. Concurrency scaling: throughput of KrknRunner.run when called from multiple threads.
+
+Fitness is mocked unless --prometheus-series or --prometheus-recording is given,
+in which case it is calculated against scripts/fake-prometheus.
+
+Usage:
+./scripts/benchmark-runner.py --runs 20 --duration 0.5 --log-lines 200 --concurrency 1,2,4 --health-checks 2
+'''
+import argparse
+import http.server
+import importlib.util
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from krkn_ai.chaos_engines.krkn_runner import KrknRunner  # noqa: E402
+from krkn_ai.models.app import KrknRunnerType  # noqa: E402
+from krkn_ai.models.cluster_components import ClusterComponents, Container, Namespace, Pod  # noqa: E402
+from krkn_ai.models.config import ConfigFile  # noqa: E402
+from krkn_ai.models.scenario.scenario_pod import PodScenario  # noqa: E402
+
+
+class HealthHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_health_server():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), HealthHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def start_prometheus_server(series: str = None, recording: str = None):
+    path = os.path.join(HERE, "fake-prometheus", "fake_prometheus.py")
+    spec = importlib.util.spec_from_file_location("fake_prometheus", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.start_server(series=series, recording=recording)
+
+
+def create_runner(args, output_dir: str, health_url: str = None) -> KrknRunner:
+    cluster_components = ClusterComponents(
+        namespaces=[
+            Namespace(
+                name="robot-shop",
+                pods=[
+                    Pod(name="cart-1", labels={"service": "cart"}, containers=[Container(name="cart")]),
+                    Pod(name="catalogue-1", labels={"service": "catalogue"}, containers=[Container(name="catalogue")]),
+                ],
+            )
+        ],
+    )
+    applications = []
+    if health_url is not None:
+        applications = [
+            {"name": f"app-{i}", "url": health_url, "interval": 1}
+            for i in range(args.health_checks)
+        ]
+    kubeconfig = os.path.join(output_dir, "kubeconfig")
+    open(kubeconfig, "w").close()
+    config = ConfigFile(
+        kubeconfig_file_path=kubeconfig,
+        wait_duration=0,
+        fitness_function={"query": "sum(kube_pod_container_status_restarts_total)"},
+        health_checks={"applications": applications},
+        cluster_components=cluster_components,
+        warm_runner={"enable": args.warm},
+    )
+    runner_type = KrknRunnerType.HUB_RUNNER if args.runner_type == "krknhub" else KrknRunnerType.CLI_RUNNER
+    return KrknRunner(config, output_dir=output_dir, runner_type=runner_type)
+
+
+def timed_run(runner: KrknRunner, scenario, generation_id: int):
+    start = time.perf_counter()
+    result = runner.run(scenario, generation_id)
+    return time.perf_counter() - start, result
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def benchmark_overhead(args, runner: KrknRunner, scenario):
+    # Warm up imports and first subprocess spawn
+    timed_run(runner, scenario, 0)
+
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    retained = []
+    overheads = []
+    startups = []
+    for i in range(args.runs):
+        elapsed, result = timed_run(runner, scenario, i)
+        overheads.append(elapsed - args.duration)
+        if result.startup_duration is not None:
+            startups.append(result.startup_duration)
+        retained.append(result)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print("Per-run overhead (s)")
+    print("  mean: %.4f  p50: %.4f  p95: %.4f  max: %.4f" % (
+        statistics.mean(overheads),
+        percentile(overheads, 50),
+        percentile(overheads, 95),
+        max(overheads),
+    ))
+    if startups:
+        print("Krkn startup (s)")
+        print("  mean: %.4f  p50: %.4f  max: %.4f" % (
+            statistics.mean(startups),
+            percentile(startups, 50),
+            max(startups),
+        ))
+    print("Memory growth")
+    print("  retained: %.1f KiB total, %.1f KiB per run, peak: %.1f KiB" % (
+        (current - baseline) / 1024,
+        (current - baseline) / 1024 / args.runs,
+        peak / 1024,
+    ))
+
+
+def benchmark_concurrency(args, runner: KrknRunner, scenario):
+    print("Concurrency scaling")
+    base_throughput = None
+    for workers in [int(x) for x in args.concurrency.split(",")]:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(lambda i: runner.run(scenario, i), range(args.runs)))
+        elapsed = time.perf_counter() - start
+        throughput = args.runs / elapsed
+        if base_throughput is None:
+            base_throughput = throughput
+        print("  workers: %2d  runs/s: %.2f  speedup: %.2fx  efficiency: %.0f%%" % (
+            workers,
+            throughput,
+            throughput / base_throughput,
+            100 * throughput / base_throughput / workers,
+        ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20, help="Number of runs per measurement.")
+    parser.add_argument("--duration", type=float, default=0.5, help="Simulated chaos duration in seconds.")
+    parser.add_argument("--log-lines", type=int, default=200, help="Log lines printed by each fake run.")
+    parser.add_argument("--exit-status", type=int, default=0, help="Exit status reported in fake telemetry.")
+    parser.add_argument("--runner-type", choices=["krknctl", "krknhub"], default="krknctl")
+    parser.add_argument("--concurrency", default="1,2,4", help="Comma separated list of worker counts.")
+    parser.add_argument("--health-checks", type=int, default=0, help="Number of health check endpoints to watch.")
+    parser.add_argument("--startup", type=float, default=0, help="Simulated container startup time in seconds.")
+    parser.add_argument("--warm", action="store_true", help="Reuse warm krkn-hub containers (krknhub runner only).")
+    parser.add_argument("--prometheus-series", help="Calculate fitness against fake Prometheus serving this YAML file.")
+    parser.add_argument("--prometheus-recording", help="Calculate fitness against fake Prometheus replaying this file.")
+    args = parser.parse_args()
+
+    # Route runner commands to the fake executables and keep fitness offline
+    os.environ["PATH"] = os.path.join(HERE, "fake-krkn") + os.pathsep + os.environ.get("PATH", "")
+    os.environ["FAKE_KRKN_DURATION"] = str(args.duration)
+    os.environ["FAKE_KRKN_LOG_LINES"] = str(args.log_lines)
+    os.environ["FAKE_KRKN_EXIT_STATUS"] = str(args.exit_status)
+    os.environ["FAKE_KRKN_STARTUP"] = str(args.startup)
+    if args.prometheus_series or args.prometheus_recording:
+        prometheus = start_prometheus_server(args.prometheus_series, args.prometheus_recording)
+        os.environ["PROMETHEUS_URL"] = "http://127.0.0.1:%d" % prometheus.server_address[1]
+        os.environ["MOCK_FITNESS"] = "false"
+    else:
+        os.environ["MOCK_FITNESS"] = "true"
+        os.environ.setdefault("PROMETHEUS_URL", "http://127.0.0.1:9090")
+    os.environ.setdefault("PROMETHEUS_TOKEN", "fake-token")
+
+    health_url = None
+    if args.health_checks > 0:
+        server = start_health_server()
+        health_url = "http://127.0.0.1:%d/health" % server.server_address[1]
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        runner = create_runner(args, output_dir, health_url)
+        scenario = PodScenario(cluster_components=runner.config.cluster_components)
+        print("Runner: %s, runs: %d, duration: %.2fs, log lines: %d, health checks: %d" % (
+            runner.runner_type.value, args.runs, args.duration, args.log_lines, args.health_checks
+        ))
+        benchmark_overhead(args, runner, scenario)
+        benchmark_concurrency(args, runner, scenario)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+'''
+Stand-in for krknctl and podman used to exercise KrknRunner without a cluster.
+
+It accepts the same command lines that KrknRunner generates
+(see PODMAN_TEMPLATE, KRKNCTL_TEMPLATE and KRKNCTL_GRAPH_RUN_TEMPLATE),
+prints krkn-like logs followed by a "Chaos data:" telemetry block and exits.
+
+Behaviour is controlled by environment variables:
+- FAKE_KRKN_DURATION: Seconds to simulate chaos for each scenario (Default: 1)
+- FAKE_KRKN_LOG_LINES: Number of filler log lines printed per scenario (Default: 50)
+- FAKE_KRKN_EXIT_STATUS: exit_status reported in telemetry (Default: 0)
+- FAKE_KRKN_RETURNCODE: Process return code (Default: FAKE_KRKN_EXIT_STATUS)
+- FAKE_KRKN_HONOR_WAIT: Sleep for the requested wait duration after chaos (Default: false)
+- FAKE_KRKN_STARTUP: Seconds to simulate container startup before krkn logs anything (Default: 0)
+- FAKE_KRKN_STATE_DIR: Directory to keep track of detached containers (Default: <tmp>/fake-krkn)
+
+Detached containers ("podman run -d") are only recorded in FAKE_KRKN_STATE_DIR,
+"podman exec" into them runs the scenario of the container's image without startup delay.
+krknctl records a container per running scenario as well, so a terminated krknctl leaves it behind
+for "podman ps" and "podman stop" to find, like the containers real krknctl starts.
+'''
+import contextlib
+import datetime
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+VERSION = "fake-krkn 0.0.1"
+
+KRKNCTL_IMAGE = "quay.io/krkn-chaos/krkn-hub"
+
+# Serializes output of concurrently running graph nodes
+output_lock = threading.RLock()
+
+# scenario_type krkn reports in telemetry, by krknctl name / krkn-hub image tag
+SCENARIO_TYPES = {
+    "pod-scenarios": "pod_disruption_scenarios",
+    "container-scenarios": "container_scenarios",
+    "node-cpu-hog": "hog_scenarios",
+    "node-memory-hog": "hog_scenarios",
+    "node-io-hog": "hog_scenarios",
+    "network-chaos": "network_chaos_scenarios",
+    "pod-network-filter": "network_chaos_ng_scenarios",
+    "time-scenarios": "time_scenarios",
+    "pvc-scenarios": "pvc_scenarios",
+    "application-outages": "application_outages_scenarios",
+    "syn-flood": "syn_flood_scenarios",
+    "dummy-scenario": "dummy_scenarios",
+}
+
+
+def env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def env_is_truthy(name: str) -> bool:
+    return os.getenv(name, 'false').lower().strip() in ['yes', 'y', 'true', '1']
+
+
+def log(message: str, level: str = "INFO"):
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S,%f")[:-3]
+    with output_lock:
+        print(f"{timestamp} [{level}] {message}", flush=True)
+
+
+def simulate_startup():
+    time.sleep(env_float("FAKE_KRKN_STARTUP", 0))
+
+
+def state_path(name: str) -> str:
+    state_dir = os.getenv("FAKE_KRKN_STATE_DIR", os.path.join(tempfile.gettempdir(), "fake-krkn"))
+    os.makedirs(state_dir, exist_ok=True)
+    return os.path.join(state_dir, name)
+
+
+def parse_options(args):
+    '''Collect "--key value" and "-e KEY=value" pairs from the command line.'''
+    options = {}
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg == '-e' and i + 1 < len(args):
+            key, _, value = args[i + 1].partition('=')
+            options[key] = value.strip('"')
+            i += 2
+        elif arg.startswith('--') and '=' not in arg and i + 1 < len(args) and not args[i + 1].startswith('--'):
+            options[arg[2:]] = args[i + 1]
+            i += 2
+        else:
+            i += 1
+    return options
+
+
+def image_scenario(image: str) -> str:
+    '''Scenario name of an image, the krkn-hub tag or the image name for standalone images (krkn-syn-flood).'''
+    repository, _, tag = image.split('/')[-1].partition(':')
+    if repository == 'krkn-hub':
+        return tag
+    return repository[len('krkn-'):] if repository.startswith('krkn-') else repository
+
+
+def run_scenario(name: str, parameters: dict, wait_duration: float, exit_status: int) -> dict:
+    duration = env_float("FAKE_KRKN_DURATION", 1)
+    log_lines = int(env_float("FAKE_KRKN_LOG_LINES", 50))
+
+    log(f"Starting kraken for scenario {name}")
+    log("Fetching cluster info")
+    start_timestamp = time.time()
+    log(f"Injecting chaos for scenario {name}")
+
+    # Spread filler lines across the simulated chaos duration
+    step = duration / log_lines if log_lines > 0 else duration
+    for i in range(log_lines):
+        log(f"[{name}] iteration {i}: waiting for chaos to settle, parameters={parameters}")
+        time.sleep(step)
+    if log_lines == 0:
+        time.sleep(duration)
+
+    end_timestamp = time.time()
+    log(f"Chaos injection finished for scenario {name}")
+
+    if env_is_truthy("FAKE_KRKN_HONOR_WAIT") and wait_duration > 0:
+        log(f"Waiting for {wait_duration} seconds before ending the run")
+        time.sleep(wait_duration)
+
+    return {
+        "start_timestamp": start_timestamp,
+        "end_timestamp": end_timestamp,
+        "scenario": f"scenarios/{name}.yaml",
+        "scenario_type": SCENARIO_TYPES.get(name, name.replace('-', '_')),
+        "exit_status": exit_status,
+        "parameters": parameters,
+        "affected_pods": {"recovered": [], "unrecovered": []},
+        "affected_nodes": [],
+    }
+
+
+def print_chaos_data(scenarios):
+    chaos_data = {
+        "telemetry": {
+            "scenarios": scenarios,
+            "node_summary_infos": [],
+            "kubernetes_objects_count": {},
+            "network_plugins": ["Unknown"],
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "health_checks": None,
+        },
+        "critical_alerts": None,
+    }
+    # Keep the block together when graph nodes run concurrently
+    with output_lock:
+        log("Chaos data:")
+        print(json.dumps(chaos_data, indent=4), flush=True)
+
+
+@contextlib.contextmanager
+def krknctl_container(image: str):
+    '''
+    Record a container for the scenario like krknctl starts one. It's removed once the scenario
+    finishes, but stays "running" when the process is terminated, until it's stopped with podman.
+    '''
+    name = f"krknctl-{uuid.uuid4().hex[:8]}"
+    with open(state_path(name), 'w', encoding='utf-8') as f:
+        f.write(image)
+    yield name
+    os.remove(state_path(name))
+
+
+def run_graph(graph: dict, exit_status: int):
+    '''
+    Run graph nodes once the node they depend on finished, nodes sharing a parent run concurrently
+    like in krknctl, so telemetry blocks are printed in completion order.
+    '''
+    def run_node(key: str):
+        node = graph[key]
+        log(f"Running graph node {key} ({node['name']})")
+        name = image_scenario(node['image'])
+        with krknctl_container(node['image']):
+            print_chaos_data([run_scenario(name, node.get('env', {}), 0, exit_status)])
+        run_nodes([x for x, child in graph.items() if child.get('depends_on') == key])
+
+    def run_nodes(keys):
+        threads = [threading.Thread(target=run_node, args=(x,)) for x in keys]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    run_nodes([x for x, node in graph.items() if node.get('depends_on') not in graph])
+
+
+def krknctl(args) -> int:
+    exit_status = int(env_float("FAKE_KRKN_EXIT_STATUS", 0))
+    simulate_startup()
+    if len(args) >= 2 and args[0] == 'graph' and args[1] == 'run':
+        with open(args[2], 'r', encoding='utf-8') as f:
+            graph = json.load(f)
+        run_graph(graph, exit_status)
+    elif len(args) >= 2 and args[0] == 'run':
+        options = parse_options(args[2:])
+        wait_duration = float(options.pop('wait-duration', 0))
+        options.pop('kubeconfig', None)
+        options.pop('telemetry-prometheus-backup', None)
+        with krknctl_container(f"{KRKNCTL_IMAGE}:{args[1]}"):
+            print_chaos_data([run_scenario(args[1], options, wait_duration, exit_status)])
+    else:
+        print(f"unsupported krknctl command: {' '.join(args)}", file=sys.stderr)
+        return 1
+    return int(env_float("FAKE_KRKN_RETURNCODE", exit_status))
+
+
+def run_podman_scenario(image: str, args, exit_status: int):
+    options = parse_options(args)
+    wait_duration = float(options.pop('WAIT_DURATION', 0))
+    options.pop('PUBLISH_KRAKEN_STATUS', None)
+    options.pop('TELEMETRY_PROMETHEUS_BACKUP', None)
+    print_chaos_data([run_scenario(image_scenario(image), options, wait_duration, exit_status)])
+
+
+def podman(args) -> int:
+    exit_status = int(env_float("FAKE_KRKN_EXIT_STATUS", 0))
+    if len(args) >= 1 and args[0] == 'run' and '-d' in args:
+        # podman run -d --rm --name <name> ... --entrypoint sleep <image> infinity
+        simulate_startup()
+        name = args[args.index('--name') + 1]
+        image = args[-2]
+        with open(state_path(name), 'w', encoding='utf-8') as f:
+            f.write(image)
+        print(name)
+        return 0
+    elif len(args) >= 1 and args[0] == 'run':
+        simulate_startup()
+        run_podman_scenario(args[-1], args[1:], exit_status)
+    elif len(args) >= 1 and args[0] == 'exec':
+        # podman exec -e KEY=value ... <name> <entrypoint>
+        i = 1
+        while i < len(args) and args[i] == '-e':
+            i += 2
+        name = args[i]
+        if not os.path.exists(state_path(name)):
+            print(f"Error: no container with name or ID \"{name}\" found", file=sys.stderr)
+            return 125
+        with open(state_path(name), 'r', encoding='utf-8') as f:
+            image = f.read().strip()
+        run_podman_scenario(image, args[1:i], exit_status)
+    elif len(args) >= 2 and args[0] == 'image' and args[1] == 'inspect':
+        print(json.dumps({"Entrypoint": ["/home/krkn/main.sh"], "Cmd": None}))
+        return 0
+    elif len(args) >= 1 and args[0] == 'ps':
+        # Every recorded container is running, format is fixed to "{{.ID}} {{.Image}} {{.State}}"
+        state_dir = os.path.dirname(state_path("ps"))
+        for name in sorted(os.listdir(state_dir)):
+            with open(os.path.join(state_dir, name), 'r', encoding='utf-8') as f:
+                print(f"{name} {f.read().strip()} running")
+        return 0
+    elif len(args) >= 1 and args[0] in ('rm', 'stop'):
+        for name in [x for x in args[1:] if not x.startswith('-') and not x.isdigit()]:
+            if os.path.exists(state_path(name)):
+                os.remove(state_path(name))
+        return 0
+    else:
+        print(f"unsupported podman command: {' '.join(args)}", file=sys.stderr)
+        return 1
+    return int(env_float("FAKE_KRKN_RETURNCODE", exit_status))
+
+
+def main(argv) -> int:
+    program, args = argv[1], argv[2:]
+    if args and args[0] == '--version':
+        print(f"{program} version {VERSION}")
+        return 0
+    if program == 'krknctl':
+        return krknctl(args)
+    if program == 'podman':
+        return podman(args)
+    print(f"unsupported program: {program}", file=sys.stderr)
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
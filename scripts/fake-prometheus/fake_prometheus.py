@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+'''
+Local stand-in for the Prometheus HTTP API used to exercise fitness calculation without a cluster.
+
+Implements /api/v1/query and /api/v1/query_range (GET and POST) and serves either:
+- synthetic series defined in a YAML file (--series), or
+- responses recorded from a real run with PROMETHEUS_RECORD_PATH set (--recording).
+
+Series file format:
+
+    scrape_lag: 0          # Seconds the newest sample lags behind query time, used for max(timestamp(up))
+    latency: 0             # Seconds to sleep before answering every query
+    series:
+      - query: 'sum(kube_pod_container_status_restarts_total{namespace="robot-shop"})'
+        labels: {namespace: robot-shop}
+        base: 0            # Value when the server started
+        slope: 0.05        # Change per second since the server started
+        amplitude: 0       # Sine wave amplitude
+        period: 60         # Sine wave period (in seconds)
+        noise: 0           # Standard deviation of gaussian noise
+
+Queries are matched after collapsing whitespace, "$range$" and "$namespace$" placeholders in the
+file match any value. A series with query "*" answers every query without a specific entry.
+
+Recordings are replayed by exact query and time. When the time doesn't match (e.g. re-scoring
+a run with shifted windows), the nearest recorded response of the same query is time-shifted.
+
+Usage:
+./scripts/fake-prometheus/fake_prometheus.py --port 9090 --series scripts/fake-prometheus/series.yaml
+PROMETHEUS_URL=http://127.0.0.1:9090 PROMETHEUS_TOKEN=fake krkn_ai run ...
+'''
+import argparse
+import http.server
+import json
+import math
+import random
+import re
+import threading
+import time
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import yaml
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.split())
+
+
+def query_pattern(query: str) -> re.Pattern:
+    '''Regex matching the query with "$range$" and "$namespace$" filled in by the runner.'''
+    pattern = re.escape(normalize_query(query))
+    pattern = pattern.replace(re.escape("$range$"), r"\d+[smhd]")
+    pattern = pattern.replace(re.escape("$namespace$"), r"[^\"]*")
+    return re.compile(f"^{pattern}$")
+
+
+class SyntheticSource:
+    def __init__(self, path: str):
+        with open(path, "r", encoding="utf-8") as f:
+            spec = yaml.safe_load(f) or {}
+        self.scrape_lag = float(spec.get("scrape_lag", 0))
+        self.latency = float(spec.get("latency", 0))
+        self.started = time.time()
+        self.series = [(query_pattern(x["query"]) if x["query"] != "*" else None, x) for x in spec.get("series", [])]
+
+    def value(self, definition: Dict, timestamp: float) -> float:
+        t = timestamp - self.started
+        value = float(definition.get("base", 0)) + float(definition.get("slope", 0)) * t
+        amplitude = float(definition.get("amplitude", 0))
+        if amplitude != 0:
+            value += amplitude * math.sin(2 * math.pi * t / float(definition.get("period", 60)))
+        noise = float(definition.get("noise", 0))
+        if noise != 0:
+            value += random.gauss(0, noise)
+        return value
+
+    def matching(self, query: str) -> List[Dict]:
+        query = normalize_query(query)
+        matches = [definition for pattern, definition in self.series if pattern is not None and pattern.match(query)]
+        if not matches:
+            matches = [definition for pattern, definition in self.series if pattern is None]
+        return matches
+
+    def instant(self, query: str, timestamp: float) -> List[Dict]:
+        if normalize_query(query) == "max(timestamp(up))":
+            return [{"metric": {}, "value": [timestamp, str(timestamp - self.scrape_lag)]}]
+        return [
+            {"metric": definition.get("labels", {}), "value": [timestamp, str(self.value(definition, timestamp))]}
+            for definition in self.matching(query)
+        ]
+
+    def range(self, query: str, start: float, end: float, step: float) -> List[Dict]:
+        timestamps = []
+        t = start
+        while t <= end:
+            timestamps.append(t)
+            t += step
+        return [
+            {
+                "metric": definition.get("labels", {}),
+                "values": [[ts, str(self.value(definition, ts))] for ts in timestamps],
+            }
+            for definition in self.matching(query)
+        ]
+
+
+class RecordingSource:
+    def __init__(self, path: str):
+        self.latency = 0
+        self.entries: Dict[tuple, List[Dict]] = {}
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    key = (entry["kind"], normalize_query(entry["query"]))
+                    self.entries.setdefault(key, []).append(entry)
+
+    def __nearest(self, kind: str, query: str, timestamp: float) -> Optional[Dict]:
+        entries = self.entries.get((kind, normalize_query(query)), [])
+        if not entries:
+            return None
+        return min(entries, key=lambda x: abs(x.get("time", x.get("start", 0)) - timestamp))
+
+    def instant(self, query: str, timestamp: float) -> List[Dict]:
+        if normalize_query(query) == "max(timestamp(up))":
+            return [{"metric": {}, "value": [timestamp, str(timestamp)]}]
+        entry = self.__nearest("instant", query, timestamp)
+        if entry is None:
+            return []
+        return [
+            {"metric": series["metric"], "value": [timestamp, series["value"][1]]}
+            for series in entry["result"]
+        ]
+
+    def range(self, query: str, start: float, end: float, step: float) -> List[Dict]:
+        entry = self.__nearest("range", query, start)
+        if entry is None:
+            return []
+        shift = start - entry["start"]
+        return [
+            {"metric": series["metric"], "values": [[float(ts) + shift, value] for ts, value in series["values"]]}
+            for series in entry["result"]
+        ]
+
+
+def parse_duration(value: str) -> float:
+    match = re.match(r"^(\d+(?:\.\d+)?)([smhd]?)$", value)
+    if match is None:
+        raise ValueError(f"invalid step {value}")
+    return float(match.group(1)) * {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}[match.group(2)]
+
+
+def make_handler(source):
+    class PrometheusHandler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.__handle(parse_qs(urlparse(self.path).query))
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            params = parse_qs(urlparse(self.path).query)
+            params.update(parse_qs(self.rfile.read(length).decode()))
+            self.__handle(params)
+
+        def log_message(self, format, *args):
+            pass
+
+        def __handle(self, params):
+            path = urlparse(self.path).path
+            param = lambda name, default=None: params.get(name, [default])[0]  # noqa: E731
+            if source.latency > 0:
+                time.sleep(source.latency)
+            try:
+                if path == "/api/v1/query":
+                    data = {
+                        "resultType": "vector",
+                        "result": source.instant(param("query"), float(param("time", time.time()))),
+                    }
+                elif path == "/api/v1/query_range":
+                    data = {
+                        "resultType": "matrix",
+                        "result": source.range(
+                            param("query"), float(param("start")), float(param("end")), parse_duration(param("step"))
+                        ),
+                    }
+                else:
+                    self.__respond(404, {"status": "error", "error": f"unsupported path {path}"})
+                    return
+            except (TypeError, ValueError) as e:
+                self.__respond(400, {"status": "error", "errorType": "bad_data", "error": str(e)})
+                return
+            self.__respond(200, {"status": "success", "data": data})
+
+        def __respond(self, code: int, body: Dict):
+            payload = json.dumps(body).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    return PrometheusHandler
+
+
+def start_server(series: str = None, recording: str = None, host: str = "127.0.0.1", port: int = 0):
+    '''Start the server in a background thread, returns the server (see server.server_address).'''
+    source = SyntheticSource(series) if series is not None else RecordingSource(recording)
+    server = http.server.ThreadingHTTPServer((host, port), make_handler(source))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--series", help="YAML file with synthetic series.")
+    group.add_argument("--recording", help="JSON lines file recorded with PROMETHEUS_RECORD_PATH.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9090)
+    args = parser.parse_args()
+
+    server = start_server(args.series, args.recording, args.host, args.port)
+    print("Serving Prometheus API on http://%s:%d" % server.server_address, flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import pytest
+
+pytest.importorskip("krkn_lib")
+
+from krkn_ai.chaos_engines.baseline_sampler import BaselineSampler  # noqa: E402
+from krkn_ai.models.config import BaselineSamplerConfig, FitnessFunction  # noqa: E402
+
+
+class FakePrometheus:
+    '''Returns the next prepared result for every "now" query.'''
+    def __init__(self):
+        self.result = []
+
+    def instant_query(self, query, time=None, round_up=False):
+        return self.result
+
+
+def _sampler(query: str = "restarts") -> BaselineSampler:
+    return BaselineSampler(
+        BaselineSamplerConfig(enable=True, interval=10),
+        FitnessFunction(query=query, type="point", scrape_interval=15),
+        FakePrometheus(),
+    )
+
+
+def _sample(sampler: BaselineSampler, timestamp: float, values: dict, ingested: float):
+    sampler.prom_client.result = [
+        {"metric": {"pod": pod}, "value": [timestamp, str(value)]} for pod, value in values.items()
+    ]
+    sampler._BaselineSampler__sample("restarts", ingested)
+
+
+def test_point_value_from_samples_around_the_window():
+    sampler = _sampler()
+    _sample(sampler, 100, {"a": 1, "gone": 4}, ingested=95)
+    _sample(sampler, 110, {"a": 1, "gone": 4}, ingested=105)
+    _sample(sampler, 150, {"a": 3, "new": 2}, ingested=140)
+    _sample(sampler, 160, {"a": 4, "new": 2}, ingested=155)
+
+    # Sample at 150 only has data up to 140, the first one covering the end is taken at 160
+    assert sampler.point_value("restarts", 112, 150) == (4 - 1) + 2
+    assert sampler.max_value("restarts", 150) == 4
+
+
+def test_samples_must_cover_the_end_of_the_window():
+    sampler = _sampler()
+    _sample(sampler, 100, {"a": 1}, ingested=95)
+    _sample(sampler, 150, {"a": 3}, ingested=140)
+    assert sampler.point_value("restarts", 100, 145) is None
+    assert sampler.max_value("restarts", 145) is None
+
+
+def test_samples_too_far_from_the_window_are_not_used():
+    sampler = _sampler()
+    _sample(sampler, 100, {"a": 1}, ingested=95)
+    _sample(sampler, 200, {"a": 3}, ingested=195)
+    # More than 1.5 x interval before the start
+    assert sampler.value_before("restarts", 120) is None
+    # More than 1.5 x interval plus a scrape interval after the end
+    assert sampler.value_after("restarts", 160) is None
+    assert sampler.value_after("restarts", 180) is not None
+
+
+def test_queries_depending_on_the_scenario_are_not_sampled():
+    sampler = BaselineSampler(
+        BaselineSamplerConfig(enable=True),
+        FitnessFunction(items=[
+            {"query": "restarts", "type": "point"},
+            {"query": "rate(errors[$range$])", "type": "range"},
+            {"query": 'restarts{namespace=~"$namespace$"}', "type": "point"},
+        ]),
+        FakePrometheus(),
+    )
+    assert sampler.queries == ["restarts"]
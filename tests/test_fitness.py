@@ -0,0 +1,102 @@
+import datetime
+import threading
+
+import pytest
+
+pytest.importorskip("krkn_lib")
+
+from krkn_ai.chaos_engines.krkn_runner import KrknRunner  # noqa: E402
+from krkn_ai.models.config import ConfigFile  # noqa: E402
+from krkn_ai.models.custom_errors import FitnessFunctionCalculationError  # noqa: E402
+
+START = datetime.datetime(2025, 1, 1, 12, 0, 0)
+END = START + datetime.timedelta(seconds=300)
+
+
+class FakePrometheus:
+    '''Instant query results by evaluation time.'''
+    def __init__(self, results):
+        self.results = results
+        self.queries = []
+
+    def instant_query(self, query, time=None, round_up=False):
+        self.queries.append((query, time))
+        return self.results.get(time, [])
+
+    def latest_sample_time(self):
+        return None
+
+
+def _series(pod: str, value: float):
+    return {"metric": {"pod": pod}, "value": [0, str(value)]}
+
+
+def _runner(prom_client, **fitness_function) -> KrknRunner:
+    runner = object.__new__(KrknRunner)
+    runner.config = ConfigFile(
+        kubeconfig_file_path="kubeconfig",
+        fitness_function=fitness_function or {"query": "restarts", "type": "point"},
+        cluster_components={},
+    )
+    runner.prom_client = prom_client
+    runner.baseline_sampler = None
+    return runner
+
+
+def test_point_fitness_sums_differences_of_series():
+    prom_client = FakePrometheus({
+        START: [_series("a", 2), _series("b", 5), _series("gone", 1)],
+        # "new" appeared during the test and started from zero, "gone" was deleted
+        END: [_series("a", 4), _series("b", 5), _series("new", 3)],
+    })
+    assert _runner(prom_client).calculate_point_fitness(START, END, "restarts") == 5
+    assert prom_client.queries == [("restarts", START), ("restarts", END)]
+
+
+def test_point_fitness_without_data_at_end_fails():
+    prom_client = FakePrometheus({START: [_series("a", 2)]})
+    with pytest.raises(FitnessFunctionCalculationError):
+        _runner(prom_client).calculate_point_fitness(START, END, "restarts")
+
+
+def _items_runner(**fitness_function) -> KrknRunner:
+    return _runner(FakePrometheus({}), items=[
+        {"id": 1, "query": "restarts", "type": "point", "weight": 0.5},
+        {"id": 2, "query": "latency", "type": "range", "weight": 0.2},
+        {"id": 3, "query": "errors", "type": "point"},
+    ], **fitness_function)
+
+
+def test_items_are_evaluated_concurrently_in_item_order():
+    runner = _items_runner(max_concurrency=3)
+    barrier = threading.Barrier(3, timeout=5)
+    values = {"restarts": 3.0, "latency": 10.0, "errors": 1.0}
+
+    def calculate_fitness_value(start, end, query, fitness_type, aggregator, deadline):
+        # Fails unless all items are evaluated at the same time
+        barrier.wait()
+        return values[query]
+
+    runner.calculate_fitness_value = calculate_fitness_value
+    result = runner.calculate_fitness_score_for_items(START, END)
+
+    assert [x.id for x in result.scores] == [1, 2, 3]
+    assert [x.weighted_score for x in result.scores] == pytest.approx([1.5, 2.0, 1.0])
+    assert result.fitness_score == pytest.approx(4.5)
+
+
+def test_items_not_evaluated_within_timeout_fail():
+    runner = _items_runner(timeout=1)
+    stop = threading.Event()
+
+    def calculate_fitness_value(start, end, query, fitness_type, aggregator, deadline):
+        if query == "latency":
+            stop.wait(5)
+        return 1.0
+
+    runner.calculate_fitness_value = calculate_fitness_value
+    try:
+        with pytest.raises(FitnessFunctionCalculationError):
+            runner.calculate_fitness_score_for_items(START, END)
+    finally:
+        stop.set()
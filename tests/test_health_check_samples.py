@@ -0,0 +1,115 @@
+import copy
+import datetime
+
+import pytest
+from pydantic import TypeAdapter
+
+from krkn_ai.models.health_check_samples import HealthCheckSampleFile, HealthCheckSamples
+
+START = datetime.datetime(2025, 1, 1, 12, 0, 0)
+
+
+def _ns(seconds: float) -> int:
+    return round((START + datetime.timedelta(seconds=seconds)).timestamp() * 1e6) * 1000
+
+
+def _fill(samples: HealthCheckSamples, count: int = 10) -> HealthCheckSamples:
+    for i in range(count):
+        failed = i % 4 == 3
+        samples.append(
+            timestamp=_ns(i),
+            response_time=-1 if failed else 0.1 * (i + 1),
+            status_code=-1 if failed else 200,
+            success=not failed,
+            error="Timed out after 4 seconds" if failed else None,
+            connect_time=-1 if failed else 0.01,
+            ttfb=-1 if failed else 0.05,
+        )
+    return samples
+
+
+def _seconds(value: datetime.datetime) -> float:
+    return (value - START).total_seconds()
+
+
+def test_window_includes_both_bounds():
+    samples = _fill(HealthCheckSamples("app"))
+    window = samples.window(START + datetime.timedelta(seconds=2), START + datetime.timedelta(seconds=5))
+
+    assert len(window) == 4
+    assert list(window.timestamp) == [_ns(2), _ns(3), _ns(4), _ns(5)]
+    assert window.success_count == 3
+    assert window.response_time_max == pytest.approx(0.6)
+    assert window.errors[window.error[1]] == "Timed out after 4 seconds"
+
+
+def test_empty_window():
+    samples = _fill(HealthCheckSamples("app"))
+    window = samples.window(START - datetime.timedelta(seconds=10), START - datetime.timedelta(seconds=1))
+    assert len(window) == 0
+    assert window.column("response_time").size == 0
+
+
+def test_results_round_trip():
+    samples = _fill(HealthCheckSamples("app"))
+    loaded = HealthCheckSamples.from_results(samples.to_results())
+
+    assert len(loaded) == len(samples)
+    assert loaded.name == "app"
+    for column in ("timestamp", "response_time", "connect_time", "ttfb", "status_code", "success"):
+        assert list(loaded.column(column)) == list(samples.column(column))
+    assert [x.error for x in loaded.to_results()] == [x.error for x in samples.to_results()]
+    assert [_seconds(datetime.datetime.fromisoformat(x.timestamp)) for x in loaded.to_results()] == list(range(10))
+
+
+def test_deepcopy_is_independent():
+    samples = _fill(HealthCheckSamples("app", online=True))
+    copied = copy.deepcopy(samples)
+    samples.append(timestamp=_ns(20), response_time=0.1, status_code=200, success=True)
+
+    assert len(copied) == 10
+    assert list(copied.timestamp) == list(samples.timestamp)[:10]
+    assert copied.outliers.count == samples.outliers.count - 1
+
+
+def test_serialized_as_health_check_results():
+    adapter = TypeAdapter(HealthCheckSamples)
+    samples = _fill(HealthCheckSamples("app"))
+
+    dumped = adapter.dump_python(samples, mode="json")
+    assert dumped[0]["name"] == "app" and dumped[3]["success"] is False
+    loaded = adapter.validate_json(adapter.dump_json(samples))
+    assert list(loaded.column("response_time")) == list(samples.column("response_time"))
+
+
+def _file_backed(tmp_path):
+    sample_file = HealthCheckSampleFile(str(tmp_path / "health_checks.csv"), batch_size=3)
+    samples = _fill(HealthCheckSamples("app", file=sample_file, url="http://app/health"))
+    # Probes of another URL of the scenario share the file
+    _fill(HealthCheckSamples("other", file=sample_file, url="http://other/health"), count=4)
+    sample_file.close()
+    return samples
+
+
+def test_file_backed_samples_round_trip_through_csv(tmp_path):
+    samples = _file_backed(tmp_path)
+    expected = _fill(HealthCheckSamples("app", url="http://app/health"))
+
+    # Only the summary is kept in memory
+    assert len(samples.timestamp) == 0
+    assert len(samples) == 10 and samples.success_count == expected.success_count
+    loaded = samples.load()
+    for column in ("timestamp", "response_time", "connect_time", "ttfb", "status_code", "success"):
+        assert list(loaded.column(column)) == list(expected.column(column))
+    assert [x.error for x in samples.to_results()] == [x.error for x in expected.to_results()]
+
+
+def test_file_backed_window_reads_rows_within_bounds(tmp_path):
+    samples = _file_backed(tmp_path)
+    window = samples.window(START + datetime.timedelta(seconds=2), START + datetime.timedelta(seconds=8))
+    assert len(window) == 7 and window.success_count == 5
+
+    # Windows of windows keep the narrowest bounds
+    nested = window.window(START, START + datetime.timedelta(seconds=3))
+    assert list(nested.load().timestamp) == [_ns(2), _ns(3)]
+    assert len(nested) == 2
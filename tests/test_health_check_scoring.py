@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from krkn_ai.chaos_engines.health_check_watcher import HealthCheckWatcher
+from krkn_ai.models.config import HealthCheckConfig
+from krkn_ai.models.health_check_samples import HealthCheckSamples
+
+
+def _samples(response_times, online=False, failures=0) -> HealthCheckSamples:
+    samples = HealthCheckSamples("app", online=online)
+    for i, response_time in enumerate(response_times):
+        samples.append(timestamp=i * 10**9, response_time=response_time, status_code=200, success=True)
+    for i in range(failures):
+        samples.append(timestamp=(len(response_times) + i) * 10**9, response_time=-1, status_code=-1,
+                       success=False, error="Timed out after 4 seconds")
+    return samples
+
+
+def test_success_rate_score():
+    watcher = HealthCheckWatcher(HealthCheckConfig())
+    results = {"a": _samples([0.1] * 6, failures=2), "b": _samples([0.1] * 2)}
+    assert watcher.summarize_success_rate(results) == pytest.approx(2 / 10 * 10)
+    assert watcher.summarize_success_rate({}) == 0
+
+
+def test_response_time_score_online_matches_columns():
+    watcher = HealthCheckWatcher(HealthCheckConfig())
+    response_times = list(np.random.default_rng(5).uniform(0.09, 0.11, size=500)) + [1.0] * 5
+    online = watcher.summarize_response_time({"a": _samples(response_times, online=True)})
+    offline = watcher.summarize_response_time({"a": _samples(response_times)})
+
+    assert offline == pytest.approx(5 / len(response_times) * 10)
+    assert online == pytest.approx(offline)
+
+
+def test_response_time_score_skips_urls_with_few_probes():
+    watcher = HealthCheckWatcher(HealthCheckConfig())
+    assert watcher.summarize_response_time({"a": _samples([0.1, 5.0])}) == 0
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from krkn_ai.utils.histogram import LatencyHistogram
+
+
+def test_empty_histogram_percentile_is_zero():
+    assert LatencyHistogram().percentile(99) == 0.0
+
+
+@pytest.mark.parametrize("p", [50, 90, 99, 99.9])
+def test_percentiles_within_precision(p):
+    values = np.random.default_rng(11).lognormal(mean=-4, sigma=1, size=50000)
+    histogram = LatencyHistogram(precision=0.01)
+    for value in values:
+        histogram.record(value)
+
+    expected = np.percentile(values, p, method="inverted_cdf")
+    assert histogram.percentile(p) == pytest.approx(expected, rel=0.011)
+
+
+def test_percentiles_stay_within_recorded_range():
+    histogram = LatencyHistogram()
+    for value in (0.2, 0.25, 0.3):
+        histogram.record(value)
+    assert histogram.min == 0.2 and histogram.max == 0.3
+    assert histogram.percentile(0) >= 0.2
+    assert histogram.percentile(100) == 0.3
+
+
+def test_values_outside_range_are_clamped_to_edge_buckets():
+    histogram = LatencyHistogram(lowest=1e-3, highest=1)
+    histogram.record(1e-6)
+    histogram.record(10)
+    assert histogram.counts[0] == 1
+    assert histogram.counts[len(histogram.counts) - 1] == 1
+    # Reported with the bound of the last bucket
+    assert histogram.percentile(100) == pytest.approx(1, rel=0.011)
+
+
+def test_merge_adds_counts():
+    a, b, merged = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+    for value in (0.01, 0.02, 0.03):
+        a.record(value)
+        merged.record(value)
+    for value in (0.5, 0.6):
+        b.record(value)
+        merged.record(value)
+
+    a.merge(b)
+    assert a.count == 5
+    assert list(a.counts) == list(merged.counts)
+    assert (a.min, a.max) == (0.01, 0.6)
+    assert a.percentile(50) == merged.percentile(50)
@@ -0,0 +1,73 @@
+import threading
+
+import pytest
+
+from krkn_ai.utils.pipeline import OrderedPipeline
+
+
+def test_tasks_run_in_submission_order():
+    pipeline = OrderedPipeline(max_pending=2)
+    order = []
+    for i in range(10):
+        pipeline.submit(order.append, i)
+    pipeline.drain()
+    pipeline.shutdown()
+    assert order == list(range(10))
+
+
+def test_submit_blocks_once_max_pending_tasks_are_queued():
+    pipeline = OrderedPipeline(max_pending=2)
+    release = threading.Event()
+    pipeline.submit(release.wait, 5)
+    pipeline.submit(lambda: None)
+
+    submitted = threading.Event()
+    thread = threading.Thread(target=lambda: (pipeline.submit(lambda: None), submitted.set()))
+    thread.start()
+    assert not submitted.wait(0.2)
+
+    release.set()
+    assert submitted.wait(5)
+    thread.join()
+    pipeline.drain()
+    pipeline.shutdown()
+
+
+def test_task_error_is_raised_by_next_check():
+    pipeline = OrderedPipeline(max_pending=2)
+
+    def fail():
+        raise RuntimeError("report failed")
+
+    pipeline.submit(fail).exception(timeout=5)
+    with pytest.raises(RuntimeError, match="report failed"):
+        pipeline.check()
+    # Raised once, later tasks still run
+    assert pipeline.submit(lambda: 1).result(timeout=5) == 1
+    pipeline.drain()
+    pipeline.shutdown()
+
+
+def test_task_error_is_raised_by_next_submit():
+    pipeline = OrderedPipeline(max_pending=1)
+
+    def fail():
+        raise RuntimeError("report failed")
+
+    pipeline.submit(fail).exception(timeout=5)
+    with pytest.raises(RuntimeError):
+        pipeline.submit(lambda: None)
+    # Raised once, later submits still get a slot
+    assert pipeline.submit(lambda: 2).result(timeout=5) == 2
+    pipeline.shutdown()
+
+
+def test_drain_raises_task_error():
+    pipeline = OrderedPipeline(max_pending=2)
+    release = threading.Event()
+    pipeline.submit(release.wait, 5)
+    pipeline.submit(lambda: 1 / 0)
+    release.set()
+    with pytest.raises(ZeroDivisionError):
+        pipeline.drain()
+    pipeline.shutdown()
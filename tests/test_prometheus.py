@@ -0,0 +1,79 @@
+import datetime
+
+import pytest
+
+pytest.importorskip("krkn_lib")
+
+from krkn_ai.utils.prometheus import PrometheusClient  # noqa: E402
+from krkn_ai.utils.query_cache import QueryCache  # noqa: E402
+
+
+class FakePrometheus:
+    '''Series "q" has value t at every time t, scrapes are ingested up to latest.'''
+    def __init__(self, latest: float):
+        self.latest = latest
+        self.queries = []
+
+    def custom_query(self, query, params=None):
+        if query == "max(timestamp(up))":
+            return [{"metric": {}, "value": [self.latest, str(self.latest)]}]
+        self.queries.append(("instant", params["time"]))
+        return [{"metric": {"pod": "a"}, "value": [params["time"], str(params["time"])]}]
+
+    def custom_query_range(self, query, start_time, end_time, step):
+        self.queries.append(("range", round(start_time.timestamp()), round(end_time.timestamp())))
+        step = int(step.rstrip("s"))
+        timestamps = range(round(start_time.timestamp()), round(end_time.timestamp()) + 1, step)
+        return [{"metric": {"pod": "a"}, "values": [[t, str(t)] for t in timestamps]}]
+
+
+def _client(latest: float) -> PrometheusClient:
+    krkn_prometheus = type("KrknPrometheus", (), {})()
+    krkn_prometheus.prom_cli = FakePrometheus(latest)
+    return PrometheusClient(krkn_prometheus, cache=QueryCache(), align=30)
+
+
+def _time(timestamp: float) -> datetime.datetime:
+    return datetime.datetime.fromtimestamp(timestamp)
+
+
+def test_instant_queries_are_aligned_and_cached():
+    client = _client(latest=1000)
+    assert client.instant_query("q", _time(965))[0]["value"][0] == 960
+    assert client.instant_query("q", _time(989))[0]["value"][0] == 960
+    assert client.instant_query("q", _time(965), round_up=True)[0]["value"][0] == 990
+    assert client.prom_cli.queries == [("instant", 960), ("instant", 990)]
+
+
+def test_results_newer_than_ingested_scrapes_are_not_cached():
+    client = _client(latest=1000)
+    client.instant_query("q", _time(1010), round_up=True)
+    client.instant_query("q", _time(1010), round_up=True)
+    assert client.prom_cli.queries == [("instant", 1020), ("instant", 1020)]
+
+    client.prom_cli.latest = 1030
+    client.instant_query("q", _time(1010), round_up=True)
+    client.instant_query("q", _time(1010), round_up=True)
+    assert len(client.prom_cli.queries) == 3
+
+
+def test_range_results_are_shared_with_instant_queries():
+    client = _client(latest=1000)
+    result = client.range_query("q", _time(900), _time(990), 30)
+    assert result[0]["values"] == [[t, str(t)] for t in (900, 930, 960, 990)]
+
+    # Each evaluation of the range is reused, by instant queries and overlapping ranges
+    assert client.instant_query("q", _time(930))[0]["value"][0] == 930
+    assert client.range_query("q", _time(930), _time(990), 30) == [
+        {"metric": {"pod": "a"}, "values": [[t, str(t)] for t in (930, 960, 990)]}
+    ]
+    assert client.prom_cli.queries == [("range", 900, 990)]
+
+
+def test_without_cache_times_are_only_rounded():
+    client = _client(latest=1000)
+    client.cache = None
+    assert client.align_time(_time(965.4), 30) == _time(965)
+    client.instant_query("q", _time(965.4))
+    client.instant_query("q", _time(965.4))
+    assert client.prom_cli.queries == [("instant", 965), ("instant", 965)]
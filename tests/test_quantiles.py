@@ -0,0 +1,49 @@
+import math
+
+import numpy as np
+import pytest
+
+from krkn_ai.models.health_check_samples import ResponseTimeOutliers
+from krkn_ai.utils.quantiles import P2Quantile
+
+
+def test_empty_estimate_is_nan():
+    assert math.isnan(P2Quantile(0.5).value())
+
+
+@pytest.mark.parametrize("values", [[3.0], [5.0, 1.0], [4.0, 1.0, 3.0, 2.0, 5.0]])
+@pytest.mark.parametrize("p", [0.25, 0.5, 0.75])
+def test_up_to_five_observations_are_exact(values, p):
+    quantile = P2Quantile(p)
+    for value in values:
+        quantile.add(value)
+    assert quantile.value() == pytest.approx(np.percentile(values, p * 100))
+
+
+@pytest.mark.parametrize("p", [0.25, 0.5, 0.75, 0.95])
+def test_estimate_converges_on_large_samples(p):
+    values = np.random.default_rng(7).lognormal(mean=-3, sigma=0.5, size=20000)
+    quantile = P2Quantile(p)
+    for value in values:
+        quantile.add(value)
+    assert quantile.count == len(values)
+    assert quantile.value() == pytest.approx(np.percentile(values, p * 100), rel=0.02)
+
+
+def test_outliers_are_counted_above_upper_fence():
+    outliers = ResponseTimeOutliers()
+    values = list(np.random.default_rng(3).uniform(0.09, 0.11, size=2000)) + [1.0, 2.0]
+    for value in values:
+        outliers.add(value)
+
+    q1, q3 = np.percentile(values, [25, 75])
+    assert outliers.upper_bound() == pytest.approx(q3 + 1.5 * (q3 - q1), rel=0.05)
+    assert outliers.count == len(values)
+    assert outliers.outliers == 2
+
+
+def test_first_samples_are_checked_once_quartiles_are_known():
+    outliers = ResponseTimeOutliers()
+    for value in [5.0, 0.1, 0.1, 0.1]:
+        outliers.add(value)
+    assert outliers.outliers == 1
@@ -0,0 +1,34 @@
+from krkn_ai.utils.query_cache import QueryCache
+
+
+def test_keys_ignore_query_formatting():
+    assert QueryCache.make_key("instant", "sum(rate(x[1m]))  by (pod)", 60) == \
+        QueryCache.make_key("instant", "sum(rate(x[1m]))\n by (pod)", 60)
+    assert QueryCache.make_key("instant", "up", 60) != QueryCache.make_key("instant", "up", 90)
+    assert QueryCache.make_key("instant", "up", 60) != QueryCache.make_key("range", "up", 60)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = QueryCache(max_entries=2)
+    cache.put("a", [{"value": [0, "1"]}])
+    cache.put("b", [])
+    assert cache.get("a") is not None
+    cache.put("c", [])
+
+    assert cache.get("b") is None
+    assert cache.get("a") == [{"value": [0, "1"]}]
+    # Empty results are cached values too
+    assert cache.get("c") == []
+    assert cache.stats() == {"hits": 3, "misses": 1, "entries": 2}
+
+
+def test_entries_are_persisted_to_sqlite(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = QueryCache(max_entries=2, path=path)
+    for key in ("a", "b", "c"):
+        cache.put(key, [{"value": [0, key]}])
+
+    reopened = QueryCache(max_entries=2, path=path)
+    assert reopened.get("a") is None
+    assert reopened.get("b") == [{"value": [0, "b"]}]
+    assert reopened.get("c") == [{"value": [0, "c"]}]
@@ -0,0 +1,80 @@
+import math
+
+import numpy as np
+import pytest
+
+from krkn_ai.chaos_engines.range_aggregators import (
+    MAX_POINTS,
+    aggregate,
+    range_selector,
+    range_step,
+    series_matrix,
+)
+from krkn_ai.models.config import RangeAggregator
+
+
+def test_range_step_caps_points_and_floors_to_scrape_interval():
+    assert range_step(60) == 1
+    assert range_step(MAX_POINTS * 10) == 10
+    assert range_step(MAX_POINTS * 10 + 1) == 11
+    assert range_step(60, scrape_interval=30) == 30
+    assert range_step(0) == 1
+
+
+def test_range_selector_covers_several_scrapes():
+    assert range_selector(2, scrape_interval=30) == 120
+    assert range_selector(600, scrape_interval=30) == 600
+
+
+def test_series_matrix_aligns_series_on_grid():
+    series_list = [
+        {"metric": {"pod": "a"}, "values": [[100, "1"], [110, "2"], [120, "3"]]},
+        # Missing sample at 110, sample outside the window is ignored
+        {"metric": {"pod": "b"}, "values": [[100, "5"], [120, "7"], [130, "9"]]},
+        {"metric": {"pod": "c"}, "values": []},
+    ]
+    timestamps, matrix = series_matrix(series_list, start=100, step=10, points=3)
+
+    assert timestamps.tolist() == [100, 110, 120]
+    assert matrix.shape == (3, 3)
+    assert matrix[0].tolist() == [1, 2, 3]
+    assert matrix[1, 0] == 5 and math.isnan(matrix[1, 1]) and matrix[1, 2] == 7
+    assert np.all(np.isnan(matrix[2]))
+
+
+def _samples():
+    timestamps = np.array([0.0, 10.0, 20.0])
+    matrix = np.array([
+        [1.0, 2.0, 3.0],
+        [10.0, np.nan, 30.0],
+    ])
+    return timestamps, matrix
+
+
+@pytest.mark.parametrize("aggregator, expected", [
+    (RangeAggregator.max, 30.0),
+    (RangeAggregator.mean, 46.0 / 5),
+    (RangeAggregator.p95, float(np.percentile([1, 2, 3, 10, 30], 95))),
+    (RangeAggregator.p99, float(np.percentile([1, 2, 3, 10, 30], 99))),
+    # Area of each series: 1.5 * 10 + 2.5 * 10 and 20 * 20, missing samples are skipped
+    (RangeAggregator.integral, 40.0 + 400.0),
+    # Change per second of each series, max across series
+    (RangeAggregator.rate, 1.0),
+])
+def test_aggregate(aggregator, expected):
+    timestamps, matrix = _samples()
+    assert aggregate(aggregator, timestamps, matrix) == pytest.approx(expected)
+
+
+def test_aggregate_without_samples_fails():
+    timestamps = np.array([0.0, 10.0])
+    with pytest.raises(ValueError):
+        aggregate(RangeAggregator.max, timestamps, np.full((2, 2), np.nan))
+    with pytest.raises(ValueError):
+        aggregate(RangeAggregator.max, timestamps, np.empty((0, 2)))
+
+
+def test_rate_needs_two_samples_of_a_series():
+    timestamps = np.array([0.0, 10.0])
+    with pytest.raises(ValueError):
+        aggregate(RangeAggregator.rate, timestamps, np.array([[1.0, np.nan], [np.nan, 2.0]]))
@@ -0,0 +1,99 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from krkn_ai.chaos_engines import scheduler
+from krkn_ai.chaos_engines.scheduler import LeaseManager, ScenarioScheduler
+from krkn_ai.models.cluster_components import ClusterComponents, Namespace, Node, Pod
+from krkn_ai.models.scenario.blast_radius import get_blast_radius, is_conflicting
+from krkn_ai.models.scenario.scenario_cpu_hog import NodeCPUHogScenario
+from krkn_ai.models.scenario.scenario_pod import PodScenario
+
+
+def _cluster_components() -> ClusterComponents:
+    return ClusterComponents(
+        namespaces=[Namespace(name="shop", pods=[Pod(name="cart", labels={"app": "cart"})])],
+        nodes=[
+            Node(name="worker-1", labels={"role": "worker"}),
+            Node(name="worker-2", labels={"role": "worker"}),
+            Node(name="infra-1", labels={"role": "infra"}),
+        ],
+    )
+
+
+def test_is_conflicting_on_shared_resource():
+    assert is_conflicting({"namespace/shop", "node/worker-1"}, {"node/worker-1"})
+    assert not is_conflicting({"namespace/shop"}, {"namespace/cart"})
+    assert not is_conflicting(set(), {"namespace/shop"})
+
+
+def test_wildcard_conflicts_with_every_resource_of_its_kind():
+    assert is_conflicting({"node/*"}, {"node/worker-1"})
+    assert is_conflicting({"namespace/shop"}, {"namespace/*"})
+    assert not is_conflicting({"node/*"}, {"namespace/shop"})
+
+
+def test_pod_scenario_blast_radius_is_its_namespace():
+    scenario = PodScenario(cluster_components=_cluster_components())
+    scenario.namespace.value = "shop"
+    assert get_blast_radius(scenario) == {"namespace/shop"}
+
+
+def test_node_hog_blast_radius_resolves_node_selector():
+    scenario = NodeCPUHogScenario(cluster_components=_cluster_components())
+    scenario.node_selector.value = "role=worker"
+    assert get_blast_radius(scenario) == {"node/worker-1", "node/worker-2"}
+
+    scenario.node_selector.value = "role=missing"
+    assert get_blast_radius(scenario) == {"node/*"}
+
+
+def test_lease_manager_refuses_overlapping_radius_until_released():
+    leases = LeaseManager()
+    radius = {"namespace/shop", "node/worker-1"}
+    assert leases.try_acquire(radius)
+    assert not leases.try_acquire({"node/worker-1"})
+    assert leases.try_acquire({"namespace/cart"})
+
+    leases.release(radius)
+    assert leases.try_acquire({"node/worker-1"})
+
+
+def test_scheduler_never_runs_overlapping_scenarios_together(monkeypatch):
+    radiuses = {
+        "a": {"namespace/shop"},
+        "b": {"namespace/shop"},
+        "c": {"namespace/cart"},
+        "d": {"node/*"},
+        "e": {"node/worker-1"},
+    }
+    monkeypatch.setattr(scheduler, "get_blast_radius", lambda scenario: radiuses[scenario])
+
+    lock = threading.Lock()
+    running = set()
+    overlaps = []
+    max_running = [0]
+
+    def execute(scenario, generation_id):
+        with lock:
+            overlaps.extend([(scenario, x) for x in running if is_conflicting(radiuses[scenario], radiuses[x])])
+            running.add(scenario)
+            max_running[0] = max(max_running[0], len(running))
+        time.sleep(0.05)
+        with lock:
+            running.remove(scenario)
+        return SimpleNamespace(scenario=scenario, lock_wait_time=0.0)
+
+    finished = []
+    results = ScenarioScheduler(execute, concurrency=3).run(
+        list(radiuses), generation_id=0, on_result=lambda x: finished.append(x.scenario)
+    )
+
+    assert overlaps == []
+    assert 1 < max_running[0] <= 3
+    # Results keep the order of the given scenarios, on_result is called for each of them
+    assert [x.scenario for x in results] == list(radiuses)
+    assert sorted(finished) == sorted(radiuses)
+    # Scenarios blocked by a running one waited for its leases
+    assert results[1].lock_wait_time > 0
+    assert results[0].lock_wait_time == 0
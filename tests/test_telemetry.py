@@ -0,0 +1,92 @@
+import datetime
+import json
+
+from krkn_ai.chaos_engines.telemetry import (
+    extract_chaos_data,
+    get_chaos_window,
+    get_krkn_scenario_type,
+    get_telemetry_scenarios,
+    is_dummy_scenario,
+    match_telemetry_scenarios,
+)
+
+
+def _telemetry(scenario_type: str, parameters: dict, start: float = 0, end: float = 0) -> dict:
+    return {
+        "scenario": f"scenarios/{scenario_type}.yaml",
+        "scenario_type": scenario_type,
+        "parameters": parameters,
+        "start_timestamp": start,
+        "end_timestamp": end,
+        "exit_status": 0,
+    }
+
+
+def _log(*scenarios: dict) -> str:
+    lines = ["2025-01-01 12:00:00,000 [INFO] Starting kraken"]
+    for scenario in scenarios:
+        lines.append("2025-01-01 12:00:01,000 [INFO] Chaos data:")
+        lines.extend(json.dumps({"telemetry": {"scenarios": [scenario]}, "critical_alerts": None}, indent=4).split("\n"))
+        lines.append("2025-01-01 12:00:02,000 [INFO] Chaos injection finished")
+    return "\n".join(lines)
+
+
+def test_krkn_scenario_types():
+    assert get_krkn_scenario_type("pod-scenarios") == "pod_disruption_scenarios"
+    assert get_krkn_scenario_type("node-memory-hog") == "hog_scenarios"
+    assert get_krkn_scenario_type("pod-network-filter") == "network_chaos_ng_scenarios"
+    assert get_krkn_scenario_type("new-scenario") == "new_scenario"
+
+
+def test_extract_every_chaos_data_block():
+    log = _log(_telemetry("hog_scenarios", {}), _telemetry("pod_disruption_scenarios", {}))
+    scenarios = get_telemetry_scenarios(extract_chaos_data(log))
+    assert [x["scenario_type"] for x in scenarios] == ["hog_scenarios", "pod_disruption_scenarios"]
+
+
+def test_scenarios_sharing_a_type_are_matched_by_parameters():
+    cpu = _telemetry("hog_scenarios", {"NODE_CPU_PERCENTAGE": "80", "NODE_SELECTOR": "role=worker"})
+    memory = _telemetry("hog_scenarios", {"MEMORY_CONSUMPTION_PERCENTAGE": "90%"})
+    pod = _telemetry("pod_disruption_scenarios", {"NAMESPACE": "shop"})
+    expected = [
+        (get_krkn_scenario_type("pod-scenarios"), {"NAMESPACE": "shop"}),
+        (get_krkn_scenario_type("node-memory-hog"), {"MEMORY_CONSUMPTION_PERCENTAGE": "90%"}),
+        (get_krkn_scenario_type("node-cpu-hog"), {"NODE_CPU_PERCENTAGE": "80"}),
+    ]
+    # Graph nodes report telemetry in completion order
+    assert match_telemetry_scenarios([memory, cpu, pod], expected) == [pod, memory, cpu]
+
+
+def test_parameters_reported_as_config_are_compared_by_value():
+    telemetry = _telemetry("pod_disruption_scenarios", {"config": {"namespace_pattern": "shop", "kill": 2}})
+    assert match_telemetry_scenarios([telemetry], [("pod_disruption_scenarios", {"NAMESPACE": "shop"})]) == [telemetry]
+
+
+def test_ambiguous_and_unknown_entries_are_not_attributed():
+    a = _telemetry("pod_disruption_scenarios", {"NAMESPACE": "shop"})
+    b = _telemetry("pod_disruption_scenarios", {"NAMESPACE": "shop"})
+    other = _telemetry("time_scenarios", {"ACTION": "skew_time"})
+    expected = [
+        ("pod_disruption_scenarios", {"NAMESPACE": "shop"}),
+        ("pod_disruption_scenarios", {"NAMESPACE": "cart"}),
+    ]
+    assert match_telemetry_scenarios([a, b, other], expected) == [None, None]
+
+
+def test_dummy_graph_nodes():
+    assert is_dummy_scenario(_telemetry("dummy_scenarios", {}))
+    assert not is_dummy_scenario(_telemetry("hog_scenarios", {}))
+
+
+def test_chaos_window_spans_scenarios_and_ignores_dummy_nodes():
+    log = _log(
+        _telemetry("dummy_scenarios", {}, start=900, end=1000),
+        _telemetry("hog_scenarios", {}, start=1010.5, end=1070),
+        _telemetry("pod_disruption_scenarios", {}, start=1005, end=1040),
+    )
+    assert get_chaos_window(log) == (datetime.datetime.fromtimestamp(1005), datetime.datetime.fromtimestamp(1070))
+
+
+def test_no_chaos_window_without_telemetry_timestamps():
+    assert get_chaos_window("2025-01-01 12:00:00,000 [INFO] Starting kraken") is None
+    assert get_chaos_window(_log(_telemetry("hog_scenarios", {}))) is None